@@ -0,0 +1 @@
+"""네트워크 없이 돌리는 파서/자막 정리 벤치마크 (python -m benchmarks.run)."""
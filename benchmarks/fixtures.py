@@ -0,0 +1,187 @@
+"""벤치마크용 자막 픽스처 (합성 + 녹화본).
+
+합성 픽스처는 실제 YouTube 응답과 같은 구조로 만든다.
+- manual: 2~5초 길이의 겹치지 않는 문장 자막
+- rolling: 자동생성 자막. VTT는 이전 줄을 다시 보여주는 2줄 롤링 큐와
+  10ms짜리 전환 큐를 포함하고, json3/srv3는 단어별 세그먼트를 가진다.
+- latin / cjk: 영어 단어 또는 한글 음절 단어 (지프 분포로 자주 나오는 단어가 반복됨)
+
+녹화본은 benchmarks/recorded/ 아래에 실제로 내려받은 자막 파일을
+`<이름>.<확장자>` (vtt, json3, srv1, srv2, srv3, ttml)로 넣어 두면 함께 측정한다.
+저장소에는 포맷마다 짧은 샘플(sample-*)이 들어 있어 새로 받은 체크아웃에서도 바로 측정할 수 있다.
+"""
+import html
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+# 픽스처 길이 (초)
+SIZES: Dict[str, int] = {"5m": 5 * 60, "1h": 3600, "10h": 10 * 3600}
+STYLES = ("manual", "rolling")
+SCRIPTS = ("latin", "cjk")
+
+RECORDED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded")
+RECORDED_EXTS = ("vtt", "json3", "srv1", "srv2", "srv3", "ttml")
+
+_LATIN_WORDS = (
+    "the of and to a in that is was he for it with as his on be at by i this had not are but "
+    "from or have an they which one you were her all she there would their we him been has when "
+    "who will more no if out so said what up its about into than them can only other new some "
+    "could time these two may then do first any my now such like our over man me even most made "
+    "after also did many before must through back years where much your way well down should "
+    "because each just those people how too little state good very make world still own see men "
+    "work long get here between both life being under never day same another know while last "
+    "lecture science energy model data system question answer example problem theory"
+).split()
+
+Cue = Tuple[float, float, List[str]]
+
+
+def _cjk_words(rng: random.Random, count: int) -> List[str]:
+    words = []
+    for _ in range(count):
+        length = rng.choice((1, 2, 2, 2, 3, 3, 4))
+        words.append("".join(chr(0xAC00 + rng.randrange(0, 11172 // 8)) for _ in range(length)))
+    return words
+
+
+def generate_cues(duration: int, style: str = "manual", script: str = "latin", seed: int = 0) -> List[Cue]:
+    """(start, end, 단어 목록) 큐 목록 생성."""
+    rng = random.Random(f"{duration}-{style}-{script}-{seed}")
+    vocab = _LATIN_WORDS if script == "latin" else _cjk_words(rng, 400)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+
+    cues: List[Cue] = []
+    t = 0.0
+    while t < duration:
+        if style == "manual":
+            length = rng.uniform(2.0, 5.0)
+            words = rng.choices(vocab, weights, k=rng.randint(6, 12))
+        else:
+            length = rng.uniform(1.5, 3.0)
+            words = rng.choices(vocab, weights, k=rng.randint(4, 8))
+        cues.append((round(t, 3), round(t + length, 3), words))
+        t += length
+    return cues
+
+
+def _clock(seconds: float) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def render_vtt(cues: List[Cue], style: str) -> bytes:
+    out = ["WEBVTT\nKind: captions\nLanguage: en\n"]
+    if style == "manual":
+        for start, end, words in cues:
+            out.append(f"{_clock(start)} --> {_clock(end)}\n{' '.join(words)}\n")
+        return "\n".join(out).encode("utf-8")
+
+    # 자동생성 롤링 형식: 단어별 타임스탬프 큐 + 완성된 줄을 다시 보여주는 10ms 전환 큐
+    previous = " "
+    for start, end, words in cues:
+        step = (end - start) / len(words)
+        timed = words[0] + "".join(
+            f"<{_clock(start + step * k)}><c> {word}</c>" for k, word in enumerate(words[1:], 1)
+        )
+        out.append(f"{_clock(start)} --> {_clock(end)} align:start position:0%\n{previous}\n{timed}\n")
+        line = " ".join(words)
+        out.append(f"{_clock(end)} --> {_clock(end + 0.01)} align:start position:0%\n{line}\n \n")
+        previous = line
+    return "\n".join(out).encode("utf-8")
+
+
+def render_json3(cues: List[Cue], style: str) -> bytes:
+    events = [{"tStartMs": 0, "dDurationMs": int(cues[-1][1] * 1000) if cues else 0,
+               "id": 1, "wpWinPosId": 1, "wsWinStyleId": 1}]
+    for start, end, words in cues:
+        start_ms = int(start * 1000)
+        duration_ms = int((end - start) * 1000)
+        if style == "manual":
+            segs = [{"utf8": " ".join(words)}]
+        else:
+            step = duration_ms // len(words)
+            segs = [{"utf8": words[0], "acAsrConf": 0}] + [
+                {"utf8": " " + word, "tOffsetMs": step * k, "acAsrConf": 0}
+                for k, word in enumerate(words[1:], 1)
+            ]
+        events.append({"tStartMs": start_ms, "dDurationMs": duration_ms, "wWinId": 1, "segs": segs})
+        if style == "rolling":
+            events.append({"tStartMs": start_ms + duration_ms, "dDurationMs": 10, "wWinId": 1,
+                           "aAppend": 1, "segs": [{"utf8": "\n"}]})
+    return json.dumps({"wireMagic": "pb3", "events": events}, ensure_ascii=False).encode("utf-8")
+
+
+def render_srv1(cues: List[Cue], style: str) -> bytes:
+    body = "".join(
+        f'<text start="{start:.3f}" dur="{end - start:.3f}">{html.escape(html.escape(" ".join(words)))}</text>'
+        for start, end, words in cues
+    )
+    return f'<?xml version="1.0" encoding="utf-8" ?><transcript>{body}</transcript>'.encode("utf-8")
+
+
+def render_srv2(cues: List[Cue], style: str) -> bytes:
+    body = "".join(
+        f'<text t="{int(start * 1000)}" d="{int((end - start) * 1000)}" w="1">{html.escape(" ".join(words))}</text>'
+        for start, end, words in cues
+    )
+    return ('<?xml version="1.0" encoding="utf-8" ?><timedtext>'
+            '<window t="0" id="1" op="define" rc="15" cc="32" ap="7" ah="50" av="95"/>'
+            + body + "</timedtext>").encode("utf-8")
+
+
+def render_srv3(cues: List[Cue], style: str) -> bytes:
+    parts = []
+    for start, end, words in cues:
+        start_ms = int(start * 1000)
+        duration_ms = int((end - start) * 1000)
+        if style == "manual":
+            inner = html.escape(" ".join(words))
+        else:
+            step = duration_ms // len(words)
+            inner = f'<s ac="0">{html.escape(words[0])}</s>' + "".join(
+                f'<s t="{step * k}" ac="0"> {html.escape(word)}</s>' for k, word in enumerate(words[1:], 1)
+            )
+        parts.append(f'<p t="{start_ms}" d="{duration_ms}" w="1">{inner}</p>')
+    return ('<?xml version="1.0" encoding="utf-8" ?><timedtext format="3"><body>'
+            + "\n".join(parts) + "</body></timedtext>").encode("utf-8")
+
+
+def render_ttml(cues: List[Cue], style: str) -> bytes:
+    parts = [
+        f'<p begin="{_clock(start)}" end="{_clock(end)}" style="s2">{html.escape(" ".join(words))}</p>'
+        for start, end, words in cues
+    ]
+    return ('<?xml version="1.0" encoding="utf-8" ?><tt xml:lang="en" xmlns="http://www.w3.org/ns/ttml">'
+            '<body><div>' + "\n".join(parts) + "</div></body></tt>").encode("utf-8")
+
+
+RENDERERS = {
+    "vtt": render_vtt,
+    "json3": render_json3,
+    "srv1": render_srv1,
+    "srv2": render_srv2,
+    "srv3": render_srv3,
+    "ttml": render_ttml,
+}
+
+
+def synthetic_documents(size: str, style: str, script: str) -> Dict[str, bytes]:
+    """포맷별 합성 자막 문서 (바이트)."""
+    cues = generate_cues(SIZES[size], style, script)
+    return {ext: render(cues, style) for ext, render in RENDERERS.items()}
+
+
+def recorded_documents(directory: str = RECORDED_DIR) -> List[Tuple[str, str, bytes]]:
+    """녹화본 자막 파일 목록: (이름, 확장자, 내용)."""
+    if not os.path.isdir(directory):
+        return []
+    documents = []
+    for filename in sorted(os.listdir(directory)):
+        name, _, ext = filename.rpartition(".")
+        if name and ext.lower() in RECORDED_EXTS:
+            with open(os.path.join(directory, filename), "rb") as f:
+                documents.append((name, ext.lower(), f.read()))
+    return documents
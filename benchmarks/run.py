@@ -0,0 +1,290 @@
+"""파서/자막 정리 함수 오프라인 벤치마크.
+
+    python -m benchmarks.run                         # 전체 실행
+    python -m benchmarks.run --sizes 5m,1h -k vtt    # 일부만
+    python -m benchmarks.run --save-baseline         # 현재 결과를 기준선으로 저장
+    python -m benchmarks.run --compare               # 기준선과 비교 (회귀 시 종료 코드 1)
+
+각 케이스마다 한 번 워밍업한 뒤 `--repeat`번 측정해 지연 시간 p50/p90/p99와
+처리량을 계산하고, tracemalloc을 켠 별도 실행에서 최대 메모리를 잰다.
+
+benchmarks/baseline.json은 참고용 기준선이다 (meta에 측정한 환경이 적혀 있음).
+시간은 기계마다 다르므로 CI에서는 같은 러너에서 기준 커밋으로 기준선을 만든 뒤 비교한다.
+`--compare`에서 `--sizes`를 생략하면 기준선에 들어 있는 크기만 측정하고,
+그래도 기준선에 없는 케이스(새로 추가한 벤치마크 등)는 따로 목록으로 보여준다.
+
+    git checkout <기준 커밋> && python -m benchmarks.run --sizes 5m,1h --save-baseline --baseline /tmp/base.json
+    git checkout <변경 커밋> && python -m benchmarks.run --sizes 5m,1h --compare --baseline /tmp/base.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from benchmarks.fixtures import SCRIPTS, SIZES, STYLES, recorded_documents, synthetic_documents
+from ytsub.cleaning import (apply_subtitle_cleaning, clean_duplicate_subtitles, merge_consecutive_subtitles,
+                            remove_rolling_overlap)
+from ytsub.model import Transcript
+from ytsub.parsers import (
+    clean_xml_text,
+    parse_json3_stream,
+    parse_timedtext_xml_stream,
+    parse_ttml_stream,
+    parse_vtt_stream,
+)
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+# 이보다 작은 p50 차이는 측정 잡음으로 보고 회귀로 치지 않음
+MIN_REGRESSION_SECONDS = 0.001
+CHUNK_SIZE = 64 * 1024
+
+
+class Case(NamedTuple):
+    name: str           # "<벤치마크>/<픽스처>"
+    run: Callable[[], object]
+    input_bytes: int    # 파서 입력 크기 (정리 함수는 0)
+    input_segments: int  # 정리 함수 입력 구간 수 (파서는 0)
+
+
+def _chunks(data: bytes) -> List[bytes]:
+    """네트워크 스트림처럼 64KB 청크로 나눔."""
+    return [data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+
+
+# 포맷별로 백엔드가 실제로 부르는 파서
+_PARSER_BENCHES = {
+    "vtt": ("parse_vtt", parse_vtt_stream),
+    "json3": ("parse_srv3_json", parse_json3_stream),
+    "ttml": ("parse_ttml", parse_ttml_stream),
+    "srv2": ("parse_timedtext_xml", parse_timedtext_xml_stream),
+    "srv3": ("parse_timedtext_xml", parse_timedtext_xml_stream),
+}
+
+
+def _parser_cases(fixture: str, documents: Dict[str, bytes]) -> Iterator[Case]:
+    for ext, data in documents.items():
+        if ext in _PARSER_BENCHES:
+            bench, parser = _PARSER_BENCHES[ext]
+            chunks = _chunks(data)
+            # 같은 파서를 쓰는 포맷(srv2/srv3)이 겹치지 않도록 케이스 이름에 확장자를 붙임
+            yield Case(f"{bench}/{fixture}.{ext}", lambda p=parser, c=chunks: p(c), len(data), 0)
+        elif ext == "srv1":
+            # pytube 경로: 이미 받은 XML 문자열 전체를 넘긴다
+            text = data.decode("utf-8")
+            yield Case(f"clean_xml_text/{fixture}.{ext}", lambda t=text: clean_xml_text(t), len(data), 0)
+
+
+def _cleaner_cases(fixture: str, transcript: Transcript) -> Iterator[Case]:
+    n = len(transcript)
+    yield Case(f"clean_duplicate_subtitles/{fixture}", lambda: clean_duplicate_subtitles(transcript), 0, n)
+    yield Case(f"merge_consecutive_subtitles/{fixture}", lambda: merge_consecutive_subtitles(transcript), 0, n)
+    yield Case(f"remove_rolling_overlap/{fixture}", lambda: remove_rolling_overlap(transcript), 0, n)
+    yield Case(f"apply_subtitle_cleaning/{fixture}",
+               lambda: apply_subtitle_cleaning(transcript, True, True, True), 0, n)
+
+
+def build_cases(sizes: Sequence[str], include_recorded: bool = True) -> Iterator[Case]:
+    for size in sizes:
+        for style in STYLES:
+            for script in SCRIPTS:
+                fixture = f"{size}-{style}-{script}"
+                documents = synthetic_documents(size, style, script)
+                yield from _parser_cases(fixture, documents)
+                # 정리 함수 입력은 yt-dlp 경로와 같이 VTT를 파싱한 결과
+                yield from _cleaner_cases(fixture, parse_vtt_stream(_chunks(documents["vtt"])))
+
+    if not include_recorded:
+        return
+    for name, ext, data in recorded_documents():
+        fixture = f"recorded-{name}"
+        yield from _parser_cases(fixture, {ext: data})
+        bench = _PARSER_BENCHES.get(ext)
+        parser = bench[1] if bench else parse_timedtext_xml_stream
+        transcript = parser(_chunks(data))
+        if transcript:
+            yield from _cleaner_cases(f"{fixture}.{ext}", transcript)
+
+
+# ---------------------------------
+# 측정
+# ---------------------------------
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def measure(case: Case, repeat: int) -> Dict[str, float]:
+    result = case.run()  # 워밍업 (정규식 컴파일, 캐시 등)
+    output_segments = len(result) if isinstance(result, Transcript) else 0
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        case.run()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50 = percentile(timings, 50)
+    segments = case.input_segments or output_segments
+    return {
+        "p50": p50,
+        "p90": percentile(timings, 90),
+        "p99": percentile(timings, 99),
+        "mb_per_s": case.input_bytes / p50 / 1e6 if case.input_bytes and p50 else 0.0,
+        "segments_per_s": segments / p50 if p50 else 0.0,
+        "peak_bytes": peak,
+        "segments": segments,
+        "input_bytes": case.input_bytes,
+    }
+
+
+# ---------------------------------
+# 기준선
+# ---------------------------------
+def save_baseline(path: str, results: Dict[str, Dict[str, float]], repeat: int) -> None:
+    payload = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=1, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def baseline_sizes(baseline: Dict[str, Dict[str, float]]) -> List[str]:
+    """기준선 케이스 이름("<벤치마크>/<크기>-<스타일>-<스크립트>")에 들어 있는 픽스처 크기."""
+    found = {name.split("/", 1)[-1].split("-", 1)[0] for name in baseline}
+    return [size for size in SIZES if size in found]
+
+
+def missing_from_baseline(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> List[str]:
+    """이번에 측정했지만 기준선에 없어서 비교하지 못한 케이스."""
+    return [name for name in results if name not in baseline]
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """p50 지연 시간 또는 최대 메모리가 기준선보다 tolerance 이상 나빠진 케이스 목록."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ("p50", "peak_bytes"):
+            if metric == "p50" and current[metric] - base[metric] < MIN_REGRESSION_SECONDS:
+                continue
+            if base[metric] and current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {metric} {_format_metric(metric, base[metric])} -> "
+                    f"{_format_metric(metric, current[metric])} "
+                    f"(+{(current[metric] / base[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+# ---------------------------------
+# 출력
+# ---------------------------------
+def _format_metric(metric: str, value: float) -> str:
+    if metric == "peak_bytes":
+        return f"{value / 1024 / 1024:.1f}MB"
+    return f"{value * 1000:.1f}ms"
+
+
+def _format_row(name: str, r: Dict[str, float], base: Optional[Dict[str, float]]) -> str:
+    throughput = f"{r['mb_per_s']:7.1f} MB/s" if r["mb_per_s"] else f"{r['segments_per_s'] / 1000:7.1f} kseg/s"
+    row = (f"{name:<52} {r['p50'] * 1000:9.2f} {r['p90'] * 1000:9.2f} {r['p99'] * 1000:9.2f} "
+           f"{throughput:>13} {r['peak_bytes'] / 1024 / 1024:8.1f}")
+    if base and base.get("p50"):
+        row += f" {(r['p50'] / base['p50'] - 1) * 100:+7.1f}%"
+    return row
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="자막 파서/정리 벤치마크")
+    parser.add_argument("--sizes", help="측정할 픽스처 길이 (기본: 5m,1h,10h, --compare면 기준선에 있는 길이)")
+    parser.add_argument("-k", "--filter", default="", help="이름에 이 문자열이 들어간 케이스만 실행")
+    parser.add_argument("--repeat", type=int, default=5, help="케이스별 측정 횟수")
+    parser.add_argument("--no-recorded", action="store_true", help="녹화본 픽스처 제외")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="기준선 JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 기준선으로 저장")
+    parser.add_argument("--compare", action="store_true", help="기준선과 비교해 회귀가 있으면 실패")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="회귀로 판단할 p50/메모리 증가 비율 (기본 0.25)")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON으로도 저장")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        try:
+            baseline = load_baseline(args.baseline)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"기준선을 읽을 수 없습니다: {args.baseline} ({e})")
+
+    if args.sizes is not None:
+        sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    else:
+        # 기준선에 없는 크기를 재 봐야 비교할 수 없으므로 기준선에 있는 크기만
+        sizes = baseline_sizes(baseline) or list(SIZES)
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"알 수 없는 크기: {', '.join(unknown)} (가능: {', '.join(SIZES)})")
+
+    print(f"{'case':<52} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'throughput':>13} {'peak MB':>8}"
+          + (f" {'vs base':>8}" if baseline else ""))
+    results: Dict[str, Dict[str, float]] = {}
+    for case in build_cases(sizes, include_recorded=not args.no_recorded):
+        if args.filter and args.filter not in case.name:
+            continue
+        results[case.name] = measure(case, args.repeat)
+        print(_format_row(case.name, results[case.name], baseline.get(case.name)), flush=True)
+
+    if args.json_path:
+        save_baseline(args.json_path, results, args.repeat)
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.repeat)
+        print(f"\n기준선 저장: {args.baseline}")
+
+    if args.compare:
+        missing = missing_from_baseline(results, baseline)
+        if missing:
+            print(f"\n기준선에 없어 비교하지 못한 케이스 {len(missing)}건:")
+            for name in missing:
+                print(f"  {name}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n회귀 {len(regressions)}건 (허용치 +{args.tolerance * 100:.0f}%):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n기준선 대비 회귀 없음 ({len(results) - len(missing)}건 비교, "
+              f"허용치 +{args.tolerance * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
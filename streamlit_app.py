@@ -1,798 +1,439 @@
+import functools
+import io
+import os
 import re
-import random
-from time import sleep
-import html
-from typing import Optional, List
-from urllib.parse import urlparse, parse_qs
-from urllib.request import urlopen, Request
-import ssl
-import hashlib
+import sqlite3
+import time
 
 import streamlit as st
-from youtube_transcript_api import (
-    YouTubeTranscriptApi,
-    NoTranscriptFound,
-    TranscriptsDisabled,
-    VideoUnavailable,
-)
-from pytube import YouTube
-import yt_dlp
-
-# 커스텀 예외 클래스 정의
-class TranscriptExtractionError(Exception):
-    """자막 추출 실패 시 사용하는 커스텀 예외"""
-    pass
-
-# SSL 인증서 문제 해결
-ssl._create_default_https_context = ssl._create_unverified_context
-
-# ---------------------------------
-# 봇 차단 우회 설정
-# ---------------------------------
 
-# 더 다양하고 현실적인 User-Agent 목록
-USER_AGENTS = [
-    # Chrome Windows
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-    # Chrome Mac
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    # Firefox
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:122.0) Gecko/20100101 Firefox/122.0",
-    # Safari
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2.1 Safari/605.1.15",
-    # Edge
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36 Edg/121.0.0.0",
-]
-
-def get_realistic_headers():
-    """실제 브라우저와 유사한 헤더 생성"""
-    ua = random.choice(USER_AGENTS)
-    
-    # User-Agent에 따른 브라우저 타입 결정
-    if "Chrome" in ua:
-        browser_hints = {
-            "sec-ch-ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": '"Windows"' if "Windows" in ua else '"macOS"',
-        }
-    else:
-        browser_hints = {}
-    
-    base_headers = {
-        "User-Agent": ua,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-        "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
-        "Accept-Encoding": "gzip, deflate, br",
-        "DNT": "1",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Cache-Control": "max-age=0",
-    }
-    
-    # 브라우저별 헤더 추가
-    base_headers.update(browser_hints)
-    
-    return base_headers
+from ytsub.backends import fetch_video_meta
+from ytsub.cache import get_transcript_cache
+from ytsub.breaker import HALF_OPEN as BREAKER_HALF_OPEN, OPEN as BREAKER_OPEN, get_circuit_breakers
+from ytsub.cleaning import CleaningVariants, apply_subtitle_cleaning
+from ytsub.deadline import DEFAULT_DEADLINE, Deadline
+from ytsub.errors import ExtractionFailed, TranscriptExtractionError
+from ytsub.export import FORMATS, export_bytes, write_zip
+from ytsub.jobs import FAILED as JOB_FAILED, get_job_manager
+from ytsub.metrics import REGISTRY, backend_summary, start_http_server
+from ytsub.pipeline import DEFAULT_MAX_IN_FLIGHT, fetch_transcript, set_indexed_title
+from ytsub.parsers import parse_clock_time
+from ytsub.progress import DETAIL, INFO, STEP, SUCCESS, WARNING, ProgressEvent, Reporter
+from ytsub.scoring import get_backend_scoreboard
+from ytsub.search import INDEX_UNAVAILABLE_MESSAGE, MIN_MATCH_CHARS, get_search_index, split_terms
+from ytsub.stealth import new_session_id
+from ytsub.urls import extract_video_id, to_clean_watch_url, to_timestamp_url
 
 def get_session_fingerprint():
     """세션별 고유 식별자 생성 (IP 변경 시뮬레이션용)"""
     if 'session_id' not in st.session_state:
-        st.session_state.session_id = hashlib.md5(str(random.random()).encode()).hexdigest()[:8]
+        st.session_state.session_id = new_session_id()
     return st.session_state.session_id
 
-def smart_delay(attempt: int = 0, base_delay: float = 1.0):
-    """지능적 대기 (인간과 유사한 패턴)"""
-    # 기본 대기 + 지수 백오프 + 랜덤 지터
-    delay = base_delay * (1.5 ** attempt) + random.uniform(0.5, 2.0)
-    
-    # 너무 길면 최대값으로 제한
-    delay = min(delay, 15.0)
-    
-    st.caption(f"⏳ 자연스러운 간격으로 대기 중... ({delay:.1f}초)")
-    sleep(delay)
-
-# ---------------------------------
-# 자막 중복 제거 및 병합 함수들 (기존과 동일)
-# ---------------------------------
-def clean_duplicate_subtitles(transcript_text: str) -> str:
-    """자막에서 중복된 문장들을 제거"""
-    lines = transcript_text.strip().split('\n')
-    cleaned_lines = []
-    seen_texts = set()
-    
-    for line in lines:
-        if not line.strip():
-            continue
-            
-        # 시간 태그와 텍스트 분리
-        match = re.match(r'\[(\d+\.?\d*)\]\s*(.*)', line)
-        if not match:
-            continue
-            
-        timestamp = float(match.group(1))
-        text = match.group(2).strip()
-        
-        if not text or text in ['[Music]', '[Applause]', '[Laughter]']:
-            continue
-            
-        # 중복 텍스트 체크 (대소문자 구분 안함)
-        text_lower = text.lower()
-        
-        # 완전 중복 제거
-        if text_lower in seen_texts:
-            continue
-            
-        # 부분 중복 제거 (한 문장이 다른 문장에 포함된 경우)
-        is_duplicate = False
-        texts_to_remove = []
-        
-        for seen_text in list(seen_texts):
-            # 현재 텍스트가 이전 텍스트에 포함되거나 그 반대
-            if text_lower in seen_text:
-                # 현재 텍스트가 더 짧으면 스킵
-                is_duplicate = True
-                break
-            elif seen_text in text_lower:
-                # 이전 텍스트가 더 짧으면 제거 대상으로 마킹
-                texts_to_remove.append(seen_text)
-                
-        if not is_duplicate:
-            # 제거할 텍스트들 처리
-            for old_text in texts_to_remove:
-                seen_texts.discard(old_text)
-            
-            seen_texts.add(text_lower)
-            cleaned_lines.append(f"[{timestamp:.1f}] {text}")
-    
-    return '\n'.join(cleaned_lines)
-
-def merge_consecutive_subtitles(transcript_text: str, time_threshold: float = 2.0) -> str:
-    """연속된 비슷한 자막들을 병합"""
-    lines = transcript_text.strip().split('\n')
-    merged_lines = []
-    
-    i = 0
-    while i < len(lines):
-        if not lines[i].strip():
-            i += 1
-            continue
-            
-        match = re.match(r'\[(\d+\.?\d*)\]\s*(.*)', lines[i])
-        if not match:
-            i += 1
-            continue
-            
-        current_time = float(match.group(1))
-        current_text = match.group(2).strip()
-        
-        # 다음 라인들과 비교해서 병합 가능한지 체크
-        merged_text = current_text
-        j = i + 1
-        
-        while j < len(lines):
-            if j >= len(lines):
-                break
-                
-            next_match = re.match(r'\[(\d+\.?\d*)\]\s*(.*)', lines[j])
-            if not next_match:
-                j += 1
-                continue
-                
-            next_time = float(next_match.group(1))
-            next_text = next_match.group(2).strip()
-            
-            # 시간이 너무 멀면 중단
-            if (next_time - current_time) > time_threshold:
-                break
-                
-            # 텍스트가 현재 텍스트의 연장인지 체크
-            if (current_text.lower() in next_text.lower() or 
-                next_text.lower() in current_text.lower()):
-                # 더 긴 텍스트로 업데이트
-                if len(next_text) > len(merged_text):
-                    merged_text = next_text
-                j += 1
-            else:
-                break
-                
-        merged_lines.append(f"[{current_time:.1f}] {merged_text}")
-        i = max(i + 1, j)
-    
-    return '\n'.join(merged_lines)
-
-def apply_subtitle_cleaning(raw_transcript: str, clean_duplicates: bool, merge_consecutive: bool) -> str:
-    """사용자 설정에 따라 자막 정리 적용"""
-    result = raw_transcript
-    
-    if clean_duplicates:
-        result = clean_duplicate_subtitles(result)
-    
-    if merge_consecutive:
-        result = merge_consecutive_subtitles(result)
-    
-    return result
-
 # ---------------------------------
-# URL 정리 / 비디오ID 추출 (기존과 동일)
+# 진행 상황 / 실패 분석 표시
 # ---------------------------------
-YOUTUBE_URL_RE = re.compile(
-    r'(?:https?://)?(?:www\.)?(?:youtube\.com/(?:watch\?v=|embed/|live/|shorts/)|youtu\.be/)([\w-]{11})(?:\S+)?'
-)
-
-def extract_video_id(url: str) -> Optional[str]:
-    if not url:
-        return None
-    
-    # 정규표현식으로 먼저 시도
-    m = YOUTUBE_URL_RE.search(url)
-    if m:
-        return m.group(1)
-    
-    # URL 파싱으로 재시도
-    try:
-        parsed = urlparse(url)
-        if parsed.hostname in ['youtube.com', 'www.youtube.com']:
-            vid = parse_qs(parsed.query).get("v", [None])[0]
-            if vid and len(vid) == 11:
-                return vid
-        elif parsed.hostname in ['youtu.be', 'www.youtu.be']:
-            vid = parsed.path.lstrip('/')
-            if len(vid) == 11:
-                return vid
-    except Exception:
-        pass
-    
-    return None
-
-def to_clean_watch_url(url_or_id: str) -> str:
-    """짧은 주소/파라미터를 표준 watch URL로 정리."""
-    vid = extract_video_id(url_or_id) if "http" in url_or_id else url_or_id
-    return f"https://www.youtube.com/watch?v={vid}" if vid else url_or_id
-
-# ---------------------------------
-# 향상된 자막 추출 함수들
-# ---------------------------------
-def fetch_via_yta_with_enhanced_retry(video_id: str, langs: List[str], max_retries: int = 3) -> str:
-    """향상된 재시도 로직이 포함된 YTA 자막 추출"""
-    last_error = None
-    session_id = get_session_fingerprint()
-    
-    for attempt in range(max_retries):
-        try:
-            # 각 시도마다 약간의 지연
-            if attempt > 0:
-                smart_delay(attempt, 2.0)
-            
-            # 세션 상태 표시
-            st.caption(f"🔄 YTA 시도 {attempt + 1}/{max_retries} (세션: {session_id})")
-            
-            tl = YouTubeTranscriptApi.list_transcripts(video_id)
-            
-            try:
-                tr = tl.find_transcript(langs)
-            except Exception:
-                tr = tl.find_generated_transcript(langs)
-            
-            entries = tr.fetch()
-            st.success(f"자막 추출 성공 (YTA): {tr.language}" + (" [자동생성]" if tr.is_generated else " [수동]"))
-            return "\n".join([f"[{e['start']:.1f}] {e['text']}" for e in entries])
-            
-        except Exception as e:
-            last_error = e
-            error_msg = str(e).lower()
-            
-            # 특정 오류 타입에 따른 처리
-            if any(phrase in error_msg for phrase in ["too many requests", "429", "rate limit"]):
-                if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) + random.uniform(3, 8)
-                    st.warning(f"⚠️ API 요청 제한 감지. {wait_time:.1f}초 후 재시도...")
-                    sleep(wait_time)
-                    continue
-                else:
-                    raise TranscriptExtractionError(f"YouTube API 요청 제한 초과")
-            elif any(phrase in error_msg for phrase in ["403", "forbidden", "blocked"]):
-                # IP 차단의 경우 더 긴 대기
-                if attempt < max_retries - 1:
-                    wait_time = 10 + random.uniform(5, 15)
-                    st.warning(f"🚫 접근 차단 감지. {wait_time:.1f}초 후 재시도...")
-                    sleep(wait_time)
-                    continue
-                else:
-                    raise TranscriptExtractionError(f"YouTube에서 접근을 차단했습니다")
-            else:
-                # 다른 오류는 재시도 없이 바로 발생
-                if isinstance(e, (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable)):
-                    raise
-                else:
-                    raise TranscriptExtractionError(f"YTA 처리 실패: {str(e)}")
-    
-    raise TranscriptExtractionError(f"YTA 재시도 실패: {str(last_error)}")
-
-def safe_get_youtube_info_enhanced(url: str):
-    """향상된 안전한 YouTube 정보 가져오기"""
-    try:
-        headers = get_realistic_headers()
-        
-        ydl_opts = {
-            "quiet": True,
-            "noplaylist": True,
-            "extract_flat": False,
-            "http_headers": headers,
-            "socket_timeout": 30,
-            "retries": 2,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-        class YouTubeInfo:
-            def __init__(self, info_dict):
-                self.title = info_dict.get('title', '제목 확인 불가')
-                self.length = info_dict.get('duration', 0)
-                
-        return YouTubeInfo(info)
-        
-    except Exception:
-        return None
-
-def fetch_via_ytdlp_enhanced_stealth(url_or_id: str, langs: List[str]) -> str:
-    """스텔스 모드 yt-dlp 자막 가져오기"""
-    url = to_clean_watch_url(url_or_id)
-    headers = get_realistic_headers()
-    session_id = get_session_fingerprint()
-    
-    # 더 현실적인 yt-dlp 설정
-    ydl_opts = {
-        "quiet": True,
-        "no_warnings": True,
-        "noplaylist": True,
-        "writesubtitles": False,
-        "writeautomaticsub": False,
-        "socket_timeout": 45,
-        "retries": 2,
-        "http_headers": headers,
-        # YouTube 우회를 위한 추가 옵션들
-        "extractor_args": {
-            "youtube": {
-                "skip": ["dash", "hls"],
-                "player_client": ["android", "web"],
-            }
-        },
-        # 쿠키 및 캐시 설정
-        "cachedir": False,
-        "no_cache_dir": True,
-    }
-    
-    st.caption(f"🔍 yt-dlp 스텔스 모드 (세션: {session_id})")
-    
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-    except Exception as e:
-        raise TranscriptExtractionError(f"yt-dlp 정보 추출 실패: {str(e)}")
-
-    subs = info.get("subtitles") or {}
-    autos = info.get("automatic_captions") or {}
-    
-    candidates = []
-    
-    # 우선순위: 수동 자막 > 자동 자막
-    for lg in langs:
-        if lg in subs:
-            candidates.append(("manual", lg, subs[lg]))
-    
-    for lg in langs:
-        if lg in autos:
-            candidates.append(("auto", lg, autos[lg]))
-    
-    # 영어 폴백
-    if "en" not in langs:
-        if "en" in subs:
-            candidates.append(("manual", "en", subs["en"]))
-        if "en" in autos:
-            candidates.append(("auto", "en", autos["en"]))
-    
-    # 아무 언어나 사용
-    if not candidates:
-        all_available = list(subs.keys()) + list(autos.keys())
-        if all_available:
-            first_lang = all_available[0]
-            if first_lang in subs:
-                candidates.append(("manual", first_lang, subs[first_lang]))
-            elif first_lang in autos:
-                candidates.append(("auto", first_lang, autos[first_lang]))
-
-    format_priority = ["vtt", "webvtt", "srv3", "ttml", "json3"]
-    
-    for kind, lg, fmt_list in candidates:
-        if not fmt_list:
-            continue
-        
-        # 포맷 우선순위에 따라 정렬
-        sorted_formats = []
-        for fmt_name in format_priority:
-            for item in fmt_list:
-                if item.get("ext", "").lower() == fmt_name:
-                    sorted_formats.append(item)
-        
-        for item in fmt_list:
-            if item not in sorted_formats:
-                sorted_formats.append(item)
-        
-        for item in sorted_formats:
-            try:
-                # 향상된 헤더로 요청
-                req = Request(item["url"], headers=headers)
-                
-                # 작은 랜덤 지연 추가
-                sleep(random.uniform(0.5, 1.5))
-                
-                with urlopen(req, timeout=30) as resp:
-                    data = resp.read().decode("utf-8", errors="ignore")
-                
-                ext = item.get("ext", "").lower()
-                
-                if ext in ("vtt", "webvtt"):
-                    lines = parse_vtt(data)
-                    if lines:
-                        st.success(f"자막 추출 성공 (yt-dlp): {lg} ({kind}, {ext.upper()})")
-                        return "\n".join(lines)
-                
-                elif ext == "srv3":
-                    lines = parse_srv3_json(data)
-                    if lines:
-                        st.success(f"자막 추출 성공 (yt-dlp): {lg} ({kind}, SRV3)")
-                        return "\n".join(lines)
-                
-                elif ext == "ttml":
-                    lines = parse_ttml(data)
-                    if lines:
-                        st.success(f"자막 추출 성공 (yt-dlp): {lg} ({kind}, TTML)")
-                        return "\n".join(lines)
-                        
-                else:
-                    # 일반 텍스트 처리
-                    text = re.sub(r"<.*?>", " ", data)
-                    text = html.unescape(text)
-                    text = re.sub(r"\s+", " ", text).strip()
-                    if text and len(text) > 100:
-                        st.success(f"자막 추출 성공 (yt-dlp): {lg} ({kind}, {ext.upper()})")
-                        return text
-                        
-            except Exception as e:
-                st.caption(f"⚠️ {ext.upper()} 포맷 실패: {str(e)[:50]}...")
-                continue
-
-    available_langs = list(set(list(subs.keys()) + list(autos.keys())))
-    raise TranscriptExtractionError(f"yt-dlp: 자막 추출 실패 (사용가능: {available_langs})")
-
-def fetch_via_pytube_enhanced(url_or_id: str, langs: List[str]) -> str:
-    """향상된 pytube 자막 추출"""
-    url = to_clean_watch_url(url_or_id)
-    session_id = get_session_fingerprint()
-    
-    st.caption(f"🔍 pytube 향상 모드 (세션: {session_id})")
-    
-    try:
-        # User-Agent 설정으로 pytube 초기화
-        import urllib.request
-        opener = urllib.request.build_opener()
-        headers = get_realistic_headers()
-        opener.addheaders = [(k, v) for k, v in headers.items()]
-        urllib.request.install_opener(opener)
-        
-        # 첫 번째 시도
-        try:
-            yt = YouTube(url, use_oauth=False, allow_oauth_cache=False)
-            _ = yt.title  # 메타데이터 로드 테스트
-        except Exception:
-            # 재시도 with 다른 헤더
-            smart_delay(0, 1.0)
-            headers = get_realistic_headers()
-            opener = urllib.request.build_opener()
-            opener.addheaders = [(k, v) for k, v in headers.items()]
-            urllib.request.install_opener(opener)
-            
-            yt = YouTube(url, use_oauth=False, allow_oauth_cache=False)
-            _ = yt.title
-        
-        tracks = yt.captions
-        if not tracks:
-            raise TranscriptExtractionError("pytube: 자막 트랙이 없음")
-
-        # 언어 우선순위 설정
-        candidates = []
-        for lg in langs:
-            candidates.append(lg)
-            candidates.append(f"a.{lg}")  # 자동생성 자막
-        
-        if "en" not in [c.replace("a.", "") for c in candidates]:
-            candidates.extend(["en", "a.en"])
-
-        available_codes = {c.code: c for c in tracks}
-
-        for code in candidates:
-            cap = available_codes.get(code)
-            
-            # 부분 매칭 시도
-            if not cap:
-                for k, v in available_codes.items():
-                    if k.lower().startswith(code.lower().replace("a.", "")):
-                        cap = v
-                        code = k
-                        break
-            
-            if not cap:
-                continue
-
-            try:
-                # SRT 방식 먼저 시도
-                srt = cap.generate_srt_captions()
-                lines = []
-                
-                for block in srt.strip().split("\n\n"):
-                    if not block.strip():
-                        continue
-                        
-                    parts = block.split("\n")
-                    if len(parts) >= 3:
-                        ts = parts[1].split("-->")[0].strip()
-                        try:
-                            h, m, s_ms = ts.split(":")
-                            s, ms = s_ms.split(",")
-                            start = int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000.0
-                            text = " ".join(parts[2:]).strip()
-                            if text:
-                                lines.append(f"[{start:.1f}] {text}")
-                        except (ValueError, IndexError):
-                            continue
-                
-                if lines:
-                    st.success(f"자막 추출 성공 (pytube): {code}")
-                    return "\n".join(lines)
-                    
-            except Exception:
-                # XML 방식으로 폴백
-                try:
-                    xml = cap.xml_captions
-                    items = clean_xml_text(xml)
-                    if items:
-                        st.success(f"자막 추출 성공 (pytube): {code}")
-                        return "\n".join([f"[{stt:.1f}] {txt}" for stt, txt in items])
-                except Exception:
-                    continue
-
-    except Exception as e:
-        raise TranscriptExtractionError(f"pytube 처리 실패: {str(e)}")
-    
-    raise TranscriptExtractionError(f"pytube: 매칭되는 자막 없음")
-
-# 기존 파싱 함수들 (parse_vtt, parse_srv3_json, parse_ttml, clean_xml_text)은 동일
-
-def parse_vtt(vtt: str) -> List[str]:
-    """WebVTT를 [start] text 형식으로 변환."""
-    lines = []
-    blocks = [b for b in vtt.strip().split("\n\n") if "-->" in b]
-    
-    for block in blocks:
-        rows = block.split("\n")
-        if not rows:
-            continue
-            
-        ts = rows[0]
-        m = re.match(r"(\d+):(\d+):(\d+(?:\.\d+)?)", ts.replace(",", "."))
-        
-        start = 0.0
-        if m:
-            h, m_, s = m.groups()
-            start = int(h) * 3600 + int(m_) * 60 + float(s)
-        
-        text = " ".join(rows[1:]).strip()
-        text = re.sub(r"<.*?>", " ", text)
-        text = re.sub(r"\s+", " ", text)
-        if text:
-            lines.append(f"[{start:.1f}] {text}")
-    
-    return lines
-
-def parse_srv3_json(json_data: str) -> List[str]:
-    """YouTube SRV3 JSON 자막 파싱"""
-    try:
-        import json
-        data = json.loads(json_data)
-        lines = []
-        
-        events = data.get("events", [])
-        for event in events:
-            start_time = event.get("tStartMs", 0) / 1000.0
-            segs = event.get("segs", [])
-            text = "".join([seg.get("utf8", "") for seg in segs]).strip()
-            if text:
-                lines.append(f"[{start_time:.1f}] {text}")
-        
-        return lines
-    except Exception:
-        return []
-
-def parse_ttml(ttml_data: str) -> List[str]:
-    """TTML XML 자막 파싱"""
-    try:
-        lines = []
-        pattern = r'<p[^>]*begin="([^"]*)"[^>]*>(.*?)</p>'
-        
-        for match in re.finditer(pattern, ttml_data, re.DOTALL):
-            time_str = match.group(1)
-            text_content = match.group(2)
-            
-            try:
-                parts = time_str.replace(',', '.').split(':')
-                if len(parts) == 3:
-                    h, m, s = parts
-                    start_time = int(h) * 3600 + int(m) * 60 + float(s)
-                else:
-                    start_time = 0.0
-            except:
-                start_time = 0.0
-            
-            text = re.sub(r"<.*?>", " ", text_content)
-            text = html.unescape(text)
-            text = re.sub(r"\s+", " ", text).strip()
-            
-            if text:
-                lines.append(f"[{start_time:.1f}] {text}")
-        
-        return lines
-    except Exception:
-        return []
-
-def clean_xml_text(xml_text: str) -> List[tuple]:
-    """XML에서 (start, text) 리스트로 변환."""
-    items = []
-    xml_text = xml_text.replace("\n", "")
-    pattern = r'<text[^>]*start="([\d\.]+)"[^>]*>(.*?)</text>'
-    
-    for m in re.finditer(pattern, xml_text, re.DOTALL):
-        try:
-            start = float(m.group(1))
-            raw = re.sub(r"<.*?>", " ", m.group(2))
-            text = html.unescape(raw)
-            text = re.sub(r"\s+", " ", text).strip()
-            if text:
-                items.append((start, text))
-        except ValueError:
-            continue
-    return items
-
-def fetch_transcript_resilient_enhanced(url: str, video_id: str, langs: List[str]) -> str:
-    """향상된 3단계 폴백으로 자막 가져오기"""
-    errors = []
-    method_results = []
-    session_id = get_session_fingerprint()
-    
-    st.info(f"🎯 자막 추출 시작 (세션: {session_id}, 언어: {', '.join(langs)})")
-    
-    # 세션 기반 방법 순서 랜덤화
-    methods = ["yta", "ytdlp", "pytube"]
-    if int(session_id[-1], 16) % 2 == 0:  # 세션 ID 기반으로 순서 변경
-        methods = ["ytdlp", "yta", "pytube"]
-    
-    for i, method in enumerate(methods):
-        if i > 0:
-            smart_delay(i-1, 3.0)  # 방법 간 지연
-        
-        st.write(f"🔄 **방법 {i+1}/3**: {method.upper()} 시도 중...")
-        
-        try:
-            if method == "yta":
-                result = fetch_via_yta_with_enhanced_retry(video_id, langs, max_retries)
-            elif method == "ytdlp":
-                result = fetch_via_ytdlp_enhanced_stealth(url, langs)
-            elif method == "pytube":
-                result = fetch_via_pytube_enhanced(url, langs)
-            
-            if result and len(result.strip()) > 0:
-                st.write(f"✅ **{method.upper()} 성공**: {len(result)} 문자 추출")
-                return result
-            else:
-                st.write(f"⚠️ {method.upper()} 빈 결과")
-                method_results.append((method.upper(), "빈 결과"))
-                
-        except TranscriptExtractionError as e:
-            st.write(f"❌ {method.upper()} 실패: {str(e)}")
-            method_results.append((method.upper(), f"실패: {str(e)}"))
-            errors.append(f"{method.upper()}: {str(e)}")
-        except (NoTranscriptFound, TranscriptsDisabled) as e:
-            st.write(f"❌ {method.upper()} 자막 없음: {str(e)}")
-            method_results.append((method.upper(), f"자막 없음: {str(e)}"))
-            errors.append(f"{method.upper()}: {str(e)}")
-        except VideoUnavailable as e:
-            st.write(f"❌ {method.upper()} 영상 접근 불가: {str(e)}")
-            method_results.append((method.upper(), f"영상 접근 불가: {str(e)}"))
-            errors.append(f"{method.upper()}: 영상 접근 불가 - {str(e)}")
-            # 영상 접근 불가면 다른 방법도 실패할 가능성이 높음
-            break
-        except Exception as e:
-            st.write(f"❌ {method.upper()} 예상치 못한 오류: {str(e)}")
-            method_results.append((method.upper(), f"예상치 못한 오류: {str(e)}"))
-            errors.append(f"{method.upper()}: 예상치 못한 오류 - {str(e)}")
-
-    # 실패 분석 및 권장사항
-    st.error("🚫 **모든 방법 실패**")
-    
-    with st.expander("📊 상세 실패 분석", expanded=True):
-        for i, (method, error) in enumerate(method_results, 1):
-            st.text(f"{i}. {method}: {error}")
-    
-    # 오류 패턴 분석 및 해결책 제안
-    all_errors_text = " ".join(errors).lower()
-    
-    st.subheader("🔧 권장 해결책")
-    
-    if any(phrase in all_errors_text for phrase in ["429", "too many requests", "rate limit"]):
-        st.warning("**원인**: YouTube API 요청 제한")
-        st.markdown("""
+_PROGRESS_RENDERERS = {
+    INFO: st.info,
+    STEP: st.write,
+    DETAIL: st.caption,
+    SUCCESS: st.success,
+    WARNING: st.warning,
+}
+
+def show_progress(event: ProgressEvent):
+    """코어 진행 이벤트를 Streamlit 요소로 표시"""
+    _PROGRESS_RENDERERS.get(event.level, st.write)(event.message)
+
+# 실패 원인별 (제목, 표시 방식, 해결책)
+FAILURE_ADVICE = {
+    "rate_limited": ("**원인**: YouTube API 요청 제한", st.warning, """
         **해결책**:
         - 5-10분 후 다시 시도
         - VPN 사용하여 IP 변경
         - 다른 시간대에 시도
         - 여러 영상을 연속으로 처리하지 말고 개별적으로 처리
-        """)
-        raise TranscriptExtractionError("YouTube API 요청 제한 - 잠시 후 다시 시도하세요")
-        
-    elif any(phrase in all_errors_text for phrase in ["403", "forbidden", "blocked", "400", "bad request"]):
-        st.warning("**원인**: IP/봇 차단")
-        st.markdown("""
+        """),
+    "blocked": ("**원인**: IP/봇 차단", st.warning, """
         **해결책**:
         - VPN으로 다른 국가 IP 사용
         - 모바일 네트워크 사용
         - 시크릿/프라이빗 브라우저에서 영상 접근 테스트
         - 다른 시간대에 재시도
-        """)
-        raise TranscriptExtractionError("YouTube에서 접근을 차단했습니다 - VPN 사용을 권장합니다")
-        
-    elif any(phrase in all_errors_text for phrase in ["subtitles are disabled", "no transcript found", "자막 없음"]):
-        st.info("**원인**: 자막 비활성화")
-        st.markdown("""
+        """),
+    "timeout": ("**원인**: 제한 시간 초과", st.warning, """
+        **해결책**:
+        - 사이드바에서 전체 제한 시간을 늘려서 다시 시도
+        - 네트워크 연결 확인
+        - 잠시 후 다시 시도
+        """),
+    "transient": ("**원인**: 일시적인 서버/네트워크 오류", st.warning, """
+        **해결책**:
+        - 잠시 후 다시 시도
+        - 네트워크 연결 확인
+        """),
+    "no_transcript": ("**원인**: 자막 비활성화", st.info, """
         **확인사항**:
         - 해당 영상에 실제로 자막이 있는지 YouTube에서 직접 확인
         - 자동생성 자막도 활성화되어 있는지 확인
         - 다른 언어의 자막이 있는지 확인
-        """)
-        raise TranscriptExtractionError("이 영상에는 자막이 없거나 자막 기능이 비활성화되어 있습니다")
-        
-    elif any(phrase in all_errors_text for phrase in ["영상 접근 불가", "video unavailable", "private"]):
-        st.info("**원인**: 영상 접근 제한")
-        st.markdown("""
+        """),
+    "unavailable": ("**원인**: 영상 접근 제한", st.info, """
         **확인사항**:
         - 영상이 비공개 설정인지 확인
         - 연령 제한이 있는지 확인
         - 지역 제한이 있는지 확인
         - 영상이 삭제되었는지 확인
-        """)
-        raise TranscriptExtractionError("영상에 접근할 수 없습니다 (비공개, 연령제한, 지역제한 등)")
-        
-    else:
-        st.warning("**원인**: 알 수 없는 오류")
-        st.markdown("""
+        """),
+    "unknown": ("**원인**: 알 수 없는 오류", st.warning, """
         **일반적 해결책**:
         - 네트워크 연결 확인
         - 잠시 후 다시 시도
         - 다른 브라우저나 환경에서 시도
         - YouTube에서 해당 영상 직접 접근 가능한지 확인
-        """)
-        raise TranscriptExtractionError("알 수 없는 이유로 자막 추출에 실패했습니다")
+        """),
+}
+
+def show_failure_analysis(error: ExtractionFailed):
+    """모든 방법이 실패했을 때 상세 분석과 권장 해결책 표시"""
+    st.error("🚫 **모든 방법 실패**")
+
+    with st.expander("📊 상세 실패 분석", expanded=True):
+        for i, (method, message) in enumerate(error.attempts, 1):
+            st.text(f"{i}. {method}: {message}")
+
+    st.subheader("🔧 권장 해결책")
+    title, render, advice = FAILURE_ADVICE.get(error.reason, FAILURE_ADVICE["unknown"])
+    render(title)
+    st.markdown(advice)
+
+# ---------------------------------
+# 백그라운드 추출 작업
+# ---------------------------------
+# 진행 중인 작업이 있을 때 화면을 다시 그리는 간격 (초)
+JOB_POLL_INTERVAL = 0.7
+
+def run_extraction_job(progress, clean_url, vid, langs, use_cache, timeout, hedge, show_meta, session_id):
+    """워커 스레드에서 실행: 메타 정보 조회 후 자막 추출 (화면 출력은 진행 이벤트로만)"""
+    reporter = Reporter(progress)
+    info = None
+    # 메타 정보 조회부터 마지막 백엔드까지 같은 제한 시간을 나눠 씀
+    deadline = Deadline(timeout)
+    cache = get_transcript_cache()
+    cached = use_cache and cache.contains(vid, langs)
+
+    # 메타 정보 표시 (캐시 적중이면 저장된 정보만 쓰고 네트워크 요청은 하지 않음)
+    if show_meta:
+        info = cache.get_meta(vid)
+        if info is None and not cached:
+            info = fetch_video_meta(clean_url, deadline=deadline)
+            if info:
+                cache.put_meta(vid, info)
+        if info:
+            length_min = int((info.length or 0) / 60) if info.length else 0
+            reporter.success(f"**📹 제목**: {info.title}")
+            reporter.info(f"**⏱️ 길이**: 약 {length_min}분")
+        elif not cached:
+            reporter.detail("영상 정보 조회 실패 - 자막 추출을 계속 진행합니다.")
+
+    transcript = fetch_transcript(
+        clean_url, vid, langs,
+        use_cache=use_cache,
+        session_id=session_id,
+        progress=progress,
+        deadline=deadline,
+        hedge=hedge,
+    )
+    if info and info.title:
+        set_indexed_title(vid, info.title)
+    return transcript
+
+def get_cleaning_variants(job):
+    """세션별 정리 결과 메모 (같은 작업 결과면 재실행 간 재사용, 네트워크 요청 없음)"""
+    memo = st.session_state.get("cleaning_variants")
+    if memo is None or memo[0] is not job:
+        memo = (job, CleaningVariants(job.result))
+        st.session_state.cleaning_variants = memo
+        reset_viewer_pages()
+    return memo[1]
+
+def format_duration(seconds):
+    """초 → "1시간 2분" / "3분 4초" 형식"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}시간 {minutes}분"
+    return f"{minutes}분 {secs}초"
+
+def show_transcript_result(variants, vid, clean_duplicates, merge_consecutive, remove_overlap, show_original,
+                           export_format_name):
+    """추출된 자막과 통계, 다운로드 버튼 표시"""
+    # 자막 정리 적용 (옵션 조합별로 처음 한 번만 계산, 통계도 이때 함께)
+    if not variants.is_computed(clean_duplicates, merge_consecutive, remove_overlap):
+        with st.spinner("🧹 자막 정리 중..."):
+            _ = variants.get(clean_duplicates, merge_consecutive, remove_overlap).stats
+
+    raw_transcript = variants.raw
+    cleaned_transcript = variants.get(clean_duplicates, merge_consecutive, remove_overlap)
+    # 통계는 결과 객체마다 한 번만 계산되어 보관됨
+    raw_stats = raw_transcript.stats
+    cleaned_stats = cleaned_transcript.stats
+    is_cleaned = cleaned_transcript is not raw_transcript
+
+    # 결과 출력
+    st.success("🎉 자막 추출 완료!")
+    
+    # 통계 정보
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        st.metric("원본", f"{raw_stats.words:,}개 단어", f"{raw_stats.segments}줄")
+    
+    with col2:
+        if is_cleaned:
+            word_reduction = raw_stats.words - cleaned_stats.words
+            line_reduction = raw_stats.segments - cleaned_stats.segments
+            st.metric("정리됨", f"{cleaned_stats.words:,}개 단어", f"-{word_reduction} 단어, -{line_reduction} 줄")
+        else:
+            st.metric("정리됨", "비활성화", "설정에서 활성화 가능")
+    
+    with col3:
+        efficiency = (cleaned_stats.chars / raw_stats.chars * 100) if raw_stats.chars else 0
+        st.metric("압축률", f"{efficiency:.1f}%", "")
+
+    if raw_stats.span > 0:
+        st.caption(
+            f"⏱️ 자막 범위 {format_duration(raw_stats.span)} · "
+            f"자막 표시 시간 {raw_stats.coverage * 100:.0f}% · "
+            f"분당 {raw_stats.segments_per_minute:.1f}개 구간"
+        )
+
+    # 다운로드 버튼들 (파일 내용은 버튼을 누를 때 만든다)
+    st.subheader("💾 다운로드")
+    download_col1, download_col2 = st.columns([1, 1])
+    
+    export_format = FORMATS[export_format_name]
+    
+    with download_col1:
+        st.download_button(
+            f"📄 정리된 자막 다운로드 ({export_format.label})",
+            data=lambda: export_bytes(cleaned_transcript, export_format_name, vid),
+            file_name=f"transcript_cleaned_{vid}.{export_format.extension}",
+            mime=export_format.mime,
+            on_click="ignore",
+        )
+    
+    with download_col2:
+        if show_original:
+            st.download_button(
+                f"📄 원본 자막 다운로드 ({export_format.label})",
+                data=lambda: export_bytes(raw_transcript, export_format_name, vid),
+                file_name=f"transcript_original_{vid}.{export_format.extension}",
+                mime=export_format.mime,
+                on_click="ignore",
+            )
+
+    # 자막 내용 표시
+    st.subheader("📜 자막 내용")
+    
+    if show_original and is_cleaned:
+        # 원본과 정리된 것을 탭으로 분리
+        tab1, tab2 = st.tabs(["🧹 정리된 자막", "📋 원본 자막"])
+        
+        with tab1:
+            show_transcript_viewer(
+                cleaned_transcript,
+                "cleaned",
+                "중복 제거 및 병합이 적용된 자막입니다",
+            )
+        
+        with tab2:
+            show_transcript_viewer(raw_transcript, "original", "원본 자막 그대로입니다")
+    else:
+        # 하나만 표시
+        show_transcript_viewer(
+            cleaned_transcript,
+            "transcript",
+            "자막 내용을 확인하고 복사할 수 있습니다",
+        )
+
+def export_cache_zip(export_format_name, clean_duplicates, merge_consecutive, remove_overlap):
+    """캐시의 모든 영상을 현재 정리 옵션으로 zip 하나에 (다운로드 버튼을 누를 때 실행)"""
+    entries = (
+        (video_id, apply_subtitle_cleaning(transcript, clean_duplicates, merge_consecutive, remove_overlap))
+        for video_id, transcript in get_transcript_cache().iter_transcripts()
+    )
+    buffer = io.BytesIO()
+    write_zip(entries, buffer, export_format_name)
+    return buffer.getvalue()
+
+# ---------------------------------
+# 페이지 단위 자막 뷰어
+# ---------------------------------
+VIEWER_PAGE_SIZES = [100, 200, 500, 1000]
+VIEWER_NAMES = ("cleaned", "original", "transcript")
+
+def reset_viewer_pages():
+    """새 결과를 표시할 때 모든 뷰어를 첫 페이지로"""
+    for name in VIEWER_NAMES:
+        st.session_state.pop(f"{name}_page", None)
+
+def jump_to_time(name, transcript):
+    """'이동' 버튼 콜백: 입력한 시각이 들어 있는 페이지로 이동 (위젯이 그려지기 전에 실행됨)"""
+    value = st.session_state.get(f"{name}_jump", "")
+    try:
+        seconds = parse_clock_time(value)
+    except ValueError:
+        st.session_state[f"{name}_jump_error"] = value
+        return
+    page_size = st.session_state.get(f"{name}_page_size", VIEWER_PAGE_SIZES[1])
+    st.session_state[f"{name}_page"] = transcript.index_at(seconds) // page_size + 1
+
+def show_transcript_viewer(transcript, name, help_text):
+    """현재 페이지의 구간만 브라우저로 보내는 자막 뷰어"""
+    total = len(transcript)
+    page_key = f"{name}_page"
+
+    size_col, page_col, jump_col, button_col = st.columns([1, 1, 2, 1], vertical_alignment="bottom")
+    with size_col:
+        page_size = st.selectbox("페이지당 구간 수", VIEWER_PAGE_SIZES, index=1, key=f"{name}_page_size")
+    page_count = max(1, -(-total // page_size))
+    # 정리 옵션/페이지 크기가 바뀌어 페이지 수가 줄었으면 마지막 페이지로
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    with page_col:
+        page = st.number_input("페이지", min_value=1, max_value=page_count, step=1, key=page_key)
+    with jump_col:
+        st.text_input("시간으로 이동", placeholder="1:23:45, 83:20, 1h2m3s", key=f"{name}_jump")
+    with button_col:
+        st.button("➡️ 이동", key=f"{name}_jump_button", on_click=jump_to_time, args=(name, transcript))
+
+    invalid = st.session_state.pop(f"{name}_jump_error", None)
+    if invalid is not None:
+        st.caption(f"⚠️ 시간 형식을 알 수 없습니다: {invalid}")
+
+    start = (page - 1) * page_size
+    stop = min(total, start + page_size)
+    st.caption(f"{page}/{page_count} 페이지 · {start + 1 if total else 0:,}–{stop:,} / {total:,}개 구간")
+    st.text_area(
+        "", 
+        value="\n".join(transcript.iter_lines(start, stop)), 
+        height=500,
+        help=help_text,
+    )
+
+# ---------------------------------
+# 추출한 자막 검색
+# ---------------------------------
+SEARCH_LIMIT = 100
+_MARKDOWN_SPECIAL_RE = re.compile(r'([\\`*_\[\]<>#|~$])')
+
+def format_clock(seconds):
+    """초 → "1:02:03" / "2:03" 형식 (시간으로 이동 입력과 같은 형식)"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+def escape_markdown(text):
+    return _MARKDOWN_SPECIAL_RE.sub(r"\\\1", text)
+
+def highlight_terms(text, terms):
+    """검색어를 굵게 표시한 마크다운 (자막의 마크다운 문자는 이스케이프)"""
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    parts = []
+    last = 0
+    for match in pattern.finditer(text):
+        parts.append(escape_markdown(text[last:match.start()]))
+        parts.append(f"**{escape_markdown(match.group())}**")
+        last = match.end()
+    parts.append(escape_markdown(text[last:]))
+    return "".join(parts)
+
+def show_search_panel():
+    """로컬 색인에서 검색 (네트워크 요청 없음), 결과는 해당 시각 링크로"""
+    try:
+        index = get_search_index()
+        index_stats = index.stats()
+    except (sqlite3.Error, OSError):
+        # SQLite에 FTS5/trigram이 없거나 색인 파일이 잠김/손상 - 검색 기능만 숨김
+        return
+    st.subheader("🔎 추출한 자막 검색")
+    query = st.text_input(
+        "검색어",
+        placeholder="지금까지 추출한 모든 영상에서 찾을 문구 (\"...\"로 묶으면 구절 검색)",
+        help=f"{MIN_MATCH_CHARS}글자 이상 검색어는 전문 검색 색인을 사용합니다 "
+             f"({MIN_MATCH_CHARS}글자 미만 검색어만 있으면 전체 구간을 훑어서 느릴 수 있음)",
+        key="search_query",
+    )
+    if not query.strip():
+        st.caption(f"색인된 영상 {index_stats['videos']:,}개 · {index_stats['segments']:,}개 구간")
+        return
+
+    started = time.perf_counter()
+    try:
+        hits = index.search(query, limit=SEARCH_LIMIT)
+    except sqlite3.Error:
+        st.caption(f"⚠️ {INDEX_UNAVAILABLE_MESSAGE}")
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    more = "+" if len(hits) >= SEARCH_LIMIT else ""
+    st.caption(f"{len(hits)}{more}개 결과 · {elapsed_ms:.1f}ms · 색인된 영상 {index_stats['videos']:,}개")
+
+    terms = split_terms(query)
+    by_video = {}
+    for hit in hits:
+        by_video.setdefault(hit.video_id, []).append(hit)
+    for video_id, video_hits in by_video.items():
+        title = escape_markdown(video_hits[0].title or video_id)
+        with st.expander(f"📹 {title} ({len(video_hits)}개)", expanded=len(by_video) <= 3):
+            for hit in video_hits:
+                st.markdown(
+                    f"[{format_clock(hit.start)}]({to_timestamp_url(video_id, hit.start)}) "
+                    f"{highlight_terms(hit.text, terms)}"
+                )
+
+# ---------------------------------
+# 백엔드 지표
+# ---------------------------------
+def show_backend_metrics():
+    """현재 시도 순서(최근 성공률, 평균 시간)와 이 프로세스의 백엔드별 누적 지표 (모든 세션 합계)"""
+    scores = sorted(get_backend_scoreboard().scores(), key=lambda s: s.score, reverse=True)
+    st.caption("시도 순서: " + " → ".join(
+        f"{score.backend.upper()} ({score.success_rate * 100:.0f}%, {score.seconds:.1f}초)" for score in scores
+    ))
+    for breaker in get_circuit_breakers():
+        if breaker.state == BREAKER_OPEN:
+            st.caption(f"⛔ {breaker.name.upper()} 일시 중단 ({breaker.last_reason}, {breaker.remaining():.0f}초 남음)")
+        elif breaker.state == BREAKER_HALF_OPEN:
+            st.caption(f"🔁 {breaker.name.upper()} 복구 확인 중")
+    summary = backend_summary()
+    if not summary:
+        st.caption("아직 백엔드를 시도한 기록이 없습니다.")
+    for backend, entry in sorted(summary.items()):
+        success_rate = entry["successes"] / entry["attempts"] * 100
+        average = entry["seconds"] / entry["attempts"]
+        st.caption(
+            f"**{backend.upper()}** · 시도 {entry['attempts']:.0f}회 · 성공 {success_rate:.0f}% · "
+            f"평균 {average:.1f}초 (대기 {entry['sleep']:.1f}초 포함)"
+        )
+    st.download_button(
+        "📥 지표 내보내기 (Prometheus)",
+        data=lambda: REGISTRY.render().encode("utf-8"),
+        file_name="ytsub_metrics.prom",
+        mime="text/plain",
+        on_click="ignore",
+    )
+    if METRICS_PORT:
+        st.caption(f"지표 엔드포인트: http://127.0.0.1:{METRICS_PORT}/metrics")
 
 # ---------------------------------
 # Streamlit UI (향상된 버전)
 # ---------------------------------
 st.set_page_config(page_title="YouTube 자막 추출기 (Anti-Bot)", layout="wide")
+
+# 대시보드 수집용 /metrics 엔드포인트 (환경 변수로 포트를 지정했을 때만)
+METRICS_PORT = os.environ.get("YTSUB_METRICS_PORT")
+if METRICS_PORT:
+    start_http_server(int(METRICS_PORT))
 st.title("🎬 YouTube 자막 추출기")
 st.caption("YouTube 영상의 자막을 추출합니다. 봇 차단 우회 기능 포함.")
 
@@ -825,6 +466,11 @@ with st.sidebar:
         value=True,
         help="같은 내용이 반복되는 자막을 제거합니다"
     )
+    remove_overlap = st.toggle(
+        "롤링 자막 겹침 제거",
+        value=True,
+        help="자동 생성 자막에서 앞 줄을 반복하는 부분을 잘라 새 단어만 남깁니다 (띄어쓰기 단위)"
+    )
     merge_consecutive = st.toggle(
         "연속 자막 병합", 
         value=True,
@@ -837,24 +483,57 @@ with st.sidebar:
         value=False,
         help="정리된 자막과 원본 자막을 모두 표시합니다"
     )
+    export_format_name = st.selectbox(
+        "다운로드 형식",
+        list(FORMATS),
+        format_func=lambda name: FORMATS[name].label,
+        help="SRT/WebVTT/JSON은 원본 자막의 끝 시간을 그대로 사용합니다"
+    )
     
     # 차단 우회 옵션
     st.subheader("🛡️ 차단 우회 설정")
-    base_delay = st.slider(
-        "기본 대기 시간 (초)", 
-        min_value=0.5, 
-        max_value=5.0, 
-        value=2.0,
-        help="요청 간 기본 대기 시간"
+    timeout = st.slider(
+        "전체 제한 시간 (초)",
+        min_value=15,
+        max_value=180,
+        value=int(DEFAULT_DEADLINE),
+        step=5,
+        help="영상 정보 조회부터 모든 방법의 재시도와 대기까지 이 시간 안에 끝냅니다. "
+             "시간이 다 되면 진행 중인 요청을 멈추고 남은 방법은 시도하지 않습니다."
     )
-    
-    max_retries = st.slider(
-        "최대 재시도 횟수", 
-        min_value=1, 
-        max_value=5, 
-        value=3,
-        help="각 방법별 최대 재시도 횟수"
+    hedge = st.toggle(
+        "느린 방법 기다리는 동안 다음 방법 동시 시도",
+        value=False,
+        help="시도 중인 방법이 평소보다 오래 걸리면 다음 방법을 함께 시작하고 먼저 끝난 결과를 씁니다. "
+             f"동시 요청은 최대 {DEFAULT_MAX_IN_FLIGHT}개로 제한됩니다."
+    )
+
+    st.subheader("💾 캐시")
+    use_cache = st.toggle(
+        "저장된 자막 재사용",
+        value=True,
+        help="최근에 추출한 영상은 네트워크 요청 없이 로컬 캐시에서 불러옵니다"
     )
+    cache_stats = get_transcript_cache().stats()
+    st.caption(
+        f"항목 {cache_stats['entries']}개 · {cache_stats['bytes'] / 1024 / 1024:.1f}MB · "
+        f"적중 {cache_stats['hits']} / 미스 {cache_stats['misses']}"
+    )
+    if cache_stats['entries']:
+        st.download_button(
+            f"📦 캐시 전체 내보내기 (zip, {FORMATS[export_format_name].label})",
+            data=functools.partial(export_cache_zip, export_format_name, clean_duplicates, merge_consecutive,
+                                   remove_overlap),
+            file_name=f"transcripts_{export_format_name}.zip",
+            mime="application/zip",
+            on_click="ignore",
+        )
+    if st.button("🗑️ 캐시 비우기"):
+        removed = get_transcript_cache().purge()
+        st.success(f"캐시 항목 {removed}개를 삭제했습니다.")
+
+    with st.expander("📈 백엔드 지표"):
+        show_backend_metrics()
 
 # 메인 입력
 url = st.text_input(
@@ -874,14 +553,6 @@ if run:
         st.warning("URL을 입력하세요.")
         st.stop()
 
-    # 요청 제한 체크
-    import time
-    current_time = time.time()
-    if current_time - st.session_state.last_extraction_time < 10:
-        remaining = 10 - (current_time - st.session_state.last_extraction_time)
-        st.warning(f"⏰ 요청 제한: {remaining:.1f}초 후 다시 시도하세요.")
-        st.stop()
-
     clean_url = to_clean_watch_url(url.strip())
     vid = extract_video_id(clean_url)
     
@@ -889,129 +560,63 @@ if run:
         st.error("❌ 유효한 YouTube 링크가 아닙니다. URL을 다시 확인해주세요.")
         st.stop()
 
+    # 작업 키: (비디오 ID, 언어, 캐시 사용, 제한 시간, 헤지 실행, 메타 표시)
+    job_key = (vid, tuple(lang_pref), use_cache, timeout, hedge, show_meta)
+    job = get_job_manager().get(job_key)
+
+    if job is None or job.finished:
+        # 요청 제한 체크 (진행 중인 같은 작업에 다시 붙을 때와 네트워크 요청이 없는 캐시 적중은 제외)
+        if not (use_cache and get_transcript_cache().contains(vid, list(lang_pref))):
+            current_time = time.time()
+            if current_time - st.session_state.last_extraction_time < 10:
+                remaining = 10 - (current_time - st.session_state.last_extraction_time)
+                st.warning(f"⏰ 요청 제한: {remaining:.1f}초 후 다시 시도하세요.")
+                st.stop()
+
+            # 추출 횟수 업데이트
+            st.session_state.extraction_count += 1
+            st.session_state.last_extraction_time = current_time
+
+        job = get_job_manager().submit(job_key, functools.partial(
+            run_extraction_job,
+            clean_url=clean_url,
+            vid=vid,
+            langs=list(lang_pref),
+            use_cache=use_cache,
+            timeout=timeout,
+            hedge=hedge,
+            show_meta=show_meta,
+            session_id=get_session_fingerprint(),
+        ))
+
+    # 재실행되어도 같은 작업에 다시 붙고, 끝난 결과는 세션에 남는다
+    st.session_state.active_job = job
+
+active_job = st.session_state.get("active_job")
+if active_job is not None:
+    vid = active_job.key[0]
     st.info(f"🎯 비디오 ID: `{vid}`")
 
-    # 추출 횟수 업데이트
-    st.session_state.extraction_count += 1
-    st.session_state.last_extraction_time = current_time
-
-    # 메타 정보 표시
-    if show_meta:
-        with st.spinner("📋 영상 정보 가져오는 중..."):
-            try:
-                info = safe_get_youtube_info_enhanced(clean_url)
-                if info:
-                    title = info.title
-                    length_min = int((info.length or 0) / 60) if info.length else 0
-                    st.success(f"**📹 제목**: {title}")
-                    st.info(f"**⏱️ 길이**: 약 {length_min}분")
-                else:
-                    st.caption("영상 정보 조회 실패 - 자막 추출을 계속 진행합니다.")
-            except Exception:
-                st.caption("영상 정보 조회 실패 - 자막 추출을 계속 진행합니다.")
-
-    # 자막 추출
-    with st.spinner("🔍 자막 추출 중..."):
-        try:
-            raw_transcript = fetch_transcript_resilient_enhanced(clean_url, vid, lang_pref)
-        except TranscriptExtractionError as e:
-            st.error(f"자막 추출 실패: {str(e)}")
-            st.stop()
-        except (NoTranscriptFound, TranscriptsDisabled) as e:
-            st.error(f"자막을 찾을 수 없습니다: {str(e)}")
-            st.stop()
-        except VideoUnavailable:
-            st.error("영상에 접근할 수 없습니다 (비공개, 지역제한, 연령제한 등)")
-            st.stop()
-        except Exception as e:
-            st.error(f"예상치 못한 오류: {str(e)}")
-            st.stop()
-
-    # 자막 정리 적용
-    if clean_duplicates or merge_consecutive:
-        with st.spinner("🧹 자막 정리 중..."):
-            cleaned_transcript = apply_subtitle_cleaning(raw_transcript, clean_duplicates, merge_consecutive)
-    else:
-        cleaned_transcript = raw_transcript
-
-    # 결과 출력
-    st.success("🎉 자막 추출 완료!")
-    
-    # 통계 정보
-    col1, col2, col3 = st.columns([1, 1, 1])
-    with col1:
-        raw_word_count = len(raw_transcript.split())
-        raw_lines = len([l for l in raw_transcript.split('\n') if l.strip()])
-        st.metric("원본", f"{raw_word_count:,}개 단어", f"{raw_lines}줄")
-    
-    with col2:
-        if cleaned_transcript != raw_transcript:
-            cleaned_word_count = len(cleaned_transcript.split())
-            cleaned_lines = len([l for l in cleaned_transcript.split('\n') if l.strip()])
-            word_reduction = raw_word_count - cleaned_word_count
-            line_reduction = raw_lines - cleaned_lines
-            st.metric("정리됨", f"{cleaned_word_count:,}개 단어", f"-{word_reduction} 단어, -{line_reduction} 줄")
+    for event in active_job.events():
+        show_progress(event)
+
+    if not active_job.finished:
+        st.info("⏳ 자막 추출 중... 설정을 바꾸거나 다른 버튼을 눌러도 작업은 계속됩니다.")
+    elif active_job.status == JOB_FAILED:
+        error = active_job.error
+        if isinstance(error, ExtractionFailed):
+            show_failure_analysis(error)
+            st.error(f"자막 추출 실패: {str(error)}")
+        elif isinstance(error, TranscriptExtractionError):
+            st.error(f"자막 추출 실패: {str(error)}")
         else:
-            st.metric("정리됨", "비활성화", "설정에서 활성화 가능")
-    
-    with col3:
-        efficiency = (len(cleaned_transcript) / len(raw_transcript) * 100) if raw_transcript else 0
-        st.metric("압축률", f"{efficiency:.1f}%", "")
-
-    # 다운로드 버튼들
-    st.subheader("💾 다운로드")
-    download_col1, download_col2 = st.columns([1, 1])
-    
-    with download_col1:
-        st.download_button(
-            "📄 정리된 자막 다운로드 (TXT)",
-            data=cleaned_transcript.encode("utf-8"),
-            file_name=f"transcript_cleaned_{vid}.txt",
-            mime="text/plain",
-        )
-    
-    with download_col2:
-        if show_original:
-            st.download_button(
-                "📄 원본 자막 다운로드 (TXT)",
-                data=raw_transcript.encode("utf-8"),
-                file_name=f"transcript_original_{vid}.txt",
-                mime="text/plain",
-            )
-
-    # 자막 내용 표시
-    st.subheader("📜 자막 내용")
-    
-    if show_original and cleaned_transcript != raw_transcript:
-        # 원본과 정리된 것을 탭으로 분리
-        tab1, tab2 = st.tabs(["🧹 정리된 자막", "📋 원본 자막"])
-        
-        with tab1:
-            st.text_area(
-                "", 
-                value=cleaned_transcript, 
-                height=500,
-                help="중복 제거 및 병합이 적용된 자막입니다",
-                key="cleaned_transcript"
-            )
-        
-        with tab2:
-            st.text_area(
-                "", 
-                value=raw_transcript, 
-                height=500,
-                help="원본 자막 그대로입니다",
-                key="original_transcript"
-            )
+            st.error(f"예상치 못한 오류: {str(error)}")
     else:
-        # 하나만 표시
-        display_transcript = cleaned_transcript if (clean_duplicates or merge_consecutive) else raw_transcript
-        st.text_area(
-            "", 
-            value=display_transcript, 
-            height=500,
-            help="자막 내용을 확인하고 복사할 수 있습니다"
-        )
+        show_transcript_result(get_cleaning_variants(active_job), vid, clean_duplicates, merge_consecutive,
+                               remove_overlap, show_original, export_format_name)
+
+st.markdown("---")
+show_search_panel()
 
 # 하단 정보 및 팁
 st.markdown("---")
@@ -1069,3 +674,8 @@ with st.expander("🔧 트러블슈팅 가이드"):
     """)
 
 st.caption("⚠️ 이 도구는 교육 및 연구 목적으로만 사용하세요. YouTube 서비스 약관을 준수해주세요.")
+
+# 진행 중인 작업이 있으면 잠시 후 다시 실행해서 진행 상황 갱신
+if active_job is not None and not active_job.finished:
+    time.sleep(JOB_POLL_INTERVAL)
+    st.rerun()
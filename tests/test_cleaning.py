@@ -0,0 +1,222 @@
+"""자막 정리 함수와 기존(문자열 기반) 구현의 결과 비교."""
+import random
+import re
+
+import pytest
+
+from ytsub.cleaning import (
+    ContainmentIndex,
+    clean_duplicate_subtitles,
+    merge_consecutive_subtitles,
+    suffix_prefix_overlap,
+)
+from ytsub.model import Transcript
+
+
+# ---------------------------------
+# 기준 구현 (색인 도입 전 streamlit_app.py의 함수 그대로)
+# ---------------------------------
+def reference_clean_duplicate_subtitles(transcript_text: str) -> str:
+    lines = transcript_text.strip().split('\n')
+    cleaned_lines = []
+    seen_texts = set()
+
+    for line in lines:
+        if not line.strip():
+            continue
+
+        match = re.match(r'\[(\d+\.?\d*)\]\s*(.*)', line)
+        if not match:
+            continue
+
+        timestamp = float(match.group(1))
+        text = match.group(2).strip()
+
+        if not text or text in ['[Music]', '[Applause]', '[Laughter]']:
+            continue
+
+        text_lower = text.lower()
+
+        if text_lower in seen_texts:
+            continue
+
+        is_duplicate = False
+        texts_to_remove = []
+
+        for seen_text in list(seen_texts):
+            if text_lower in seen_text:
+                is_duplicate = True
+                break
+            elif seen_text in text_lower:
+                texts_to_remove.append(seen_text)
+
+        if not is_duplicate:
+            for old_text in texts_to_remove:
+                seen_texts.discard(old_text)
+
+            seen_texts.add(text_lower)
+            cleaned_lines.append(f"[{timestamp:.1f}] {text}")
+
+    return '\n'.join(cleaned_lines)
+
+
+def reference_merge_consecutive_subtitles(transcript_text: str, time_threshold: float = 2.0) -> str:
+    lines = transcript_text.strip().split('\n')
+    merged_lines = []
+
+    i = 0
+    while i < len(lines):
+        if not lines[i].strip():
+            i += 1
+            continue
+
+        match = re.match(r'\[(\d+\.?\d*)\]\s*(.*)', lines[i])
+        if not match:
+            i += 1
+            continue
+
+        current_time = float(match.group(1))
+        current_text = match.group(2).strip()
+
+        merged_text = current_text
+        j = i + 1
+
+        while j < len(lines):
+            next_match = re.match(r'\[(\d+\.?\d*)\]\s*(.*)', lines[j])
+            if not next_match:
+                j += 1
+                continue
+
+            next_time = float(next_match.group(1))
+            next_text = next_match.group(2).strip()
+
+            if (next_time - current_time) > time_threshold:
+                break
+
+            if (current_text.lower() in next_text.lower() or
+                    next_text.lower() in current_text.lower()):
+                if len(next_text) > len(merged_text):
+                    merged_text = next_text
+                j += 1
+            else:
+                break
+
+        merged_lines.append(f"[{current_time:.1f}] {merged_text}")
+        i = max(i + 1, j)
+
+    return '\n'.join(merged_lines)
+
+
+def reference_suffix_prefix_overlap(previous, current) -> int:
+    for size in range(min(len(previous), len(current)), 0, -1):
+        if previous[len(previous) - size:] == current[:size]:
+            return size
+    return 0
+
+
+# ---------------------------------
+# 입력 생성
+# ---------------------------------
+ALPHABETS = {
+    "latin": "abAB ",
+    "hangul": "가나다라 ",
+    "cjk": "日本語字幕 ",
+}
+NOISE = ['[Music]', '[Applause]', '[Laughter]']
+
+
+def random_lines(rng: random.Random, alphabet: str, count: int, max_len: int) -> str:
+    """짧은 줄, 빈 텍스트, 완전 반복, 효과음 태그가 섞인 "[t] text" 문자열"""
+    lines = []
+    texts = []
+    t = 0.0
+    for _ in range(count):
+        t = round(t + rng.choice((0.0, 0.5, 1.0, 1.5, 2.5)), 1)
+        roll = rng.random()
+        if roll < 0.1:
+            text = ""
+        elif roll < 0.15:
+            text = rng.choice(NOISE)
+        elif roll < 0.3 and texts:
+            text = rng.choice(texts)
+        else:
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, max_len)))
+        texts.append(text)
+        lines.append(f"[{t:.1f}] {text}")
+    return '\n'.join(lines)
+
+
+def random_cases():
+    rng = random.Random(1234)
+    for name, alphabet in ALPHABETS.items():
+        for max_len in (2, 4, 12):
+            for _ in range(150):
+                yield name, random_lines(rng, alphabet, rng.randint(0, 30), max_len)
+
+
+EDGE_CASES = [
+    "",
+    "[0.0] ",
+    "[0.0] a\n[1.0] a\n[2.0] a",
+    "[0.0] ab\n[1.0] b\n[2.0] abc\n[3.0] bc",
+    "[0.0] 가\n[0.5] 가나\n[1.0] 나\n[4.0] 가나다",
+    "[0.0] 字幕\n[1.0] 日本語字幕\n[2.0] 字\n[3.0] 語字",
+    "[0.0] [Music]\n[1.0] hello\n[2.0] HELLO\n[3.0] Hello world\n[4.0] world",
+    "[0.0] x\n\n[1.0] xy\n[1.5]\n[2.0] xyz",
+]
+
+
+def cleaned(func, text: str) -> str:
+    return func(Transcript.from_text(text)).to_text()
+
+
+# ---------------------------------
+# 테스트
+# ---------------------------------
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_clean_duplicates_edge_cases(text):
+    assert cleaned(clean_duplicate_subtitles, text) == reference_clean_duplicate_subtitles(text)
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_merge_consecutive_edge_cases(text):
+    assert cleaned(merge_consecutive_subtitles, text) == reference_merge_consecutive_subtitles(text)
+
+
+def test_clean_duplicates_matches_reference():
+    for name, text in random_cases():
+        assert cleaned(clean_duplicate_subtitles, text) == reference_clean_duplicate_subtitles(text), (name, text)
+
+
+def test_merge_consecutive_matches_reference():
+    for name, text in random_cases():
+        assert cleaned(merge_consecutive_subtitles, text) == reference_merge_consecutive_subtitles(text), (name, text)
+
+
+def test_clean_then_merge_matches_reference():
+    for name, text in random_cases():
+        expected = reference_merge_consecutive_subtitles(reference_clean_duplicate_subtitles(text))
+        result = merge_consecutive_subtitles(clean_duplicate_subtitles(Transcript.from_text(text)))
+        assert result.to_text() == expected, (name, text)
+
+
+def test_containment_index_short_queries():
+    index = ContainmentIndex(n=3)
+    assert not index.contains("")
+    index.add("日本語")
+    assert index.contains("")
+    assert index.contains("本")
+    assert index.contains("本語")
+    assert index.contains("日本語")
+    assert not index.contains("語日")
+    assert not index.contains("日本語字")
+
+
+def test_suffix_prefix_overlap_matches_brute_force():
+    rng = random.Random(5678)
+    for _ in range(5000):
+        words = "ab" if rng.random() < 0.5 else "abc"
+        previous = [rng.choice(words) for _ in range(rng.randint(0, 8))]
+        current = [rng.choice(words) for _ in range(rng.randint(0, 8))]
+        assert suffix_prefix_overlap(previous, current) == reference_suffix_prefix_overlap(previous, current), \
+            (previous, current)
@@ -0,0 +1,424 @@
+"""자막 포맷별 스트리밍 파서 테스트."""
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.fixtures import SCRIPTS, STYLES, generate_cues, render_json3, render_vtt
+from ytsub.model import Transcript
+from ytsub.parsers import (
+    DEFAULT_FORMAT_PREFERENCE,
+    TTMLTiming,
+    iter_json3_cues,
+    iter_text_windows,
+    iter_timedtext_cues,
+    iter_ttml_cues,
+    iter_vtt_cues,
+    parse_json3,
+    parse_json3_stream,
+    parse_vtt,
+    parse_vtt_stream,
+    rank_subtitle_formats,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def chunked(data: str, size: int):
+    """문서를 `size` 바이트씩 잘라서 네트워크 스트림처럼 공급 (멀티바이트 문자도 중간에서 잘림)"""
+    raw = data.encode("utf-8")
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+def assert_cues(actual, expected):
+    actual = list(actual)
+    assert len(actual) == len(expected), actual
+    for (start, end, text), (exp_start, exp_end, exp_text) in zip(actual, expected):
+        assert text == exp_text
+        assert start == pytest.approx(exp_start)
+        if exp_end is None:
+            assert math.isnan(end)
+        else:
+            assert end == pytest.approx(exp_end)
+
+
+# ---------------------------------
+# WebVTT
+# ---------------------------------
+def reference_parse_vtt(vtt: str) -> Transcript:
+    """스트리밍 파서 도입 전의 parse_vtt 그대로 (시작 시간과 텍스트만 비교에 사용).
+
+    닫는 태그를 공백으로 바꾸면서 줄 끝에 공백이 남던 것만 비교할 때 정리한다.
+    """
+    transcript = Transcript()
+    blocks = [b for b in vtt.strip().split("\n\n") if "-->" in b]
+
+    for block in blocks:
+        rows = block.split("\n")
+        if not rows:
+            continue
+
+        ts = rows[0]
+        m = re.match(r"(\d+):(\d+):(\d+(?:\.\d+)?)", ts.replace(",", "."))
+
+        start = 0.0
+        if m:
+            h, m_, s = m.groups()
+            start = int(h) * 3600 + int(m_) * 60 + float(s)
+
+        text = " ".join(rows[1:]).strip()
+        text = re.sub(r"<.*?>", " ", text)
+        text = re.sub(r"\s+", " ", text)
+        if text:
+            transcript.append(start, text)
+
+    return transcript
+
+
+VTT_DOC = """WEBVTT
+Kind: captions
+Language: ko
+
+STYLE
+::cue(.yellow) { color: yellow; }
+
+NOTE
+여러 줄
+주석
+
+REGION
+id:fred width:40%
+
+1
+00:00:01.000 --> 00:00:02.500 align:start position:0% line:90%
+첫 번째 <c.yellow>자막</c>
+
+intro
+00:03.000 --> 00:04,250
+<v Roger Bingham>We are in New York City &amp; it&#39;s sunny</v>
+
+00:00:05.000 --> 00:00:07.000 align:start position:0%
+ 
+roll<00:00:05.500><c> words</c><00:00:06.000><c> here</c>
+
+00:00:07.000 --> 00:00:07.010 align:start position:0%
+ 
+ 
+
+01:00:00.000 --> 01:00:01.000
+마지막<i>줄</i>
+two lines
+"""
+
+VTT_EXPECTED = [
+    (1.0, 2.5, "첫 번째 자막"),
+    (3.0, 4.25, "We are in New York City & it's sunny"),
+    (5.0, 7.0, "roll words here"),
+    (3600.0, 3601.0, "마지막줄 two lines"),
+]
+
+VTT_VARIANTS = {
+    "lf": VTT_DOC,
+    "crlf": VTT_DOC.replace("\n", "\r\n"),
+    "bom": "\ufeff" + VTT_DOC,
+    "no_final_newline": VTT_DOC.rstrip("\n"),
+    "trailing_blank_lines": VTT_DOC + "\n\n\n",
+}
+
+
+@pytest.mark.parametrize("variant", sorted(VTT_VARIANTS))
+def test_vtt_document(variant):
+    assert_cues(iter_vtt_cues((VTT_VARIANTS[variant],)), VTT_EXPECTED)
+
+
+@pytest.mark.parametrize("variant", sorted(VTT_VARIANTS))
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 13, 64, 1 << 16])
+def test_vtt_chunk_size_does_not_change_output(variant, size):
+    # 큐, CRLF, 멀티바이트 문자가 청크 경계에서 잘려도 결과가 같아야 함
+    assert_cues(iter_vtt_cues(chunked(VTT_VARIANTS[variant], size)), VTT_EXPECTED)
+
+
+def test_vtt_str_chunks_match_bytes():
+    text_chunks = [VTT_DOC[i:i + 10] for i in range(0, len(VTT_DOC), 10)]
+    assert parse_vtt_stream(text_chunks).to_text() == parse_vtt(VTT_DOC).to_text()
+    assert list(parse_vtt(VTT_DOC).items()) == list(parse_vtt_stream(chunked(VTT_DOC, 4)).items())
+
+
+@pytest.mark.parametrize("size", [1, 3, 64])
+def test_text_windows_end_on_block_boundaries(size):
+    windows = list(iter_text_windows(chunked(VTT_VARIANTS["crlf"], size)))
+    assert all("\r" not in window and window.endswith("\n") for window in windows)
+    # 각 창은 완성된 블록들로만 이루어지므로 창을 블록으로 나누면 원래 블록 순서 그대로
+    blocks = [b.strip("\n") for window in windows for b in window.split("\n\n") if b.strip()]
+    assert blocks == [b.strip("\n") for b in VTT_DOC.split("\n\n") if b.strip()]
+
+
+@pytest.mark.parametrize("style", STYLES)
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_vtt_matches_reference(style, script):
+    cues = generate_cues(120, style, script)
+    document = render_vtt(cues, style).decode("utf-8")
+    expected = reference_parse_vtt(document)
+    for size in (97, 1 << 16):
+        result = parse_vtt_stream(chunked(document, size))
+        assert list(result.starts) == list(expected.starts)
+        assert list(result.texts()) == [" ".join(text.split()) for text in expected.texts()]
+
+
+# ---------------------------------
+# json3
+# ---------------------------------
+JSON3_DOC = json.dumps({"wireMagic": "pb3", "events": [
+    # 창 정의 (segs 없음)
+    {"tStartMs": 0, "dDurationMs": 9000, "id": 1, "wpWinPosId": 1, "wsWinStyleId": 1},
+    # 단어별 세그먼트
+    {"tStartMs": 1000, "dDurationMs": 2000, "wWinId": 1, "segs": [
+        {"utf8": "Hello", "acAsrConf": 0},
+        {"utf8": " big", "tOffsetMs": 400, "acAsrConf": 0},
+        {"utf8": " world", "tOffsetMs": 800, "acAsrConf": 0},
+    ]},
+    # 줄바꿈만 있는 aAppend 이벤트
+    {"tStartMs": 3000, "dDurationMs": 10, "wWinId": 1, "aAppend": 1, "segs": [{"utf8": "\n"}]},
+    {"tStartMs": 3010, "dDurationMs": 10, "wWinId": 1, "segs": [{"utf8": "  "}]},
+    {"tStartMs": 4000, "wWinId": 1, "segs": [{"utf8": "첫 줄\n둘째  줄"}]},
+    {"dDurationMs": 500, "segs": [{"utf8": " no start "}, {}]},
+]}, ensure_ascii=False)
+
+JSON3_EXPECTED = [
+    (1.0, 3.0, "Hello big world"),
+    (4.0, None, "첫 줄 둘째 줄"),
+    (0.0, 0.5, "no start"),
+]
+
+
+def test_json3_events():
+    assert_cues(iter_json3_cues(JSON3_DOC), JSON3_EXPECTED)
+
+
+@pytest.mark.parametrize("size", [1, 7, 1 << 16])
+def test_json3_chunked(size):
+    assert_cues(parse_json3_stream(chunked(JSON3_DOC, size)).items(), JSON3_EXPECTED)
+    assert parse_json3(JSON3_DOC).to_text() == parse_json3_stream(chunked(JSON3_DOC, size)).to_text()
+
+
+@pytest.mark.parametrize("data", ["", "not json", "[1, 2]", '{"events": null}', '{"wireMagic": "pb3"}'])
+def test_json3_invalid_documents(data):
+    assert len(parse_json3(data)) == 0
+
+
+@pytest.mark.parametrize("style", STYLES)
+def test_json3_matches_generated_cues(style):
+    cues = generate_cues(120, style, "latin")
+    result = list(iter_json3_cues(render_json3(cues, style)))
+    assert [text for _start, _end, text in result] == [" ".join(words) for _start, _end, words in cues]
+    assert [start for start, _end, _text in result] == pytest.approx([start for start, _end, _words in cues],
+                                                                      abs=0.001)
+
+
+# ---------------------------------
+# 포맷 선택
+# ---------------------------------
+FORMATS = [
+    {"ext": "vtt", "url": "https://example.com/vtt"},
+    {"ext": "srt", "url": "https://example.com/srt"},
+    {"ext": "JSON3", "url": "https://example.com/json3"},
+    {"ext": "srv3", "url": "https://example.com/srv3"},
+    {"ext": "srv1"},
+    {"ext": "ttml", "url": "https://example.com/ttml"},
+    {"ext": "srv2", "url": "https://example.com/srv2"},
+    {"url": "https://example.com/no-ext"},
+]
+
+
+def ranked_urls(formats, *args):
+    return [f["url"].rsplit("/", 1)[-1] for f in rank_subtitle_formats(formats, *args)]
+
+
+@pytest.mark.skipif("YTSUB_SUBTITLE_FORMATS" in os.environ, reason="기본 선호 순서가 환경 변수로 바뀌어 있음")
+def test_default_format_preference_order():
+    assert DEFAULT_FORMAT_PREFERENCE == ("srv1", "srv2", "ttml", "json3", "srv3", "vtt", "webvtt")
+    # URL이 없거나 파서가 없는 포맷(srt)은 빠지고, 확장자는 대소문자를 가리지 않음
+    assert ranked_urls(FORMATS) == ["srv2", "ttml", "json3", "srv3", "vtt"]
+
+
+def test_custom_format_preference():
+    assert ranked_urls(FORMATS, ("vtt", "json3")) == ["vtt", "json3"]
+    # 파서가 없는 확장자는 선호 목록에 있어도 무시
+    assert ranked_urls(FORMATS, ("srt", "srv3", "bogus")) == ["srv3"]
+    assert ranked_urls(FORMATS, ()) == []
+    assert ranked_urls([], ("vtt",)) == []
+
+
+def test_format_preference_env_override():
+    code = ("from ytsub.parsers import DEFAULT_FORMAT_PREFERENCE, rank_subtitle_formats\n"
+            "print(','.join(DEFAULT_FORMAT_PREFERENCE))\n"
+            "formats = [{'ext': e, 'url': e} for e in ('srv1', 'vtt', 'json3', 'ttml')]\n"
+            "print(','.join(f['url'] for f in rank_subtitle_formats(formats)))\n")
+    env = dict(os.environ, YTSUB_SUBTITLE_FORMATS=" JSON3 , vtt,,bogus")
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout.split()
+    assert output == ["json3,vtt,bogus", "json3,vtt"]
+
+
+# ---------------------------------
+# TTML 시간 표현
+# ---------------------------------
+@pytest.mark.parametrize("expr, expected", [
+    ("00:00:01.500", 1.5),
+    ("01:02:03.250", 3723.25),
+    ("1:02:03.25", 3723.25),
+    ("00:00:10,5", 10.5),
+    ("00:01:00", 60.0),
+    ("00:00:01:15", 1.5),
+    ("12.5s", 12.5),
+    ("500ms", 0.5),
+    ("2m", 120.0),
+    ("1.5h", 5400.0),
+    ("15f", 0.5),
+    ("3t", 3.0),
+    (" 00:00:02.000 ", 2.0),
+])
+def test_ttml_time_expressions(expr, expected):
+    assert TTMLTiming().seconds(expr) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("expr", [None, "", "abc", "10x", "00:0:01", "1:2"])
+def test_ttml_time_expressions_invalid(expr):
+    assert TTMLTiming().seconds(expr) is None
+
+
+def test_ttml_timing_from_root_ticks():
+    timing = TTMLTiming.from_root({"http://www.w3.org/ns/ttml#parameter}tickRate": "10000000"})
+    assert timing.seconds("10000000t") == pytest.approx(1.0)
+    assert timing.seconds("25000000t") == pytest.approx(2.5)
+
+
+def test_ttml_timing_from_root_frames():
+    timing = TTMLTiming.from_root({
+        "http://www.w3.org/ns/ttml#parameter}frameRate": "30",
+        "http://www.w3.org/ns/ttml#parameter}frameRateMultiplier": "1000 1001",
+        "http://www.w3.org/ns/ttml#parameter}subFrameRate": "2",
+    })
+    frame_rate = 30 * 1000 / 1001
+    assert timing.seconds("30f") == pytest.approx(30 / frame_rate)
+    assert timing.seconds("00:00:01:15") == pytest.approx(1 + 15 / frame_rate)
+    assert timing.seconds("00:00:01:15.1") == pytest.approx(1 + 15 / frame_rate + 1 / (2 * frame_rate))
+    # tickRate가 없으면 frameRate * subFrameRate
+    assert timing.seconds("120t") == pytest.approx(120 / (frame_rate * 2))
+
+
+def test_ttml_timing_from_root_invalid_falls_back_to_defaults():
+    timing = TTMLTiming.from_root({"frameRate": "abc"})
+    assert (timing.frame_rate, timing.sub_frame_rate, timing.tick_rate) == (30.0, 1, 1.0)
+
+
+# ---------------------------------
+# TTML 문서
+# ---------------------------------
+TTML_DOC = """<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml" xmlns:ttp="http://www.w3.org/ns/ttml#parameter"
+    xmlns:tts="http://www.w3.org/ns/ttml#styling" ttp:tickRate="10000000">
+<head><styling><style xml:id="s1" tts:color="white"/></styling></head>
+<body><div>
+<p begin="10000000t" end="20000000t">ticks</p>
+<p begin="00:00:03.000" dur="1.5s">begin + dur</p>
+<p begin="4s" end="5s" dur="9s">end wins over dur</p>
+<p begin="6s">open ended</p>
+<p end="7s">no begin</p>
+<p begin="8s" end="9s"><span tts:color="red">한국어</span><br/><span>자막 <span>nested</span> span</span></p>
+<p begin="10s" end="11s">  </p>
+</div></body></tt>"""
+
+TTML_EXPECTED = [
+    (1.0, 2.0, "ticks"),
+    (3.0, 4.5, "begin + dur"),
+    (4.0, 5.0, "end wins over dur"),
+    (6.0, None, "open ended"),
+    (8.0, 9.0, "한국어 자막 nested span"),
+]
+
+
+def test_ttml_document():
+    assert_cues(iter_ttml_cues((TTML_DOC,)), TTML_EXPECTED)
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 4096])
+def test_ttml_document_chunked(size):
+    assert_cues(iter_ttml_cues(chunked(TTML_DOC, size)), TTML_EXPECTED)
+
+
+def test_ttml_container_offsets():
+    doc = """<tt xmlns="http://www.w3.org/ns/ttml"><body begin="1s">
+<div begin="10s"><p begin="1s" end="2s">a</p>
+<div begin="100s"><p begin="0s" dur="1s">b</p></div>
+<p begin="3s" end="4s">c</p></div>
+<div><p begin="5s" end="6s">d</p></div>
+</body></tt>"""
+    assert_cues(iter_ttml_cues((doc,)), [
+        (12.0, 13.0, "a"),
+        (111.0, 112.0, "b"),
+        (14.0, 15.0, "c"),
+        (6.0, 7.0, "d"),
+    ])
+
+
+def test_ttml_truncated_document_keeps_finished_cues():
+    doc = TTML_DOC[:TTML_DOC.index("<p begin=\"4s\"")]
+    assert_cues(iter_ttml_cues((doc,)), TTML_EXPECTED[:2])
+
+
+# ---------------------------------
+# timedtext (srv1/srv2/srv3)
+# ---------------------------------
+def test_timedtext_srv1_entities():
+    # YouTube는 엔티티를 한 번 더 이스케이프해서 보냄 (&amp;#39; → &#39; → ')
+    doc = ('<?xml version="1.0" encoding="utf-8" ?><transcript>'
+           '<text start="0.5" dur="1.25">it&amp;#39;s &amp;amp; &amp;quot;ok&amp;quot;</text>'
+           '<text start="2">Tom &amp;lt;3\nJerry</text>'
+           '<text start="x" dur="1">bad start</text>'
+           '</transcript>')
+    assert_cues(iter_timedtext_cues((doc,)), [
+        (0.5, 1.75, 'it\'s & "ok"'),
+        (2.0, None, "Tom <3 Jerry"),
+    ])
+
+
+def test_timedtext_srv2_milliseconds():
+    doc = ('<?xml version="1.0" encoding="utf-8" ?><timedtext>'
+           '<window t="0" id="1" op="define" rc="15" cc="32" ap="7" ah="50" av="95"/>'
+           '<text t="1500" d="2000" w="1">첫 번째</text>'
+           '<text t="4000" w="1">두 번째</text>'
+           '<text d="100">no start</text>'
+           '</timedtext>')
+    assert_cues(iter_timedtext_cues((doc,)), [
+        (1.5, 3.5, "첫 번째"),
+        (4.0, None, "두 번째"),
+    ])
+
+
+SRV3_DOC = """<?xml version="1.0" encoding="utf-8" ?><timedtext format="3">
+<head><wp id="0" ap="7" ah="0" av="0"/></head>
+<body>
+<p t="0" d="2500" w="1"><s ac="0">Hello</s><s t="400" ac="0"> big</s><s t="800" ac="0"> world</s></p>
+<p t="2500" d="10" w="1" a="1">
+</p>
+<p t="3000" d="1000"><s>outer <s>inner &amp;amp;</s> tail</s><br/>next line</p>
+</body></timedtext>"""
+
+SRV3_EXPECTED = [
+    (0.0, 2.5, "Hello big world"),
+    (3.0, 4.0, "outer inner & tail next line"),
+]
+
+
+def test_timedtext_srv3_word_segments_and_nested_spans():
+    assert_cues(iter_timedtext_cues((SRV3_DOC,)), SRV3_EXPECTED)
+
+
+@pytest.mark.parametrize("size", [1, 5, 64])
+def test_timedtext_srv3_chunked(size):
+    assert_cues(iter_timedtext_cues(chunked(SRV3_DOC, size)), SRV3_EXPECTED)
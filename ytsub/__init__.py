@@ -0,0 +1 @@
+"""YouTube 자막 추출기의 Streamlit 비의존 코어 모듈 모음."""
@@ -0,0 +1,5 @@
+import sys
+
+from ytsub.cli import main
+
+sys.exit(main())
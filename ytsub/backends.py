@@ -0,0 +1,636 @@
+"""자막 추출 백엔드 (youtube_transcript_api, yt-dlp, pytube).
+
+각 백엔드 라이브러리는 해당 백엔드가 처음 선택될 때만 import한다.
+라이브러리 예외는 `ytsub.errors`의 타입으로 바꿔서 올린다.
+"""
+import json
+import random
+import ssl
+import threading
+import time
+from typing import Iterator, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from urllib3 import exceptions as urllib3_exceptions
+
+from ytsub.deadline import Deadline
+from ytsub.errors import (
+    CAPTION_REQUEST,
+    PAGE_REQUEST,
+    BlockedError,
+    DeadlineExceeded,
+    NoTranscriptError,
+    RateLimitedError,
+    TranscriptExtractionError,
+    TransientError,
+    VideoUnavailableError,
+    error_for_status,
+)
+from ytsub.httpclient import MAX_ATTEMPTS, get_http_client
+from ytsub.memo import ttl_memoize
+from ytsub.metrics import STAGE_SECONDS, TimedChunks, span
+from ytsub.model import Transcript, VideoInfo
+from ytsub.parsers import (
+    DEFAULT_FORMAT_PREFERENCE,
+    SUBTITLE_PARSERS,
+    clean_xml_text,
+    parse_srt_timestamp,
+    rank_subtitle_formats,
+)
+from ytsub.progress import Reporter
+from ytsub.stealth import get_realistic_headers
+from ytsub.urls import to_clean_watch_url
+
+# SSL 인증서 문제 해결
+ssl._create_default_https_context = ssl._create_unverified_context
+
+BACKEND_NAMES = ("yta", "ytdlp", "pytube")
+
+# 요청 하나의 기본 HTTP 시간 초과 (남은 제한 시간이 더 짧으면 그만큼으로 줄임, 초)
+REQUEST_TIMEOUT = 30.0
+
+
+# ---------------------------------
+# 실패 분류
+# ---------------------------------
+# 서버가 이보다 오래 기다리라고 하면 기다리지 않고 다음 백엔드로 넘어감 (초)
+MAX_RETRY_WAIT = 30.0
+# Retry-After가 없을 때의 재시도 대기: 지수 백오프 상한까지 전체 지터 (초)
+RETRY_BACKOFF_BASE = 1.0
+RETRY_BACKOFF_MAX = 8.0
+
+# 연결 실패/시간 초과/커넥션 풀 대기 초과 (requests, yt-dlp의 네트워크 예외는 원인으로 이것들을 담고 있음)
+NETWORK_ERRORS = (
+    TimeoutError,
+    ConnectionError,
+    urllib3_exceptions.TimeoutError,
+    urllib3_exceptions.ProtocolError,
+    urllib3_exceptions.MaxRetryError,
+    urllib3_exceptions.EmptyPoolError,
+)
+
+RETRY_NOTICES = {
+    "rate_limited": "⚠️ API 요청 제한 감지",
+    "transient": "⚠️ 일시적인 서버/네트워크 오류",
+}
+
+
+def _exception_chain(error: BaseException) -> Iterator[BaseException]:
+    """원인 예외까지 따라가기 (__cause__, yt-dlp의 exc_info, __context__ 순)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        exc_info = getattr(error, "exc_info", None)
+        inner = exc_info[1] if isinstance(exc_info, tuple) and len(exc_info) > 1 else None
+        error = error.__cause__ or inner or error.__context__
+
+
+def _http_response(error: BaseException) -> Optional[Tuple[int, Mapping[str, str], str]]:
+    """예외에 담긴 HTTP 상태 코드, 헤더, 요청 URL (httpclient, urllib, requests, yt-dlp 형식)"""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)         # requests
+    if status is None:
+        status = getattr(error, "status", None)             # HTTPStatusError, yt-dlp
+    if status is None:
+        status = getattr(error, "code", None)               # urllib.error.HTTPError
+    if isinstance(status, int) and 400 <= status < 600:
+        headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+        url = getattr(response, "url", None) or getattr(error, "url", None) or ""
+        return status, headers, str(url)
+    return None
+
+
+def _request_kind(url: str) -> str:
+    """실패한 URL이 자막 파일(timedtext API, 자막 baseUrl)인지 영상 페이지/플레이어 API인지"""
+    return CAPTION_REQUEST if "timedtext" in url else PAGE_REQUEST
+
+
+def classify_error(error: BaseException, label: str, request: Optional[str] = None) -> TranscriptExtractionError:
+    """라이브러리 예외를 실패 타입으로 (HTTP 상태 코드, 네트워크 오류 순으로 판단).
+
+    `request`(PAGE_REQUEST/CAPTION_REQUEST)를 주지 않으면 실패한 URL로 판단한다.
+    """
+    if isinstance(error, TranscriptExtractionError):
+        return error
+    chain = list(_exception_chain(error))
+    for cause in chain:
+        response = _http_response(cause)
+        if response is not None:
+            status, headers, url = response
+            return error_for_status(status, f"{label} 실패 (HTTP {status})", headers,
+                                    request or _request_kind(url))
+    for cause in chain:
+        if isinstance(cause, NETWORK_ERRORS):
+            return TransientError(f"{label} 실패 (네트워크 오류: {cause})")
+    return TranscriptExtractionError(f"{label} 실패: {error}")
+
+
+def retry_delay(failure: TranscriptExtractionError, attempt: int) -> Optional[float]:
+    """같은 백엔드로 다시 시도하기 전 대기 시간 (다시 시도할 의미가 없으면 None).
+
+    서버가 Retry-After를 주면 그대로 따르고, 너무 길면 기다리지 않는다.
+    """
+    if not failure.retryable:
+        return None
+    if failure.retry_after is not None:
+        return failure.retry_after if failure.retry_after <= MAX_RETRY_WAIT else None
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt))
+
+
+def retry_notice(failure: TranscriptExtractionError, wait_time: float) -> str:
+    notice = RETRY_NOTICES.get(failure.reason, "⚠️ 오류 감지")
+    source = " (서버 지정 대기)" if failure.retry_after is not None else ""
+    return f"{notice}. {wait_time:.1f}초 후 재시도{source}..."
+
+
+# ---------------------------------
+# youtube_transcript_api
+# ---------------------------------
+def _http_timeout(deadline: Deadline) -> Optional[float]:
+    """공유 HTTP 클라이언트용 시간 초과 (제한이 없으면 클라이언트 기본값)"""
+    if deadline.remaining() is None:
+        return None
+    return deadline.timeout(REQUEST_TIMEOUT, share=MAX_ATTEMPTS)
+
+
+_yta_http_session = None
+_yta_http_session_lock = threading.Lock()
+
+
+def _get_yta_http_session():
+    """YTA가 쓰는 공유 requests 세션 (시도/재시도/세션 사이에 keep-alive 연결을 재사용)"""
+    global _yta_http_session
+    with _yta_http_session_lock:
+        if _yta_http_session is None:
+            import requests
+            _yta_http_session = requests.Session()
+        return _yta_http_session
+
+
+class _DeadlineHTTPClient:
+    """공유 세션으로 요청하면서 요청마다 남은 제한 시간을 시간 초과로 거는 래퍼 (YTA는 기본으로 시간 초과가 없음)"""
+
+    __slots__ = ("_session", "_deadline")
+
+    def __init__(self, session, deadline: Deadline):
+        self._session = session
+        self._deadline = deadline
+
+    @property
+    def cookies(self):
+        return self._session.cookies
+
+    def get(self, url: str, **kwargs):
+        kwargs.setdefault("timeout", self._deadline.timeout(REQUEST_TIMEOUT))
+        return self._session.get(url, **kwargs)
+
+
+def fetch_via_yta_with_enhanced_retry(video_id: str, langs: List[str], max_retries: int = 3,
+                                      reporter: Optional[Reporter] = None, session_id: str = "",
+                                      deadline: Optional[Deadline] = None) -> Transcript:
+    """향상된 재시도 로직이 포함된 YTA 자막 추출"""
+    from youtube_transcript_api import NoTranscriptFound
+    from youtube_transcript_api._transcripts import TranscriptListFetcher
+
+    reporter = reporter or Reporter(backend="yta")
+    deadline = deadline or Deadline()
+
+    for attempt in range(max_retries):
+        try:
+            # 세션 상태 표시
+            reporter.detail(f"🔄 YTA 시도 {attempt + 1}/{max_retries} (세션: {session_id})")
+
+            # YouTubeTranscriptApi.list_transcripts와 같지만 공유 세션에 시간 초과를 걸어서
+            http_client = _DeadlineHTTPClient(_get_yta_http_session(), deadline)
+            with span("list_tracks", "yta"):
+                tl = TranscriptListFetcher(http_client).fetch(video_id)
+
+                try:
+                    tr = tl.find_transcript(langs)
+                except NoTranscriptFound:
+                    tr = tl.find_generated_transcript(langs)
+
+            with span("download", "yta"):
+                entries = tr.fetch()
+            with span("parse", "yta"):
+                transcript = Transcript(
+                    language=tr.language_code,
+                    kind="auto" if tr.is_generated else "manual",
+                    source="yta",
+                )
+                for e in entries:
+                    start = e['start']
+                    duration = e.get('duration')
+                    end = start + duration if duration is not None else float("nan")
+                    # YTA 텍스트에는 줄바꿈이 섞여 있으므로 한 줄로 정리
+                    transcript.append(start, " ".join(e['text'].split()), end)
+            reporter.success(f"자막 추출 성공 (YTA): {tr.language}" + (" [자동생성]" if tr.is_generated else " [수동]"))
+            return transcript
+
+        except TranscriptExtractionError:
+            raise
+        except Exception as e:
+            # 요청 제한(Retry-After 있으면 그만큼)과 일시적 오류만 다시 시도, 나머지는 바로 올림
+            failure = classify_yta_error(e)
+            wait_time = retry_delay(failure, attempt) if attempt < max_retries - 1 else None
+            if wait_time is None or not deadline.allows(wait_time):
+                raise failure from e
+            reporter.warning(retry_notice(failure, wait_time))
+            deadline.sleep(wait_time, failure.reason, "yta")
+
+    raise TranscriptExtractionError("YTA: 시도 횟수가 0입니다")
+
+
+def classify_yta_error(error: Exception) -> TranscriptExtractionError:
+    """youtube_transcript_api 예외를 실패 타입으로"""
+    from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+    from youtube_transcript_api import (
+        InvalidVideoId,
+        NoTranscriptAvailable,
+        NoTranscriptFound,
+        TooManyRequests,
+        TranscriptsDisabled,
+        VideoUnavailable,
+    )
+
+    if isinstance(error, (NoTranscriptFound, NoTranscriptAvailable, TranscriptsDisabled)):
+        return NoTranscriptError(str(error))
+    if isinstance(error, (VideoUnavailable, InvalidVideoId)):
+        return VideoUnavailableError(str(error))
+    if isinstance(error, TooManyRequests):
+        # 영상 페이지 대신 reCAPTCHA를 받음 - IP가 표시된 상태라 몇 초 기다려도 풀리지 않음
+        return RateLimitedError("YouTube API 요청 제한 (reCAPTCHA)", retryable=False)
+    failure = classify_error(error, "YTA 처리")
+    if type(failure) is TranscriptExtractionError and isinstance(error, (RequestsConnectionError, Timeout)):
+        return TransientError(f"YTA 처리 실패 (네트워크 오류: {error})")
+    return failure
+
+
+# ---------------------------------
+# yt-dlp
+# ---------------------------------
+# yt-dlp 추출 결과 중 실제로 사용하는 필드 (formats 등 큰 항목은 버림)
+YTDLP_INFO_FIELDS = ("id", "title", "duration", "subtitles", "automatic_captions")
+
+
+# yt-dlp 자체 재시도 횟수와 소켓 시간 초과 (제한 시간이 있으면 남은 시간을 시도 횟수로 나눠 씀)
+YTDLP_RETRIES = 2
+YTDLP_SOCKET_TIMEOUT = 45.0
+
+
+@ttl_memoize(ttl=1800, max_entries=64)
+def extract_video_info(url: str, deadline: Optional[Deadline] = None) -> dict:
+    """yt-dlp 영상 정보 추출 (메타데이터 표시와 자막 트랙 선택이 공유, 호출 간 메모이즈)"""
+    import yt_dlp
+
+    deadline = deadline or Deadline()
+
+    # 더 현실적인 yt-dlp 설정
+    ydl_opts = {
+        "quiet": True,
+        "no_warnings": True,
+        "noplaylist": True,
+        "writesubtitles": False,
+        "writeautomaticsub": False,
+        "socket_timeout": deadline.timeout(YTDLP_SOCKET_TIMEOUT, share=YTDLP_RETRIES + 1),
+        "retries": YTDLP_RETRIES,
+        "http_headers": get_realistic_headers(),
+        # YouTube 우회를 위한 추가 옵션들
+        "extractor_args": {
+            "youtube": {
+                "skip": ["dash", "hls"],
+                "player_client": ["android", "web"],
+            }
+        },
+        # 쿠키 및 캐시 설정
+        "cachedir": False,
+        "no_cache_dir": True,
+    }
+
+    # 메모이즈 적중은 여기까지 오지 않으므로 실제 추출만 기록된다
+    with span("metadata", "ytdlp"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+        info = ydl.sanitize_info(info)
+
+    return {key: info.get(key) for key in YTDLP_INFO_FIELDS}
+
+
+# 추출기 오류는 HTTP 응답 없이 메시지로만 알려 주는 경우가 많음
+YTDLP_MESSAGE_HINTS = (
+    (("sign in to confirm you", "not a bot"), BlockedError),
+    (("video unavailable", "private video", "has been removed", "members-only", "confirm your age"),
+     VideoUnavailableError),
+)
+
+
+def classify_ytdlp_error(error: Exception, label: str, request: Optional[str] = None) -> TranscriptExtractionError:
+    """yt-dlp 예외를 실패 타입으로"""
+    from yt_dlp.networking.exceptions import TransportError
+    from yt_dlp.utils import GeoRestrictedError
+
+    failure = classify_error(error, label, request)
+    if type(failure) is not TranscriptExtractionError or failure.status is not None:
+        return failure
+    chain = list(_exception_chain(error))
+    if any(isinstance(cause, GeoRestrictedError) for cause in chain):
+        return VideoUnavailableError(f"{label} 실패: {error}")
+    if any(isinstance(cause, TransportError) for cause in chain):
+        return TransientError(f"{label} 실패 (네트워크 오류: {error})")
+    message = str(error).lower()
+    for phrases, error_type in YTDLP_MESSAGE_HINTS:
+        if any(phrase in message for phrase in phrases):
+            return error_type(f"{label} 실패: {error}")
+    return failure
+
+
+def fetch_video_meta(url: str, deadline: Optional[Deadline] = None) -> Optional[VideoInfo]:
+    """영상 제목/길이 조회 (실패하면 None)"""
+    try:
+        info = extract_video_info(to_clean_watch_url(url), deadline=deadline)
+    except Exception:
+        return None
+    return VideoInfo(info.get('title') or '제목 확인 불가', info.get('duration') or 0)
+
+
+def fetch_via_ytdlp_enhanced_stealth(url_or_id: str, langs: List[str],
+                                     format_preference: Sequence[str] = DEFAULT_FORMAT_PREFERENCE,
+                                     reporter: Optional[Reporter] = None, session_id: str = "",
+                                     deadline: Optional[Deadline] = None) -> Transcript:
+    """스텔스 모드 yt-dlp 자막 가져오기"""
+    reporter = reporter or Reporter(backend="ytdlp")
+    deadline = deadline or Deadline()
+    url = to_clean_watch_url(url_or_id)
+    headers = get_realistic_headers()
+
+    reporter.detail(f"🔍 yt-dlp 스텔스 모드 (세션: {session_id})")
+
+    try:
+        # 메타데이터 표시에서 이미 추출했다면 같은 결과를 재사용
+        info = extract_video_info(url, deadline=deadline)
+    except TranscriptExtractionError:
+        raise
+    except Exception as e:
+        raise classify_ytdlp_error(e, "yt-dlp 정보 추출") from e
+
+    subs = info.get("subtitles") or {}
+    autos = info.get("automatic_captions") or {}
+
+    candidates = []
+
+    # 우선순위: 수동 자막 > 자동 자막
+    for lg in langs:
+        if lg in subs:
+            candidates.append(("manual", lg, subs[lg]))
+
+    for lg in langs:
+        if lg in autos:
+            candidates.append(("auto", lg, autos[lg]))
+
+    # 영어 폴백
+    if "en" not in langs:
+        if "en" in subs:
+            candidates.append(("manual", "en", subs["en"]))
+        if "en" in autos:
+            candidates.append(("auto", "en", autos["en"]))
+
+    # 아무 언어나 사용
+    if not candidates:
+        all_available = list(subs.keys()) + list(autos.keys())
+        if all_available:
+            first_lang = all_available[0]
+            if first_lang in subs:
+                candidates.append(("manual", first_lang, subs[first_lang]))
+            elif first_lang in autos:
+                candidates.append(("auto", first_lang, autos[first_lang]))
+
+    # 직전 포맷이 요청 제한/일시적 오류로 실패했을 때만 다음 요청 전에 기다림
+    pending_wait = None
+    # 모든 포맷이 실패했을 때 분류를 살려서 올릴 마지막 실패
+    last_failure = None
+    last_error = None
+    for kind, lg, fmt_list in candidates:
+        # 타임스탬프를 보존하면서 받기/파싱 비용이 가장 낮은 포맷부터 (보통 한 번이면 끝남)
+        ranked_formats = rank_subtitle_formats(fmt_list or [], format_preference)
+
+        for attempt, item in enumerate(ranked_formats):
+            ext = item["ext"].lower()
+            try:
+                if pending_wait:
+                    deadline.sleep(pending_wait, "format_retry", "ytdlp")
+                pending_wait = None
+
+                # 향상된 헤더로 요청 (공유 커넥션 풀), 응답을 청크 단위로 읽으면서 바로 파싱.
+                # 청크를 기다린 시간은 다운로드, 나머지는 파싱으로 나눠 기록
+                started = time.perf_counter()
+                response = get_http_client().stream(item["url"], headers=headers,
+                                                    timeout=_http_timeout(deadline))
+                chunks = TimedChunks(deadline.iterate(response))
+                try:
+                    transcript = SUBTITLE_PARSERS[ext](chunks)
+                finally:
+                    STAGE_SECONDS.observe(chunks.elapsed, backend="ytdlp", stage="download")
+                    STAGE_SECONDS.observe(time.perf_counter() - started - chunks.elapsed,
+                                          backend="ytdlp", stage="parse")
+
+                if transcript:
+                    transcript.language = lg
+                    transcript.kind = kind
+                    transcript.source = "ytdlp"
+                    reporter.success(f"자막 추출 성공 (yt-dlp): {lg} ({kind}, {ext.upper()})")
+                    return transcript
+
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                failure = classify_ytdlp_error(e, "yt-dlp 자막 다운로드", CAPTION_REQUEST)
+                last_failure, last_error = failure, e
+                pending_wait = retry_delay(failure, attempt)
+                if isinstance(failure, (RateLimitedError, BlockedError)) and pending_wait is None:
+                    # 다른 포맷/언어도 같은 서버에서 같은 응답을 받으므로 바로 다음 백엔드로
+                    raise failure from e
+                reporter.detail(f"⚠️ {ext.upper()} 포맷 실패: {str(e)[:50]}...")
+                continue
+
+    available_langs = list(set(list(subs.keys()) + list(autos.keys())))
+    if not available_langs:
+        raise NoTranscriptError("yt-dlp: 자막 없음")
+    if last_failure is not None:
+        # 요청 제한/일시적 오류/차단 분류를 그대로 올려야 재시도 정책과 차단기가 판단할 수 있음
+        raise last_failure from last_error
+    raise NoTranscriptError(f"yt-dlp: 지원하는 자막 포맷이 없거나 비어 있음 (사용가능: {available_langs})")
+
+
+# ---------------------------------
+# pytube
+# ---------------------------------
+def fetch_pytube_vid_info(video_id: str, headers: dict, timeout: Optional[float] = None) -> dict:
+    """pytube InnerTube player 요청을 호출별 헤더와 공유 커넥션 풀로 직접 수행"""
+    from pytube.innertube import InnerTube
+
+    innertube = InnerTube(use_oauth=False, allow_cache=False)
+    query = {"videoId": video_id}
+    query.update(innertube.base_params)
+    endpoint = f"{innertube.base_url}/player?{urlencode(query)}"
+
+    request_headers = dict(headers)
+    request_headers["Content-Type"] = "application/json"
+    # 클라이언트 종류에 맞는 User-Agent 등은 InnerTube 설정을 따름
+    request_headers.update(innertube.header)
+
+    body = json.dumps(innertube.base_data).encode("utf-8")
+    return json.loads(get_http_client().post(endpoint, body, headers=request_headers, timeout=timeout))
+
+
+def classify_pytube_error(error: Exception, label: str = "pytube 처리",
+                          request: Optional[str] = None) -> TranscriptExtractionError:
+    """pytube 예외를 실패 타입으로 (비공개, 연령/지역 제한, 멤버십 등은 모두 VideoUnavailable 계열)"""
+    from pytube.exceptions import VideoUnavailable
+
+    if isinstance(error, VideoUnavailable):
+        return VideoUnavailableError(f"{label} 실패: {error}")
+    return classify_error(error, label, request)
+
+
+def fetch_via_pytube_enhanced(url_or_id: str, langs: List[str],
+                              reporter: Optional[Reporter] = None, session_id: str = "",
+                              deadline: Optional[Deadline] = None) -> Transcript:
+    """향상된 pytube 자막 추출"""
+    from pytube import YouTube
+
+    reporter = reporter or Reporter(backend="pytube")
+    deadline = deadline or Deadline()
+    url = to_clean_watch_url(url_or_id)
+
+    reporter.detail(f"🔍 pytube 향상 모드 (세션: {session_id})")
+
+    try:
+        # 요청별 헤더로 pytube 초기화 (전역 opener를 바꾸지 않으므로 세션 간 경쟁 없음)
+        headers = get_realistic_headers()
+
+        # 첫 번째 시도
+        try:
+            with span("metadata", "pytube"):
+                yt = YouTube(url, use_oauth=False, allow_oauth_cache=False)
+                yt._vid_info = fetch_pytube_vid_info(yt.video_id, headers, _http_timeout(deadline))
+                _ = yt.title  # 메타데이터 로드 테스트
+        except TranscriptExtractionError:
+            raise
+        except Exception as e:
+            # 요청 제한/일시적 오류일 때만 다른 헤더로 한 번 더
+            failure = classify_pytube_error(e)
+            wait_time = retry_delay(failure, 0)
+            if wait_time is None or not deadline.allows(wait_time):
+                raise failure from e
+            reporter.detail(retry_notice(failure, wait_time))
+            deadline.sleep(wait_time, failure.reason, "pytube")
+            headers = get_realistic_headers()
+
+            with span("metadata", "pytube"):
+                yt = YouTube(url, use_oauth=False, allow_oauth_cache=False)
+                yt._vid_info = fetch_pytube_vid_info(yt.video_id, headers, _http_timeout(deadline))
+                _ = yt.title
+
+        with span("list_tracks", "pytube"):
+            tracks = yt.captions
+        if not tracks:
+            raise NoTranscriptError("pytube: 자막 트랙이 없음")
+
+        # 언어 우선순위 설정
+        candidates = []
+        for lg in langs:
+            candidates.append(lg)
+            candidates.append(f"a.{lg}")  # 자동생성 자막
+
+        if "en" not in [c.replace("a.", "") for c in candidates]:
+            candidates.extend(["en", "a.en"])
+
+        available_codes = {c.code: c for c in tracks}
+
+        for code in candidates:
+            cap = available_codes.get(code)
+
+            # 부분 매칭 시도
+            if not cap:
+                for k, v in available_codes.items():
+                    if k.lower().startswith(code.lower().replace("a.", "")):
+                        cap = v
+                        code = k
+                        break
+
+            if not cap:
+                continue
+
+            try:
+                # 자막 XML은 공유 커넥션 풀로 한 번만 받아 두 방식이 함께 사용
+                with span("download", "pytube"):
+                    xml = get_http_client().get_text(cap.url, headers=headers,
+                                                     timeout=_http_timeout(deadline))
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                failure = classify_pytube_error(e, "pytube 자막 다운로드", CAPTION_REQUEST)
+                if isinstance(failure, (RateLimitedError, BlockedError)):
+                    raise failure from e
+                continue
+
+            with span("parse", "pytube"):
+                try:
+                    # SRT 방식 먼저 시도
+                    srt = cap.xml_caption_to_srt(xml)
+                    transcript = Transcript(
+                        language=code.replace("a.", ""),
+                        kind="auto" if code.startswith("a.") else "manual",
+                        source="pytube",
+                    )
+
+                    for block in srt.strip().split("\n\n"):
+                        if not block.strip():
+                            continue
+
+                        parts = block.split("\n")
+                        if len(parts) >= 3:
+                            try:
+                                start, end = [parse_srt_timestamp(ts) for ts in parts[1].split("-->")]
+                                text = " ".join(parts[2:]).strip()
+                                if text:
+                                    transcript.append(start, text, end)
+                            except (ValueError, IndexError):
+                                continue
+
+                    if transcript:
+                        reporter.success(f"자막 추출 성공 (pytube): {code}")
+                        return transcript
+
+                except Exception:
+                    # XML 방식으로 폴백
+                    try:
+                        transcript = clean_xml_text(xml)
+                        if transcript:
+                            transcript.language = code.replace("a.", "")
+                            transcript.kind = "auto" if code.startswith("a.") else "manual"
+                            transcript.source = "pytube"
+                            reporter.success(f"자막 추출 성공 (pytube): {code}")
+                            return transcript
+                    except Exception:
+                        continue
+
+    except TranscriptExtractionError:
+        raise
+    except Exception as e:
+        raise classify_pytube_error(e) from e
+
+    raise NoTranscriptError("pytube: 매칭되는 자막 없음")
+
+
+def run_backend(name: str, url: str, video_id: str, langs: List[str], reporter: Reporter,
+                session_id: str = "", max_retries: int = 3, deadline: Optional[Deadline] = None) -> Transcript:
+    """이름으로 백엔드 하나를 실행 (라이브러리는 이때 처음 import됨)"""
+    if name == "yta":
+        return fetch_via_yta_with_enhanced_retry(video_id, langs, max_retries, reporter, session_id, deadline)
+    if name == "ytdlp":
+        return fetch_via_ytdlp_enhanced_stealth(url, langs, reporter=reporter, session_id=session_id,
+                                                deadline=deadline)
+    if name == "pytube":
+        return fetch_via_pytube_enhanced(url, langs, reporter, session_id, deadline)
+    raise ValueError(f"unknown backend: {name}")
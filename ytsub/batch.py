@@ -0,0 +1,220 @@
+"""여러 영상 일괄 추출 (작업 풀, 요청 예산, 재개 가능한 상태 파일).
+
+영상별 상태(pending / done / failed + 실패 사유)는 하나가 끝날 때마다 JSON 파일에
+원자적으로 기록한다. 중단된 배치를 같은 상태 파일로 다시 실행하면
+이미 끝난 영상은 건너뛰고 나머지만 추출한다.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ytsub.budget import RequestBudget
+from ytsub.cleaning import apply_subtitle_cleaning
+from ytsub.deadline import Deadline
+from ytsub.errors import BudgetExhausted, ExtractionFailed
+from ytsub.export import FORMATS, write_export
+from ytsub.model import Transcript
+from ytsub.progress import DETAIL, ProgressCallback, ProgressEvent, Reporter
+from ytsub.urls import extract_video_id, to_clean_watch_url
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+_STATE_VERSION = 1
+
+
+def normalize_targets(items: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """URL/ID 목록을 비디오 ID로 바꾸고 중복 제거 (입력 순서 유지). (ID 목록, 잘못된 항목)"""
+    video_ids: List[str] = []
+    invalid: List[str] = []
+    seen = set()
+    for item in items:
+        item = item.strip()
+        if not item or item.startswith("#"):
+            continue
+        vid = extract_video_id(to_clean_watch_url(item))
+        if not vid:
+            invalid.append(item)
+        elif vid not in seen:
+            seen.add(vid)
+            video_ids.append(vid)
+    return video_ids, invalid
+
+
+def read_targets(path: str) -> List[str]:
+    """한 줄에 하나씩 URL/ID가 적힌 파일 읽기 ("-"는 표준 입력)"""
+    if path == "-":
+        return sys.stdin.read().splitlines()
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+class BatchState:
+    """영상별 진행 상태를 담는 JSON 상태 파일"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.videos: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.videos = data.get("videos", {})
+
+    def add(self, video_ids: Iterable[str]) -> None:
+        with self._lock:
+            for vid in video_ids:
+                self.videos.setdefault(vid, {"status": PENDING})
+            self._save()
+
+    def get(self, video_id: str) -> Dict:
+        with self._lock:
+            return dict(self.videos.get(video_id, {"status": PENDING}))
+
+    def mark(self, video_id: str, status: str, reason: Optional[str] = None,
+             output: Optional[str] = None, **extra) -> None:
+        entry = {"status": status, "updated_at": time.time()}
+        if reason:
+            entry["reason"] = reason
+        if output:
+            entry["output"] = output
+        entry.update(extra)
+        with self._lock:
+            self.videos[video_id] = entry
+            self._save()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {PENDING: 0, DONE: 0, FAILED: 0}
+            for entry in self.videos.values():
+                counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+            return counts
+
+    def _save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": _STATE_VERSION, "videos": self.videos}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+class _Pacer:
+    """작업 시작 간 최소 간격을 모든 워커에 걸쳐 보장"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def _write_transcript(path: str, transcript: Transcript, fmt: str, video_id: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        write_export(transcript, fmt, f, video_id)
+    os.replace(tmp_path, path)
+
+
+def run_batch(video_ids: List[str], state: BatchState, out_dir: str, langs: List[str],
+              clean_duplicates: bool = True, merge_consecutive: bool = True, remove_overlap: bool = True,
+              use_cache: bool = True,
+              max_retries: int = 3, timeout: Optional[float] = None, hedge: bool = False,
+              concurrency: int = 2, budget: Optional[RequestBudget] = None,
+              min_interval: float = 0.0, retry_failed: bool = False, fmt: str = "txt",
+              progress: Optional[ProgressCallback] = None) -> Dict[str, int]:
+    """영상 목록을 작업 풀로 추출하고 상태별 개수를 반환.
+
+    진행 이벤트의 `backend` 필드에는 비디오 ID가 들어간다. 파이프라인 내부 이벤트는
+    DETAIL 수준으로 전달된다. 예산이 바닥나면 남은 영상은 pending으로 남긴다.
+    `timeout`은 영상 하나의 전체 제한 시간이다 (간격 조절 대기는 포함하지 않음).
+    `hedge`는 영상마다 헤지 실행을 켠다 (`fetch_transcript` 참고).
+    """
+    from ytsub.pipeline import fetch_transcript
+
+    os.makedirs(out_dir, exist_ok=True)
+    state.add(video_ids)
+    pacer = _Pacer(min_interval)
+    stop = threading.Event()
+
+    todo = []
+    for vid in video_ids:
+        entry = state.get(vid)
+        if entry["status"] == DONE and os.path.exists(entry.get("output", "")):
+            continue
+        if entry["status"] == FAILED and not retry_failed:
+            continue
+        todo.append(vid)
+
+    total = len(todo)
+    finished = [0]
+    finished_lock = threading.Lock()
+
+    def position() -> str:
+        with finished_lock:
+            finished[0] += 1
+            return f"[{finished[0]}/{total}]"
+
+    def video_progress(vid: str) -> ProgressCallback:
+        def forward(event: ProgressEvent) -> None:
+            if progress is not None:
+                progress(ProgressEvent(DETAIL, event.message, vid, event.timestamp))
+        return forward
+
+    def work(vid: str) -> None:
+        if stop.is_set():
+            return
+        reporter = Reporter(progress, vid)
+        pacer.wait()
+        if stop.is_set():
+            return
+        try:
+            raw = fetch_transcript(to_clean_watch_url(vid), vid, langs, use_cache=use_cache,
+                                   max_retries=max_retries, progress=video_progress(vid), budget=budget,
+                                   deadline=Deadline(timeout), hedge=hedge)
+        except BudgetExhausted:
+            stop.set()
+            reporter.warning(f"{position()} {vid} ⏸️ 요청 예산 소진 - 다음 실행에서 이어서 진행")
+            return
+        except ExtractionFailed as e:
+            state.mark(vid, FAILED, reason=f"{e.reason}: {e}")
+            reporter.warning(f"{position()} {vid} ❌ {e}")
+            return
+        except Exception as e:
+            state.mark(vid, FAILED, reason=f"error: {e}")
+            reporter.warning(f"{position()} {vid} ❌ 예상치 못한 오류: {e}")
+            return
+
+        transcript = apply_subtitle_cleaning(raw, clean_duplicates, merge_consecutive, remove_overlap)
+        output = os.path.join(out_dir, f"{vid}.{FORMATS[fmt].extension}")
+        _write_transcript(output, transcript, fmt, vid)
+        state.mark(vid, DONE, output=output, language=raw.language, kind=raw.kind,
+                   source=raw.source, segments=len(transcript))
+        reporter.success(f"{position()} {vid} ✅ {len(transcript)}개 구간 ({raw.source}, {raw.language})")
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="ytsub-batch")
+    try:
+        futures = [executor.submit(work, vid) for vid in todo]
+        for future in futures:
+            future.result()
+    except KeyboardInterrupt:
+        # 진행 중인 영상은 끝까지 기다리지 않고 pending으로 남긴다
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return state.counts()
@@ -0,0 +1,149 @@
+"""백엔드별 회로 차단기 (요청 제한/차단이 반복되면 일정 시간 건너뛰기).
+
+YouTube가 한 백엔드에 429/403을 돌려주기 시작하면 그 백엔드는 재시도와 대기로
+요청마다 수십 초를 쓴다. 요청 제한/차단 실패가 연속 `failure_threshold`번 나오면
+차단기가 열리고(open), `cooldown` 동안 모든 세션이 그 백엔드를 건너뛴다.
+대기 시간이 지나면 반열림(half_open) 상태에서 한 요청만 시험 삼아 보내고,
+성공하면 닫고(closed) 다시 실패하면 대기 시간을 두 배로 늘려 다시 연다.
+서버가 Retry-After로 기다릴 시간을 알려 준 실패는 횟수와 상관없이 바로 그 시간만큼 연다.
+"""
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from ytsub.backends import BACKEND_NAMES
+from ytsub.metrics import REGISTRY
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 2
+DEFAULT_COOLDOWN = 60.0
+DEFAULT_MAX_COOLDOWN = 15 * 60.0
+
+# 차단기를 여는 실패 원인 (`TranscriptExtractionError.reason`)
+TRIPPING_REASONS = ("rate_limited", "blocked")
+
+BREAKER_SKIPS = REGISTRY.counter(
+    "ytsub_breaker_skips_total", "Backend attempts skipped because the circuit was open", ("backend",))
+BREAKER_TRANSITIONS = REGISTRY.counter(
+    "ytsub_breaker_transitions_total", "Circuit breaker state changes", ("backend", "state"))
+
+
+class CircuitBreaker:
+    """백엔드 하나의 차단기 (스레드 안전)"""
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 cooldown: float = DEFAULT_COOLDOWN, max_cooldown: float = DEFAULT_MAX_COOLDOWN):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_reason: Optional[str] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        BREAKER_TRANSITIONS.inc(backend=self.name, state=state)
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        """열린 상태에서 시험 요청까지 남은 시간 (초)"""
+        now = time.monotonic() if now is None else now
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - now)
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """지금 이 백엔드를 시도해도 되는지. 반열림에서는 시험 요청 하나만 허용."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.state == OPEN and now >= self.opened_at + self.cooldown:
+                self._transition(HALF_OPEN)
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+        BREAKER_SKIPS.inc(backend=self.name)
+        return False
+
+    def record_success(self) -> None:
+        """요청 제한/차단이 아닌 결과 (자막 없음 등 영상 쪽 실패도 포함)"""
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self.cooldown = self.base_cooldown
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, reason: str, now: Optional[float] = None,
+                       retry_after: Optional[float] = None) -> None:
+        """요청 제한/차단 실패. 반열림 시험이 실패하면 대기 시간을 늘려 다시 연다."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.last_reason = reason
+            self._probing = False
+            if retry_after:
+                self.cooldown = min(retry_after, self.max_cooldown)
+                self.opened_at = now
+                if self.state != OPEN:
+                    self._transition(OPEN)
+                return
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self.opened_at = now
+                self._transition(OPEN)
+                return
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.opened_at = now
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """허용받은 시도를 결과 없이 끝냄 (제한 시간 초과 등) - 반열림이면 다음 시험 요청을 허용"""
+        with self._lock:
+            self._probing = False
+
+    def record(self, reason: Optional[str], now: Optional[float] = None,
+               retry_after: Optional[float] = None) -> None:
+        """시도 결과 기록 - `reason`이 요청 제한/차단이면 실패, 아니면 정상 응답으로 본다"""
+        if reason in TRIPPING_REASONS:
+            self.record_failure(reason, now, retry_after)
+        else:
+            self.record_success()
+
+    def __repr__(self) -> str:
+        return f"CircuitBreaker({self.name!r}, state={self.state!r}, failures={self.failures})"
+
+
+class BreakerBoard:
+    """백엔드 이름 → 차단기"""
+
+    def __init__(self, backends: Iterable[str], **options):
+        self._breakers: Dict[str, CircuitBreaker] = {name: CircuitBreaker(name, **options) for name in backends}
+
+    def __getitem__(self, backend: str) -> CircuitBreaker:
+        return self._breakers[backend]
+
+    def __iter__(self):
+        return iter(self._breakers.values())
+
+
+_default_board: Optional[BreakerBoard] = None
+_default_board_lock = threading.Lock()
+
+
+def get_circuit_breakers() -> BreakerBoard:
+    """프로세스 전체에서 공유하는 기본 차단기 (모든 Streamlit 세션이 공유)."""
+    global _default_board
+    with _default_board_lock:
+        if _default_board is None:
+            _default_board = BreakerBoard(BACKEND_NAMES)
+        return _default_board
@@ -0,0 +1,35 @@
+"""여러 추출 작업이 공유하는 전체 요청 예산."""
+import threading
+from typing import Optional
+
+
+class RequestBudget:
+    """백엔드 시도 횟수 한도 (스레드 안전). limit이 None이면 무제한."""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, n: int = 1) -> bool:
+        with self._lock:
+            if self.limit is not None and self.used + n > self.limit:
+                return False
+            self.used += n
+            return True
+
+    def release(self, n: int = 1) -> None:
+        """쓰지 않은 몫 돌려주기 (획득 후 실제로 요청하지 않았을 때)"""
+        with self._lock:
+            self.used = max(0, self.used - n)
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.limit is None:
+            return None
+        with self._lock:
+            return max(0, self.limit - self.used)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining == 0
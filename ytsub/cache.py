@@ -0,0 +1,226 @@
+"""추출한 자막의 로컬 영구 캐시 (SQLite, zlib 압축, LRU/TTL 제거)."""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ytsub.model import Transcript, VideoInfo
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "YTSUB_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "memg_yt", "transcripts.sqlite3"),
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = 7 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id    TEXT NOT NULL,
+    langs       TEXT NOT NULL,
+    backend     TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    payload     BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (video_id, langs, backend, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_accessed ON transcripts (accessed_at);
+CREATE TABLE IF NOT EXISTS video_meta (
+    video_id    TEXT PRIMARY KEY,
+    title       TEXT NOT NULL,
+    length      INTEGER NOT NULL,
+    created_at  REAL NOT NULL
+);
+"""
+
+
+class TranscriptCache:
+    """(video_id, 언어 우선순위, 백엔드, 자막 종류)를 키로 하는 자막 캐시.
+
+    조회 시에는 백엔드/종류를 미리 알 수 없으므로 (video_id, 언어 우선순위)로 찾고,
+    같은 키에 여러 항목이 있으면 수동 자막을 우선한다.
+    저장할 때마다 TTL이 지난 항목을 지우고, 전체 크기가 `max_bytes`를 넘으면
+    가장 오래 조회되지 않은 항목부터 제거한다.
+    영상 제목/길이도 함께 보관해 캐시 적중 시 메타 정보 조회 요청을 하지 않게 한다.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _langs_key(langs: List[str]) -> str:
+        return ",".join(langs)
+
+    def get(self, video_id: str, langs: List[str]) -> Optional[Transcript]:
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT backend, kind, payload FROM transcripts "
+                    "WHERE video_id = ? AND langs = ? AND created_at >= ? "
+                    "ORDER BY (kind = 'manual') DESC, accessed_at DESC LIMIT 1",
+                    (video_id, self._langs_key(langs), now - self.ttl),
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                backend, kind, payload = row
+                self._conn.execute(
+                    "UPDATE transcripts SET accessed_at = ? "
+                    "WHERE video_id = ? AND langs = ? AND backend = ? AND kind = ?",
+                    (now, video_id, self._langs_key(langs), backend, kind),
+                )
+                self.hits += 1
+            return Transcript.from_bytes(zlib.decompress(payload))
+        except (sqlite3.Error, zlib.error, ValueError):
+            # 캐시 손상은 미스로 취급하고 네트워크 추출을 계속한다
+            return None
+
+    def contains(self, video_id: str, langs: List[str]) -> bool:
+        """적중 여부만 확인 (적중/미스 횟수와 조회 시각은 바꾸지 않음)"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT 1 FROM transcripts WHERE video_id = ? AND langs = ? AND created_at >= ? LIMIT 1",
+                    (video_id, self._langs_key(langs), time.time() - self.ttl),
+                ).fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None
+
+    def get_meta(self, video_id: str) -> Optional[VideoInfo]:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT title, length FROM video_meta WHERE video_id = ? AND created_at >= ?",
+                    (video_id, time.time() - self.ttl),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return VideoInfo(*row) if row else None
+
+    def put_meta(self, video_id: str, info: VideoInfo) -> None:
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO video_meta (video_id, title, length, created_at) VALUES (?, ?, ?, ?)",
+                    (video_id, info.title, int(info.length or 0), time.time()),
+                )
+        except sqlite3.Error:
+            pass
+
+    def put(self, video_id: str, langs: List[str], transcript: Transcript) -> None:
+        payload = zlib.compress(transcript.to_bytes(), 6)
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO transcripts "
+                    "(video_id, langs, backend, kind, payload, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (video_id, self._langs_key(langs), transcript.source or "",
+                     transcript.kind or "", payload, len(payload), now, now),
+                )
+                self._evict(now)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM transcripts WHERE created_at < ?", (now - self.ttl,))
+        self._conn.execute("DELETE FROM video_meta WHERE created_at < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # LRU: 가장 오래 조회되지 않은 항목부터 제거
+        rows = self._conn.execute(
+            "SELECT rowid, size FROM transcripts ORDER BY accessed_at ASC"
+        ).fetchall()
+        victims = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            victims.append((rowid,))
+            total -= size
+        self._conn.executemany("DELETE FROM transcripts WHERE rowid = ?", victims)
+
+    def iter_transcripts(self, video_ids: Optional[List[str]] = None) -> Iterator[Tuple[str, Transcript]]:
+        """영상별 (video_id, Transcript)를 하나씩 반환 (내보내기용, 조회 시각은 갱신 안 함).
+
+        한 영상에 여러 항목이 있으면 `get`과 같이 수동 자막, 최근 조회 순으로 하나만 고른다.
+        자막 본문은 차례가 될 때 하나씩 읽어 풀기 때문에 한 번에 하나만 메모리에 둔다.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, video_id FROM transcripts WHERE created_at >= ? "
+                "ORDER BY video_id, (kind = 'manual') DESC, accessed_at DESC",
+                (now - self.ttl,),
+            ).fetchall()
+        wanted = set(video_ids) if video_ids is not None else None
+        seen = set()
+        for rowid, video_id in rows:
+            if video_id in seen or (wanted is not None and video_id not in wanted):
+                continue
+            seen.add(video_id)
+            try:
+                with self._lock:
+                    row = self._conn.execute(
+                        "SELECT payload FROM transcripts WHERE rowid = ?", (rowid,)
+                    ).fetchone()
+                if row is None:
+                    continue
+                transcript = Transcript.from_bytes(zlib.decompress(row[0]))
+            except (sqlite3.Error, zlib.error, ValueError):
+                continue
+            yield video_id, transcript
+
+    def purge(self, video_id: Optional[str] = None) -> int:
+        """캐시 비우기 (video_id를 주면 해당 영상만). 지운 항목 수를 반환."""
+        with self._lock:
+            if video_id is None:
+                cur = self._conn.execute("DELETE FROM transcripts")
+                self._conn.execute("DELETE FROM video_meta")
+            else:
+                cur = self._conn.execute("DELETE FROM transcripts WHERE video_id = ?", (video_id,))
+                self._conn.execute("DELETE FROM video_meta WHERE video_id = ?", (video_id,))
+            if self.path != ":memory:":
+                self._conn.execute("VACUUM")
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+_default_cache: Optional[TranscriptCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """프로세스 전체에서 공유하는 기본 캐시 인스턴스."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TranscriptCache()
+        return _default_cache
@@ -0,0 +1,267 @@
+"""자막 중복 제거 및 병합 함수들."""
+import math
+from typing import Dict, List, Set
+
+from ytsub.metrics import span
+from ytsub.model import Transcript
+
+# 자막 정리 시 통째로 버리는 효과음 태그
+NOISE_TEXTS = ('[Music]', '[Applause]', '[Laughter]')
+
+
+class ContainmentIndex:
+    """추가된 문자열들 중 질의 문자열을 부분 문자열로 포함하는 것이 있는지 빠르게 판별.
+
+    문자 n-gram 역색인으로 후보를 좁힌 뒤 실제 `in` 검사로 검증한다.
+    질의에 포함된 n-gram 중 등장 빈도가 가장 낮은 것의 포스팅만 검사하므로
+    자막처럼 짧은 문장이 대량으로 들어오는 경우 거의 선형 시간에 동작한다.
+    """
+
+    __slots__ = ("n", "_texts", "_postings", "_short")
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self._texts: List[str] = []
+        self._postings: Dict[str, List[int]] = {}
+        # n보다 짧은 질의는 n-gram이 없으므로 짧은 부분 문자열을 따로 보관
+        self._short: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, text: str) -> None:
+        idx = len(self._texts)
+        self._texts.append(text)
+        n = self.n
+
+        grams = {text[i:i + n] for i in range(len(text) - n + 1)}
+        postings = self._postings
+        for gram in grams:
+            bucket = postings.get(gram)
+            if bucket is None:
+                postings[gram] = [idx]
+            else:
+                bucket.append(idx)
+
+        short = self._short
+        for size in range(1, n):
+            for i in range(len(text) - size + 1):
+                short.add(text[i:i + size])
+
+    def contains(self, query: str) -> bool:
+        """추가된 문자열 중 하나라도 `query`를 포함하면 True."""
+        n = self.n
+        if len(query) < n:
+            return query in self._short if query else bool(self._texts)
+
+        postings = self._postings
+        best = None
+        for i in range(len(query) - n + 1):
+            bucket = postings.get(query[i:i + n])
+            if bucket is None:
+                # 어떤 문자열에도 없는 n-gram이 있으면 포함될 수 없음
+                return False
+            if best is None or len(bucket) < len(best):
+                best = bucket
+
+        texts = self._texts
+        for idx in best:
+            if query in texts[idx]:
+                return True
+        return False
+
+
+def clean_duplicate_subtitles(transcript: Transcript) -> Transcript:
+    """자막에서 중복된 문장들을 제거"""
+    cleaned = transcript.derive()
+    # 이전에 남긴 문장들의 부분 문자열 색인 (대소문자 구분 안함).
+    # 더 긴 문장에 포함된 짧은 문장은 긴 문장으로 대체되더라도 긴 문장 쪽에서
+    # 여전히 검출되므로, 남긴 문장 전체에 대한 포함 여부만 보면 된다.
+    seen_index = ContainmentIndex()
+
+    for start, end, text in transcript.items():
+        text = text.strip()
+        if not text or text in NOISE_TEXTS:
+            continue
+
+        # 완전 중복 또는 부분 중복 (이전 문장에 포함된 경우) 제거
+        text_lower = text.lower()
+        if seen_index.contains(text_lower):
+            continue
+
+        seen_index.add(text_lower)
+        cleaned.append(start, text, end)
+
+    return cleaned
+
+
+def merge_consecutive_subtitles(transcript: Transcript, time_threshold: float = 2.0) -> Transcript:
+    """연속된 비슷한 자막들을 병합"""
+    merged = transcript.derive()
+    starts = transcript.starts
+    ends = transcript.ends
+    texts = [text.strip() for text in transcript.texts()]
+    count = len(texts)
+
+    i = 0
+    while i < count:
+        current_time = starts[i]
+        current_text = texts[i]
+        current_lower = current_text.lower()
+
+        # 다음 구간들과 비교해서 병합 가능한지 체크
+        merged_text = current_text
+        merged_end = ends[i]
+        j = i + 1
+
+        while j < count:
+            # 시간이 너무 멀면 중단
+            if (starts[j] - current_time) > time_threshold:
+                break
+
+            # 텍스트가 현재 텍스트의 연장인지 체크
+            next_text = texts[j]
+            next_lower = next_text.lower()
+            if current_lower in next_lower or next_lower in current_lower:
+                # 더 긴 텍스트로 업데이트
+                if len(next_text) > len(merged_text):
+                    merged_text = next_text
+                next_end = ends[j]
+                if not math.isnan(next_end) and (math.isnan(merged_end) or next_end > merged_end):
+                    merged_end = next_end
+                j += 1
+            else:
+                break
+
+        merged.append(current_time, merged_text, merged_end)
+        i = max(i + 1, j)
+
+    return merged
+
+
+# 이보다 짧은 단어 겹침은 우연의 일치로 보고 자르지 않음 (큐 전체가 겹칠 때는 예외)
+MIN_OVERLAP_WORDS = 2
+
+
+def suffix_prefix_overlap(previous: List[str], current: List[str]) -> int:
+    """`previous`의 접미사이면서 `current`의 접두사인 가장 긴 단어열의 길이.
+
+    `current`로 KMP 실패 함수를 만들고 `previous`의 끝부분(최대 len(current) 단어)을
+    훑으므로 O(len(current))에 끝난다.
+    """
+    m = len(current)
+    if not m or not previous:
+        return 0
+    failure = [0] * m
+    k = 0
+    for i in range(1, m):
+        while k and current[i] != current[k]:
+            k = failure[k - 1]
+        if current[i] == current[k]:
+            k += 1
+        failure[i] = k
+
+    k = 0
+    for word in previous[-m:]:
+        if k == m:
+            # 끝나기 전에 완전히 일치 - 끝까지 이어지는 더 짧은 겹침을 계속 찾음
+            k = failure[k - 1]
+        while k and word != current[k]:
+            k = failure[k - 1]
+        if word == current[k]:
+            k += 1
+    return k
+
+
+def remove_rolling_overlap(transcript: Transcript, min_overlap: int = MIN_OVERLAP_WORDS) -> Transcript:
+    """롤링 자동 자막에서 앞 큐의 끝을 반복하는 부분을 잘라 새로 나온 단어만 남김.
+
+    큐마다 직전 큐와의 접미사/접두사 겹침을 단어 단위(대소문자 무시)로 찾는다.
+    시작 시간은 원래 큐의 것을 그대로 쓰고, 새 단어가 없는 큐는 버린다.
+    """
+    result = transcript.derive()
+    previous: List[str] = []
+
+    for start, end, text in transcript.items():
+        words = text.split()
+        if not words:
+            continue
+        keys = [word.lower() for word in words]
+        overlap = suffix_prefix_overlap(previous, keys)
+        if overlap < min(min_overlap, len(words)):
+            overlap = 0
+
+        if overlap == len(words):
+            continue
+        result.append(start, " ".join(words[overlap:]) if overlap else text, end)
+        previous = keys
+
+    return result
+
+
+def apply_subtitle_cleaning(raw_transcript: Transcript, clean_duplicates: bool, merge_consecutive: bool,
+                            remove_overlap: bool = False) -> Transcript:
+    """사용자 설정에 따라 자막 정리 적용 (중복 제거 → 롤링 겹침 제거 → 병합 순서)"""
+    result = raw_transcript
+
+    with span("clean", raw_transcript.source or ""):
+        if clean_duplicates:
+            result = clean_duplicate_subtitles(result)
+
+        if remove_overlap:
+            result = remove_rolling_overlap(result)
+
+        if merge_consecutive:
+            result = merge_consecutive_subtitles(result)
+
+    return result
+
+
+class CleaningVariants:
+    """원본 자막 하나에 대한 정리 결과 메모.
+
+    옵션 조합별 결과와 출력 텍스트를 처음 요청될 때 한 번만 계산해 둔다.
+    각 조합은 마지막 단계만 뺀 조합의 결과에 그 단계 하나만 적용해서 만든다
+    (예: 중복 제거 + 병합 = 이미 계산된 중복 제거 결과에 병합만 적용).
+    """
+
+    __slots__ = ("raw", "_transcripts", "_texts")
+
+    def __init__(self, raw: Transcript):
+        self.raw = raw
+        self._transcripts: Dict[tuple, Transcript] = {(False, False, False): raw}
+        self._texts: Dict[tuple, str] = {}
+
+    def get(self, clean_duplicates: bool, merge_consecutive: bool, remove_overlap: bool = False) -> Transcript:
+        key = (bool(clean_duplicates), bool(merge_consecutive), bool(remove_overlap))
+        result = self._transcripts.get(key)
+        if result is None:
+            cd, mc, ro = key
+            # apply_subtitle_cleaning과 같은 단계 순서: 중복 제거 → 롤링 겹침 제거 → 병합
+            if mc:
+                base, stage = self.get(cd, False, ro), merge_consecutive_subtitles
+            elif ro:
+                base, stage = self.get(cd, False, False), remove_rolling_overlap
+            else:
+                base, stage = self.raw, clean_duplicate_subtitles
+            with span("clean", self.raw.source or ""):
+                result = stage(base)
+            self._transcripts[key] = result
+        return result
+
+    def is_computed(self, clean_duplicates: bool, merge_consecutive: bool, remove_overlap: bool = False) -> bool:
+        return (bool(clean_duplicates), bool(merge_consecutive), bool(remove_overlap)) in self._transcripts
+
+    def text(self, clean_duplicates: bool, merge_consecutive: bool, remove_overlap: bool = False) -> str:
+        """정리 결과의 "[t] text" 문자열 (같은 결과면 같은 문자열을 재사용)"""
+        key = (bool(clean_duplicates), bool(merge_consecutive), bool(remove_overlap))
+        text = self._texts.get(key)
+        if text is None:
+            transcript = self.get(*key)
+            # 정리 결과가 원본과 같은 객체면 원본 텍스트를 공유
+            if transcript is self.raw and key != (False, False, False):
+                text = self.text(False, False)
+            else:
+                text = transcript.to_text()
+            self._texts[key] = text
+        return text
@@ -0,0 +1,266 @@
+"""명령줄 진입점 (python -m ytsub get URL / batch / export / search).
+
+Streamlit을 import하지 않으며 백엔드 라이브러리도 실제로 시도할 때만 불러온다.
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional, Sequence
+
+from ytsub.cleaning import apply_subtitle_cleaning
+from ytsub.deadline import DEFAULT_DEADLINE, Deadline
+from ytsub.errors import ExtractionFailed, TranscriptExtractionError
+from ytsub.export import FORMATS, write_export, write_zip
+from ytsub.progress import DETAIL, ProgressEvent
+from ytsub.urls import extract_video_id, to_clean_watch_url
+
+DEFAULT_LANGS = ["ko", "en"]
+
+
+def _parse_langs(value: str) -> List[str]:
+    langs = [lang.strip() for lang in value.split(",") if lang.strip()]
+    if not langs:
+        raise argparse.ArgumentTypeError("언어를 하나 이상 지정하세요")
+    return langs
+
+
+def _stderr_progress(verbose: bool):
+    def callback(event: ProgressEvent) -> None:
+        if event.level == DETAIL and not verbose:
+            return
+        print(event.message.replace("**", ""), file=sys.stderr, flush=True)
+    return callback
+
+
+def _add_cleaning_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--no-clean-duplicates", dest="clean_duplicates", action="store_false",
+                        help="중복 자막 제거 안 함")
+    parser.add_argument("--no-overlap", dest="remove_overlap", action="store_false",
+                        help="롤링 자막 겹침 제거 안 함")
+    parser.add_argument("--no-merge", dest="merge_consecutive", action="store_false",
+                        help="연속 자막 병합 안 함")
+
+
+def _add_format_option(parser: argparse.ArgumentParser, default: str) -> None:
+    parser.add_argument("-f", "--format", choices=list(FORMATS), default=default,
+                        help=f"출력 형식 (기본: {default})")
+
+
+def _add_extraction_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("-l", "--langs", type=_parse_langs, default=DEFAULT_LANGS,
+                        help="언어 우선순위, 쉼표로 구분 (기본: ko,en)")
+    _add_cleaning_options(parser)
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="저장된 자막을 재사용하지 않음")
+    parser.add_argument("--retries", type=int, default=3, help="백엔드별 최대 재시도 횟수 (기본 3)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_DEADLINE,
+                        help=f"영상 하나의 전체 제한 시간 (초, 0이면 제한 없음, 기본 {DEFAULT_DEADLINE:.0f})")
+    parser.add_argument("--hedge", action="store_true",
+                        help="시도 중인 방법이 평소보다 오래 걸리면 다음 방법을 동시에 시작 (영상당 최대 2개)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="진행 상황을 출력하지 않음")
+    parser.add_argument("-v", "--verbose", action="store_true", help="대기/포맷 실패 등 세부 진행 상황도 출력")
+    parser.add_argument("--metrics-file",
+                        help="끝날 때 백엔드별 지연 시간/결과 지표를 Prometheus 텍스트 형식으로 기록할 파일")
+
+
+def _timeout(args: argparse.Namespace) -> Optional[float]:
+    return args.timeout if args.timeout and args.timeout > 0 else None
+
+
+def _write_metrics(args: argparse.Namespace) -> None:
+    if args.metrics_file:
+        from ytsub.metrics import write_textfile
+        write_textfile(args.metrics_file)
+
+
+def cmd_get(args: argparse.Namespace) -> int:
+    try:
+        return _get(args)
+    finally:
+        _write_metrics(args)
+
+
+def _get(args: argparse.Namespace) -> int:
+    from ytsub.pipeline import fetch_transcript
+
+    clean_url = to_clean_watch_url(args.url.strip())
+    vid = extract_video_id(clean_url)
+    if not vid:
+        print("❌ 유효한 YouTube 링크가 아닙니다.", file=sys.stderr)
+        return 2
+
+    progress = None if args.quiet else _stderr_progress(args.verbose)
+    try:
+        raw_transcript = fetch_transcript(clean_url, vid, args.langs, use_cache=args.use_cache,
+                                          max_retries=args.retries, progress=progress,
+                                          deadline=Deadline(_timeout(args)), hedge=args.hedge)
+    except ExtractionFailed as e:
+        if not args.quiet:
+            for i, (method, error) in enumerate(e.attempts, 1):
+                print(f"  {i}. {method}: {error}", file=sys.stderr)
+        print(f"자막 추출 실패: {e}", file=sys.stderr)
+        return 1
+    except TranscriptExtractionError as e:
+        print(f"자막 추출 실패: {e}", file=sys.stderr)
+        return 1
+
+    transcript = raw_transcript
+    if not args.raw:
+        transcript = apply_subtitle_cleaning(raw_transcript, args.clean_duplicates, args.merge_consecutive,
+                                             args.remove_overlap)
+
+    if args.output and args.output != "-":
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            write_export(transcript, args.format, f, vid)
+        if not args.quiet:
+            print(f"💾 {args.output} ({len(transcript)}개 구간)", file=sys.stderr)
+    else:
+        write_export(transcript, args.format, sys.stdout, vid)
+    return 0
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    from ytsub.batch import BatchState, normalize_targets, read_targets, run_batch
+    from ytsub.budget import RequestBudget
+
+    items = list(args.urls)
+    for path in args.input or []:
+        items.extend(read_targets(path))
+    video_ids, invalid = normalize_targets(items)
+    for item in invalid:
+        print(f"⚠️ 유효한 YouTube 링크가 아님: {item}", file=sys.stderr)
+    if not video_ids:
+        print("❌ 추출할 영상이 없습니다.", file=sys.stderr)
+        return 2
+
+    state = BatchState(args.state or os.path.join(args.output_dir, "batch_state.json"))
+    budget = RequestBudget(args.budget)
+
+    def progress(event: ProgressEvent) -> None:
+        if args.quiet or (event.level == DETAIL and not args.verbose):
+            return
+        prefix = f"[{event.backend}] " if event.level == DETAIL else ""
+        print(prefix + event.message.replace("**", ""), file=sys.stderr, flush=True)
+
+    try:
+        counts = run_batch(video_ids, state, args.output_dir, args.langs,
+                           clean_duplicates=args.clean_duplicates,
+                           merge_consecutive=args.merge_consecutive,
+                           remove_overlap=args.remove_overlap,
+                           use_cache=args.use_cache,
+                           max_retries=args.retries,
+                           timeout=_timeout(args),
+                           hedge=args.hedge,
+                           concurrency=args.jobs,
+                           budget=budget,
+                           min_interval=args.interval,
+                           retry_failed=args.retry_failed,
+                           fmt=args.format,
+                           progress=progress)
+    except KeyboardInterrupt:
+        print(f"\n⏹️ 중단됨 - 같은 명령으로 다시 실행하면 이어서 진행합니다 ({state.path})", file=sys.stderr)
+        return 130
+    finally:
+        _write_metrics(args)
+
+    print(f"완료 {counts['done']} · 실패 {counts['failed']} · 대기 {counts['pending']} ({state.path})",
+          file=sys.stderr)
+    if counts["pending"]:
+        return 3
+    return 1 if counts["failed"] else 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    from ytsub.batch import normalize_targets
+    from ytsub.cache import get_transcript_cache
+
+    video_ids = None
+    if args.urls:
+        video_ids, invalid = normalize_targets(args.urls)
+        for item in invalid:
+            print(f"⚠️ 유효한 YouTube 링크가 아님: {item}", file=sys.stderr)
+
+    entries = get_transcript_cache().iter_transcripts(video_ids)
+    if not args.raw:
+        entries = ((vid, apply_subtitle_cleaning(transcript, args.clean_duplicates, args.merge_consecutive,
+                                                 args.remove_overlap))
+                   for vid, transcript in entries)
+
+    if args.output == "-":
+        count = write_zip(entries, sys.stdout.buffer, args.format)
+    else:
+        with open(args.output, "wb") as f:
+            count = write_zip(entries, f, args.format)
+    if not args.quiet:
+        print(f"📦 {args.output} ({count}개 영상)", file=sys.stderr)
+    return 0 if count else 1
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    import sqlite3
+
+    from ytsub.search import INDEX_UNAVAILABLE_MESSAGE, get_search_index
+    from ytsub.urls import to_timestamp_url
+
+    try:
+        hits = get_search_index().search(" ".join(args.query), limit=args.limit)
+    except (sqlite3.Error, OSError) as e:
+        # SQLite에 FTS5/trigram이 없거나 색인 파일이 잠김/손상
+        print(f"⚠️ {INDEX_UNAVAILABLE_MESSAGE} ({e})", file=sys.stderr)
+        return 1
+    for hit in hits:
+        text = hit.text.replace("\n", " ")
+        print(f"{to_timestamp_url(hit.video_id, hit.start)}\t{text}")
+    return 0 if hits else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m ytsub", description="YouTube 자막 추출기")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    get = sub.add_parser("get", help="영상 하나의 자막을 출력하거나 파일로 저장")
+    get.add_argument("url", help="YouTube 링크 또는 비디오 ID")
+    get.add_argument("-o", "--output", help="저장할 파일 경로 (기본: 표준 출력)")
+    get.add_argument("--raw", action="store_true", help="정리하지 않은 원본 자막 출력")
+    _add_format_option(get, "txt")
+    _add_extraction_options(get)
+    get.set_defaults(func=cmd_get)
+
+    batch = sub.add_parser("batch", help="여러 영상을 한 번에 추출 (중단 후 이어서 실행 가능)")
+    batch.add_argument("urls", nargs="*", help="YouTube 링크 또는 비디오 ID")
+    batch.add_argument("-i", "--input", action="append",
+                       help="한 줄에 하나씩 링크가 적힌 파일 (\"-\"는 표준 입력, 여러 번 지정 가능)")
+    batch.add_argument("-o", "--output-dir", default="transcripts", help="자막 저장 폴더 (기본: transcripts)")
+    batch.add_argument("--state", help="진행 상태 파일 (기본: <output-dir>/batch_state.json)")
+    batch.add_argument("-j", "--jobs", type=int, default=2, help="동시에 추출할 영상 수 (기본 2)")
+    batch.add_argument("--budget", type=int, help="이번 실행에서 허용할 최대 백엔드 요청 수")
+    batch.add_argument("--interval", type=float, default=2.0,
+                       help="영상 추출 시작 간 최소 간격, 초 (기본 2.0)")
+    batch.add_argument("--retry-failed", action="store_true", help="이전에 실패한 영상도 다시 시도")
+    _add_format_option(batch, "txt")
+    _add_extraction_options(batch)
+    batch.set_defaults(func=cmd_batch)
+
+    export = sub.add_parser("export", help="캐시에 저장된 자막을 zip 하나로 내보내기 (네트워크 요청 없음)")
+    export.add_argument("urls", nargs="*", help="내보낼 영상 (기본: 캐시의 모든 영상)")
+    export.add_argument("-o", "--output", default="transcripts.zip",
+                        help="zip 파일 경로 (\"-\"는 표준 출력, 기본: transcripts.zip)")
+    export.add_argument("--raw", action="store_true", help="정리하지 않은 원본 자막 내보내기")
+    _add_format_option(export, "srt")
+    _add_cleaning_options(export)
+    export.add_argument("-q", "--quiet", action="store_true", help="요약을 출력하지 않음")
+    export.set_defaults(func=cmd_export)
+
+    search = sub.add_parser("search", help="지금까지 추출한 자막에서 검색 (네트워크 요청 없음)")
+    search.add_argument("query", nargs="+",
+                        help="검색어 (여러 개면 모두 포함한 구간). 3글자 미만 검색어만 있으면 "
+                             "색인 대신 저장된 구간 전체를 훑으므로 느릴 수 있음")
+    search.add_argument("-n", "--limit", type=int, default=20, help="최대 결과 수 (기본 20)")
+    search.set_defaults(func=cmd_search)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
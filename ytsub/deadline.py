@@ -0,0 +1,96 @@
+"""요청 하나의 전체 제한 시간.
+
+폴백 체인의 모든 단계(백엔드 호출, 재시도 대기, HTTP/소켓 시간 초과)가 같은 `Deadline`을
+받아 남은 시간 안에서만 움직인다. 제한 시간이 지나면 진행 중인 단계는 `DeadlineExceeded`로
+끝나고 파이프라인은 다음 백엔드를 시도하지 않는다.
+
+동시에 도는 시도마다 `child()`를 주면 끝 시각은 같으면서 시도 하나만 `cancel()`할 수 있다.
+취소된 시도는 다음 확인 지점(요청 시작, 응답 청크, 대기)에서 `DeadlineExceeded`로 끝난다.
+"""
+import threading
+import time
+from typing import Iterable, Iterator, Optional, TypeVar
+
+from ytsub.errors import DeadlineExceeded
+from ytsub.metrics import SLEEP_SECONDS
+
+# UI/CLI 기본 제한 시간 (초)
+DEFAULT_DEADLINE = 60.0
+# 남은 시간이 아무리 적어도 HTTP 시간 초과는 이보다 짧게 잡지 않음 (초)
+MIN_TIMEOUT = 0.1
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """끝나는 시각 (monotonic 기준). `seconds`가 None이면 제한 없음."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self._cancelled = threading.Event()
+
+    def child(self) -> "Deadline":
+        """끝 시각은 같고 따로 취소할 수 있는 제한 시간"""
+        child = Deadline()
+        child.seconds = self.seconds
+        child.expires_at = self.expires_at
+        return child
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """남은 시간 (초, 제한 없으면 None)"""
+        if self._cancelled.is_set():
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self._cancelled.is_set() or (self.expires_at is not None and time.monotonic() >= self.expires_at)
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise DeadlineExceeded("취소됨")
+        if self.expired:
+            raise DeadlineExceeded(f"제한 시간 {self.seconds:.0f}초 초과")
+
+    def allows(self, seconds: float) -> bool:
+        """지금부터 `seconds`를 써도 시간이 남는지"""
+        remaining = self.remaining()
+        return remaining is None or seconds < remaining
+
+    def timeout(self, default: float, share: int = 1) -> float:
+        """HTTP/소켓 시간 초과: 기본값과 남은 시간을 `share`번의 시도로 나눈 값 중 작은 것"""
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(MIN_TIMEOUT, min(default, remaining / share))
+
+    def sleep(self, seconds: float, reason: str, backend: str = "") -> None:
+        """대기 (대기가 끝나기 전에 제한 시간이 지나면 기다리지 않고 바로 DeadlineExceeded, 취소되면 즉시 깸)"""
+        self.check()
+        if not self.allows(seconds):
+            raise DeadlineExceeded(f"제한 시간 {self.seconds:.0f}초 안에 {seconds:.1f}초를 더 기다릴 수 없음")
+        started = time.perf_counter()
+        cancelled = self._cancelled.wait(seconds)
+        SLEEP_SECONDS.observe(time.perf_counter() - started, backend=backend, reason=reason)
+        if cancelled:
+            self.check()
+
+    def iterate(self, items: Iterable[T]) -> Iterator[T]:
+        """항목(응답 청크 등)을 받을 때마다 제한 시간 확인"""
+        for item in items:
+            self.check()
+            yield item
+
+    def __repr__(self) -> str:
+        return f"Deadline(seconds={self.seconds!r}, remaining={self.remaining()!r})"
@@ -0,0 +1,133 @@
+"""자막 추출 예외.
+
+백엔드 라이브러리(youtube_transcript_api, yt_dlp, pytube)의 예외는 각 백엔드에서
+이 모듈의 타입으로 바꿔서 올린다. 호출하는 쪽은 백엔드 패키지를 import하지 않고도
+실패 종류를 구분할 수 있다.
+
+각 타입은 실패 원인 분류(`reason`)와 같은 백엔드로 다시 시도할 의미가 있는지(`retryable`)를
+가진다. HTTP 응답에서 온 실패는 상태 코드(`status`)와 서버가 알려준 재시도 대기 시간
+(`retry_after`, 초)도 함께 담는다.
+"""
+import time
+from email.utils import parsedate_to_datetime
+from typing import List, Mapping, Optional, Tuple
+
+
+class TranscriptExtractionError(Exception):
+    """자막 추출 실패 시 사용하는 커스텀 예외"""
+
+    reason = "unknown"
+    retryable = False
+
+    def __init__(self, message: str = "", status: Optional[int] = None, retry_after: Optional[float] = None,
+                 retryable: Optional[bool] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        if retryable is not None:
+            self.retryable = retryable
+
+
+class NoTranscriptError(TranscriptExtractionError):
+    """영상에 요청한 자막이 없거나 자막 기능이 꺼져 있음"""
+
+    reason = "no_transcript"
+
+
+class VideoUnavailableError(TranscriptExtractionError):
+    """영상 자체에 접근할 수 없음 (비공개, 삭제, 지역/연령 제한 등)"""
+
+    reason = "unavailable"
+
+
+class RateLimitedError(TranscriptExtractionError):
+    """요청 제한 (HTTP 429 등) - Retry-After가 있으면 그만큼 기다린 뒤 다시 시도할 수 있음"""
+
+    reason = "rate_limited"
+    retryable = True
+
+
+class BlockedError(TranscriptExtractionError):
+    """IP/봇 차단 (HTTP 403, 봇 확인 요구 등) - 같은 경로로 곧바로 다시 시도해도 소용없음"""
+
+    reason = "blocked"
+
+
+class TransientError(TranscriptExtractionError):
+    """일시적인 서버/네트워크 오류 (5xx, 시간 초과, 연결 끊김)"""
+
+    reason = "transient"
+    retryable = True
+
+
+class DeadlineExceeded(TranscriptExtractionError):
+    """요청 전체 제한 시간(`ytsub.deadline.Deadline`)을 다 씀"""
+
+    reason = "timeout"
+
+
+class BudgetExhausted(TranscriptExtractionError):
+    """공유 요청 예산을 다 써서 더 시도하지 않음 (영상은 나중에 다시 시도 가능)"""
+    pass
+
+
+class ExtractionFailed(TranscriptExtractionError):
+    """모든 백엔드가 실패함.
+
+    `reason`은 실패 원인 분류(rate_limited, blocked, timeout, transient, no_transcript, unavailable, unknown),
+    `attempts`는 백엔드별 (이름, 결과 설명) 목록이다.
+    """
+
+    def __init__(self, message: str, reason: str, attempts: List[Tuple[str, str]]):
+        super().__init__(message)
+        self.reason = reason
+        self.attempts = list(attempts)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Retry-After 헤더 값(초 또는 HTTP 날짜)을 지금부터 기다릴 초로 (해석할 수 없으면 None)"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+# 실패한 요청의 종류: 영상 페이지/플레이어 API와 자막 파일(timedtext, 서명된 baseUrl)
+PAGE_REQUEST = "page"
+CAPTION_REQUEST = "caption"
+
+
+def error_for_status(status: int, message: str, headers: Optional[Mapping[str, str]] = None,
+                     request: str = PAGE_REQUEST) -> TranscriptExtractionError:
+    """HTTP 상태 코드를 실패 타입으로. 429/503의 Retry-After는 `retry_after`에 담는다.
+
+    자막 파일 URL의 4xx(429 제외)는 서명된 URL 만료나 형식 거부인 경우가 많아
+    영상 접근 불가/차단으로 보지 않는다 - 다음 형식이나 백엔드를 계속 시도한다.
+    """
+    retry_after = None
+    for key, value in (headers or {}).items():
+        if key.lower() == "retry-after":
+            retry_after = parse_retry_after(value)
+            break
+
+    if status == 429:
+        return RateLimitedError(message, status, retry_after)
+    if request == CAPTION_REQUEST and status < 500:
+        return TranscriptExtractionError(message, status)
+    # YouTube는 봇 확인을 403뿐 아니라 400으로도 돌려준다
+    if status in (400, 401, 403):
+        return BlockedError(message, status)
+    if status in (404, 410):
+        return VideoUnavailableError(message, status)
+    if status == 408 or status >= 500:
+        return TransientError(message, status, retry_after)
+    return TranscriptExtractionError(message, status)
@@ -0,0 +1,151 @@
+"""자막 내보내기 (TXT, SRT, WebVTT, JSON, JSONL)와 여러 자막의 zip 일괄 내보내기.
+
+모든 형식은 Transcript의 구간 배열을 한 번 순회하며 조각 단위로 만들어 내므로
+전체 출력 문자열을 메모리에 만들지 않는다. 끝 시간은 원본 형식이 준 값을 그대로 쓰고,
+끝 시간이 없는 구간은 SRT/VTT에서만 다음 구간 시작(최대 `MAX_INFERRED_DURATION`초)으로
+채운다. JSON/JSONL에는 모르는 끝 시간을 null로 남긴다.
+"""
+import io
+import json
+import math
+import zipfile
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, TextIO, Tuple
+
+from ytsub.model import Transcript
+
+# 끝 시간이 없는 구간의 표시 시간 상한 (초)
+MAX_INFERRED_DURATION = 5.0
+
+
+def _inferred_ends(transcript: Transcript) -> Iterator[Tuple[float, float, str]]:
+    """(start, end, text) - 끝 시간이 없으면 다음 구간 시작으로 추정"""
+    items = transcript.items()
+    previous = next(items, None)
+    if previous is None:
+        return
+    for current in items:
+        start, end, text = previous
+        if math.isnan(end):
+            end = start + min(MAX_INFERRED_DURATION, max(current[0] - start, 0.0))
+        yield start, end, text
+        previous = current
+    start, end, text = previous
+    yield start, start + MAX_INFERRED_DURATION if math.isnan(end) else end, text
+
+
+def _clock(seconds: float, separator: str) -> str:
+    millis = int(round(max(seconds, 0.0) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def _cue_lines(text: str) -> str:
+    # 빈 줄은 큐의 끝을 뜻하므로 본문 안에서는 없앤다
+    return "\n".join(line for line in text.splitlines() if line.strip()) or " "
+
+
+def _json_end(end: float) -> Optional[float]:
+    return None if math.isnan(end) else end
+
+
+def iter_txt(transcript: Transcript, video_id: Optional[str] = None) -> Iterator[str]:
+    for line in transcript.iter_lines():
+        yield line + "\n"
+
+
+def iter_srt(transcript: Transcript, video_id: Optional[str] = None) -> Iterator[str]:
+    for i, (start, end, text) in enumerate(_inferred_ends(transcript), 1):
+        yield f"{i}\n{_clock(start, ',')} --> {_clock(end, ',')}\n{_cue_lines(text)}\n\n"
+
+
+def iter_vtt(transcript: Transcript, video_id: Optional[str] = None) -> Iterator[str]:
+    header = "WEBVTT"
+    if transcript.language:
+        header += f"\nLanguage: {transcript.language}"
+    yield header + "\n\n"
+    for start, end, text in _inferred_ends(transcript):
+        text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        yield f"{_clock(start, '.')} --> {_clock(end, '.')}\n{_cue_lines(text)}\n\n"
+
+
+def iter_json(transcript: Transcript, video_id: Optional[str] = None) -> Iterator[str]:
+    meta = {"video_id": video_id, "language": transcript.language,
+            "kind": transcript.kind, "source": transcript.source}
+    yield json.dumps(meta, ensure_ascii=False)[:-1] + ', "segments": ['
+    separator = "\n"
+    for start, end, text in transcript.items():
+        yield separator + json.dumps({"start": start, "end": _json_end(end), "text": text},
+                                     ensure_ascii=False)
+        separator = ",\n"
+    yield "\n]}\n"
+
+
+def iter_jsonl(transcript: Transcript, video_id: Optional[str] = None) -> Iterator[str]:
+    """구간당 한 줄. 여러 영상을 이어 붙여도 구분되도록 video_id를 줄마다 넣는다."""
+    for start, end, text in transcript.items():
+        yield json.dumps({"video_id": video_id, "start": start, "end": _json_end(end), "text": text},
+                         ensure_ascii=False) + "\n"
+
+
+class ExportFormat(NamedTuple):
+    label: str
+    extension: str
+    mime: str
+    render: Callable[[Transcript, Optional[str]], Iterator[str]]
+
+
+FORMATS: Dict[str, ExportFormat] = {
+    "txt": ExportFormat("TXT", "txt", "text/plain", iter_txt),
+    "srt": ExportFormat("SRT", "srt", "application/x-subrip", iter_srt),
+    "vtt": ExportFormat("WebVTT", "vtt", "text/vtt", iter_vtt),
+    "json": ExportFormat("JSON", "json", "application/json", iter_json),
+    "jsonl": ExportFormat("JSONL", "jsonl", "application/x-ndjson", iter_jsonl),
+}
+
+
+def _get_format(fmt: str) -> ExportFormat:
+    try:
+        return FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f"지원하지 않는 형식: {fmt} (가능: {', '.join(FORMATS)})") from None
+
+
+def iter_export(transcript: Transcript, fmt: str, video_id: Optional[str] = None) -> Iterator[str]:
+    """`fmt` 형식의 출력을 조각 단위로 반환"""
+    return _get_format(fmt).render(transcript, video_id)
+
+
+def write_export(transcript: Transcript, fmt: str, fp: TextIO, video_id: Optional[str] = None) -> None:
+    for chunk in iter_export(transcript, fmt, video_id):
+        fp.write(chunk)
+
+
+def export_bytes(transcript: Transcript, fmt: str, video_id: Optional[str] = None) -> bytes:
+    """다운로드 버튼처럼 bytes가 필요한 곳에서 사용 (UTF-8)"""
+    buffer = io.BytesIO()
+    text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    write_export(transcript, fmt, text, video_id)
+    text.flush()
+    return buffer.getvalue()
+
+
+def write_zip(entries: Iterable[Tuple[str, Transcript]], fileobj: BinaryIO, fmt: str) -> int:
+    """(video_id, Transcript) 목록을 `<video_id>.<확장자>` 파일들로 zip에 기록.
+
+    항목을 하나씩 받아 바로 압축 스트림에 쓰므로 한 번에 자막 하나만 메모리에 둔다.
+    `fileobj`는 탐색 불가능한 스트림(표준 출력 등)이어도 된다. 기록한 파일 수를 반환.
+    """
+    export_format = _get_format(fmt)
+    count = 0
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for video_id, transcript in entries:
+            with archive.open(f"{video_id}.{export_format.extension}", "w") as raw:
+                text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+                for chunk in export_format.render(transcript, video_id):
+                    text.write(chunk)
+                text.flush()
+                text.detach()
+            count += 1
+    return count
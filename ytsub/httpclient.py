@@ -0,0 +1,125 @@
+"""자막/메타데이터 다운로드용 공유 HTTP 커넥션 풀."""
+import threading
+from typing import Dict, Iterator, Optional
+
+import urllib3
+from urllib3.util import Retry, Timeout
+
+DEFAULT_TIMEOUT = Timeout(connect=10.0, read=30.0)
+# 호스트별 최대 동시 연결 수 (초과 시 다른 스레드가 연결을 반납할 때까지 대기)
+DEFAULT_POOL_MAXSIZE = 8
+DEFAULT_NUM_POOLS = 16
+# 풀의 연결이 모두 사용 중일 때 반납을 기다리는 최대 시간 (호출자가 시간 초과를 주면 그 값을 씀)
+DEFAULT_POOL_TIMEOUT = 10.0
+STREAM_CHUNK_SIZE = 64 * 1024
+# 연결/읽기 재시도를 포함한 요청 하나의 최대 시도 횟수 (호출자가 시간 초과를 나눠 정할 때 사용)
+MAX_ATTEMPTS = 3
+
+# 앱 전체 SSL 설정과 동일하게 인증서 검증은 하지 않는다
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+class HTTPStatusError(Exception):
+    """4xx/5xx 응답"""
+
+    def __init__(self, url: str, status: int, headers: Optional[Dict[str, str]] = None):
+        super().__init__(f"HTTP {status}: {url}")
+        self.url = url
+        self.status = status
+        self.headers = dict(headers or {})
+
+
+class HTTPClient:
+    """스레드 안전한 keep-alive 커넥션 풀 래퍼.
+
+    같은 영상에 대해 여러 포맷/언어를 시도하거나 여러 세션이 동시에 요청해도
+    호스트별 풀의 연결을 재사용하므로 TLS 핸드셰이크를 반복하지 않는다.
+    응답은 gzip/deflate를 자동으로 해제한다.
+    """
+
+    def __init__(self, num_pools: int = DEFAULT_NUM_POOLS, maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 timeout: Timeout = DEFAULT_TIMEOUT, pool_timeout: float = DEFAULT_POOL_TIMEOUT):
+        self.timeout = timeout
+        self.pool_timeout = pool_timeout
+        self._pool = urllib3.PoolManager(
+            num_pools=num_pools,
+            maxsize=maxsize,
+            block=True,
+            timeout=timeout,
+            retries=Retry(total=MAX_ATTEMPTS - 1, connect=2, read=1, status=0, redirect=5, backoff_factor=0.3,
+                          raise_on_status=False),
+            cert_reqs="CERT_NONE",
+        )
+        self._accept_encoding = urllib3.util.make_headers(accept_encoding=True)["accept-encoding"]
+
+    def _headers(self, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        merged = dict(headers or {})
+        # brotli 등 해제할 수 없는 인코딩을 요청하지 않도록 덮어씀
+        for key in [k for k in merged if k.lower() == "accept-encoding"]:
+            del merged[key]
+        merged["Accept-Encoding"] = self._accept_encoding
+        return merged
+
+    def _request(self, method: str, url: str, headers: Optional[Dict[str, str]],
+                 timeout: Optional[float], preload: bool, body: Optional[bytes] = None):
+        resp = self._pool.request(
+            method,
+            url,
+            body=body,
+            headers=self._headers(headers),
+            timeout=timeout if timeout is not None else self.timeout,
+            # block=True 풀에서 연결을 무한정 기다리지 않도록 (초과 시 EmptyPoolError)
+            pool_timeout=timeout if timeout is not None else self.pool_timeout,
+            preload_content=preload,
+            decode_content=True,
+        )
+        if resp.status >= 400:
+            error = HTTPStatusError(url, resp.status, resp.headers)
+            resp.drain_conn()
+            resp.release_conn()
+            raise error
+        return resp
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None) -> bytes:
+        resp = self._request("GET", url, headers, timeout, preload=True)
+        return resp.data
+
+    def post(self, url: str, body: bytes, headers: Optional[Dict[str, str]] = None,
+             timeout: Optional[float] = None) -> bytes:
+        resp = self._request("POST", url, headers, timeout, preload=True, body=body)
+        return resp.data
+
+    def get_text(self, url: str, headers: Optional[Dict[str, str]] = None,
+                 timeout: Optional[float] = None) -> str:
+        return self.get(url, headers, timeout).decode("utf-8", errors="ignore")
+
+    def stream(self, url: str, headers: Optional[Dict[str, str]] = None,
+               timeout: Optional[float] = None,
+               chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """응답 본문을 청크 단위로 반환. 끝나거나 중단되면 연결을 풀에 돌려준다."""
+        resp = self._request("GET", url, headers, timeout, preload=False)
+        finished = False
+        try:
+            for chunk in resp.stream(chunk_size, decode_content=True):
+                yield chunk
+            finished = True
+        finally:
+            if finished:
+                resp.release_conn()
+            else:
+                # 중간에 그만 읽은 연결은 남은 데이터 때문에 재사용할 수 없음
+                resp.close()
+
+
+_default_client: Optional[HTTPClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """프로세스 전체에서 공유하는 기본 HTTP 클라이언트."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HTTPClient()
+        return _default_client
@@ -0,0 +1,118 @@
+"""백그라운드 추출 작업 관리.
+
+Streamlit은 위젯을 건드릴 때마다 스크립트를 처음부터 다시 실행하므로 추출을
+스크립트 스레드에서 돌리면 작업이 버려진다. 작업은 여기서 워커 스레드로 돌리고,
+UI는 재실행될 때마다 같은 `Job`에 다시 붙어 쌓인 진행 이벤트와 결과를 읽는다.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional
+
+from ytsub.progress import ProgressCallback, ProgressEvent
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_MAX_WORKERS = 4
+# 끝난 작업을 관리자에 남겨 두는 시간 (세션은 Job 참조를 따로 들고 있음)
+DEFAULT_KEEP_FINISHED = 600.0
+
+
+class Job:
+    """작업 하나의 상태, 진행 이벤트, 결과"""
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.status = QUEUED
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._events: List[ProgressEvent] = []
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def events(self, since: int = 0) -> List[ProgressEvent]:
+        with self._lock:
+            return self._events[since:]
+
+    def _record(self, event: ProgressEvent) -> None:
+        with self._lock:
+            self._events.append(event)
+
+    def _run(self, fn: Callable[[ProgressCallback], object]) -> None:
+        self.started_at = time.time()
+        self.status = RUNNING
+        status = FAILED
+        try:
+            self.result = fn(self._record)
+            status = DONE
+        except BaseException as e:
+            self.error = e
+        finally:
+            # 다른 스레드가 finished를 보고 finished_at을 읽으므로 끝난 시각을 먼저 기록
+            self.finished_at = time.time()
+            self.status = status
+
+    def __repr__(self) -> str:
+        return f"Job(key={self.key!r}, status={self.status!r}, events={len(self._events)})"
+
+
+class JobManager:
+    """키(영상 + 옵션)별로 작업을 하나만 돌리는 관리자.
+
+    같은 키의 작업이 아직 끝나지 않았으면 `submit`은 새로 시작하지 않고 그 작업을 돌려준다.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 keep_finished: float = DEFAULT_KEEP_FINISHED):
+        self.keep_finished = keep_finished
+        self._jobs: Dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ytsub-job")
+
+    def get(self, key: Hashable) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def submit(self, key: Hashable, fn: Callable[[ProgressCallback], object]) -> Job:
+        """`fn(progress)`을 백그라운드로 실행. 진행 중인 같은 키의 작업이 있으면 그것을 반환."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and not job.finished:
+                return job
+            job = Job(key)
+            self._jobs[key] = job
+        self._executor.submit(job._run, fn)
+        return job
+
+    def active(self) -> List[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.finished]
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.keep_finished
+        for key in [k for k, job in self._jobs.items()
+                    if job.finished and job.finished_at is not None and job.finished_at < cutoff]:
+            del self._jobs[key]
+
+
+_default_manager: Optional[JobManager] = None
+_default_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """프로세스 전체에서 공유하는 기본 작업 관리자 (모든 Streamlit 세션이 공유)."""
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = JobManager()
+        return _default_manager
@@ -0,0 +1,44 @@
+"""프로세스 내 TTL 메모이즈 (st.cache_data 대체)."""
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+
+def ttl_memoize(ttl: float, max_entries: int):
+    """위치 인자를 키로 결과를 `ttl`초 동안 보관하는 데코레이터.
+
+    키워드 인자(제한 시간 등 결과에 영향이 없는 호출 옵션)는 키에 넣지 않고 그대로 넘긴다.
+    예외는 저장하지 않는다. 항목이 `max_entries`를 넘으면 가장 오래 쓰이지 않은 것부터 버린다.
+    반환값은 호출자끼리 공유되므로 수정하지 말 것.
+    """
+    def decorator(func):
+        entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            now = time.monotonic()
+            with lock:
+                hit = entries.get(args)
+                if hit is not None and hit[0] > now:
+                    entries.move_to_end(args)
+                    return hit[1]
+
+            value = func(*args, **kwargs)
+
+            with lock:
+                entries[args] = (now + ttl, value)
+                entries.move_to_end(args)
+                while len(entries) > max_entries:
+                    entries.popitem(last=False)
+            return value
+
+        def cache_clear() -> None:
+            with lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,275 @@
+"""백엔드별 지연 시간/결과 지표 (Prometheus 텍스트 형식 내보내기).
+
+외부 의존성 없이 프로세스 안에 카운터와 히스토그램을 모아 둔다. 내보내는 방법은 두 가지:
+
+- `write_textfile(path)`: node_exporter textfile collector가 읽을 수 있는 파일로 기록
+  (CLI의 `--metrics-file`)
+- `start_http_server(port)`: `http://127.0.0.1:<port>/metrics`로 제공
+  (Streamlit 앱은 `YTSUB_METRICS_PORT` 환경 변수가 있으면 띄운다)
+"""
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 초 단위 버킷: 캐시/파싱(ms) ~ 재시도 대기와 느린 백엔드(수십 초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """단조 증가 카운터 (레이블 조합별)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> Iterator[str]:
+        for key, value in sorted(self.values().items()):
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (레이블 조합별 버킷 개수, 합계, 관측 수)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # 레이블 조합 → [버킷별 개수..., 합계, 관측 수]
+        self._series: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def series(self) -> Dict[LabelValues, Tuple[List[int], float, int]]:
+        """레이블 조합 → (누적 버킷 개수, 합계, 관측 수)"""
+        with self._lock:
+            snapshot = {key: list(values) for key, values in self._series.items()}
+        result = {}
+        for key, values in snapshot.items():
+            cumulative = []
+            running = 0
+            for count in values[:len(self.buckets)]:
+                running += count
+                cumulative.append(running)
+            result[key] = (cumulative, values[-2], values[-1])
+        return result
+
+    def render(self) -> Iterator[str]:
+        for key, (cumulative, total, count) in sorted(self.series().items()):
+            for bound, bucket_count in zip(self.buckets, cumulative):
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, key, le)} {bucket_count}"
+            yield f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, key)} {count}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """지표 목록과 텍스트 형식 출력"""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식 (0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "ytsub_stage_seconds", "Time spent per extraction stage (metadata, list_tracks, download, parse, clean)",
+    ("backend", "stage"))
+BACKEND_SECONDS = REGISTRY.histogram(
+    "ytsub_backend_seconds", "Wall time of one backend attempt, including its own retries and sleeps",
+    ("backend", "outcome"))
+BACKEND_ERRORS = REGISTRY.counter(
+    "ytsub_backend_errors_total", "Backend failures by error class and classified reason",
+    ("backend", "error", "reason"))
+FETCH_SECONDS = REGISTRY.histogram(
+    "ytsub_fetch_seconds", "End-to-end fetch_transcript time", ("outcome",))
+SLEEP_SECONDS = REGISTRY.histogram(
+    "ytsub_sleep_seconds", "Deliberate waits (smart_delay, rate-limit backoff, format retry)",
+    ("backend", "reason"))
+CACHE_REQUESTS = REGISTRY.counter(
+    "ytsub_cache_requests_total", "Transcript cache lookups", ("result",))
+HEDGED_ATTEMPTS = REGISTRY.counter(
+    "ytsub_hedged_attempts_total", "Backends started early because the running one exceeded its latency percentile",
+    ("backend",))
+
+
+@contextmanager
+def span(stage: str, backend: str = "") -> Iterator[None]:
+    """블록 실행 시간을 단계 히스토그램에 기록 (예외가 나도 기록)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, backend=backend, stage=stage)
+
+
+def timed_sleep(seconds: float, reason: str, backend: str = "") -> None:
+    """의도적인 대기 - 실제 I/O 시간과 구분해서 기록"""
+    started = time.perf_counter()
+    time.sleep(seconds)
+    SLEEP_SECONDS.observe(time.perf_counter() - started, backend=backend, reason=reason)
+
+
+class TimedChunks:
+    """청크 이터레이터를 감싸 다음 청크를 기다린 시간(네트워크)만 따로 잰다.
+
+    스트리밍 파서는 받기와 파싱이 섞여 있으므로, 전체 시간에서 `elapsed`를 빼면 파싱 시간이다.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.elapsed = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return next(self._chunks)
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+
+def backend_summary() -> Dict[str, Dict[str, float]]:
+    """백엔드별 시도 수, 성공 수, 평균 시간, 대기 시간 합계 (UI 표시용)"""
+    summary: Dict[str, Dict[str, float]] = {}
+    for (backend, outcome), (_buckets, total, count) in BACKEND_SECONDS.series().items():
+        entry = summary.setdefault(backend, {"attempts": 0, "successes": 0, "seconds": 0.0, "sleep": 0.0})
+        entry["attempts"] += count
+        entry["seconds"] += total
+        if outcome == "success":
+            entry["successes"] += count
+    for (backend, _reason), (_buckets, total, _count) in SLEEP_SECONDS.series().items():
+        if backend in summary:
+            summary[backend]["sleep"] += total
+    return summary
+
+
+def write_textfile(path: str, registry: Optional[MetricsRegistry] = None) -> None:
+    """지표를 파일로 원자적으로 기록 (수집기가 쓰다 만 파일을 읽지 않도록)"""
+    registry = registry or REGISTRY
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """/metrics를 제공하는 데몬 스레드 서버 시작 (이미 떠 있으면 그 서버를 반환)"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            thread = threading.Thread(target=_server.serve_forever, name="ytsub-metrics", daemon=True)
+            thread.start()
+        return _server
@@ -0,0 +1,265 @@
+"""배열 기반 자막 데이터 모델."""
+import json
+import math
+from bisect import bisect_right
+import re
+import struct
+import sys
+from array import array
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# 기존 "[12.3] text" 텍스트 형식 (출력/호환용)
+LEGACY_LINE_RE = re.compile(r'\[(\d+\.?\d*)\]\s*(.*)')
+
+# 직렬화 헤더: 매직, 버전, 구간 수, 메타 JSON 길이
+_BLOB_HEADER = struct.Struct("<4sHII")
+_BLOB_MAGIC = b"YTSB"
+_BLOB_VERSION = 1
+
+
+class Segment:
+    """자막 한 구간 (시작/끝 초, 텍스트). 끝 시간을 모르면 NaN."""
+
+    __slots__ = ("start", "end", "text")
+
+    def __init__(self, start: float, text: str, end: float = math.nan):
+        self.start = start
+        self.end = end
+        self.text = text
+
+    @property
+    def has_end(self) -> bool:
+        return not math.isnan(self.end)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Segment):
+            return NotImplemented
+        return (self.start == other.start and self.text == other.text
+                and (self.end == other.end or (math.isnan(self.end) and math.isnan(other.end))))
+
+    def __repr__(self) -> str:
+        return f"Segment(start={self.start!r}, end={self.end!r}, text={self.text!r})"
+
+
+class VideoInfo(NamedTuple):
+    """영상 메타 정보"""
+    title: str
+    length: int     # 초
+
+
+class TranscriptStats:
+    """자막 통계 (Transcript.stats가 한 번의 순회로 계산)"""
+
+    __slots__ = ("segments", "words", "chars", "span", "covered")
+
+    def __init__(self, segments: int = 0, words: int = 0, chars: int = 0,
+                 span: float = 0.0, covered: float = 0.0):
+        self.segments = segments
+        self.words = words
+        self.chars = chars
+        self.span = span            # 첫 구간 시작 ~ 마지막 구간 끝 (초)
+        self.covered = covered      # 자막이 떠 있는 시간 합 (겹침 제외, 초)
+
+    @property
+    def coverage(self) -> float:
+        """전체 구간 중 자막이 있는 시간 비율 (0~1)"""
+        return self.covered / self.span if self.span > 0 else 0.0
+
+    @property
+    def segments_per_minute(self) -> float:
+        return self.segments / (self.span / 60) if self.span > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (f"TranscriptStats(segments={self.segments}, words={self.words}, chars={self.chars}, "
+                f"span={self.span:.1f}, covered={self.covered:.1f})")
+
+
+class Transcript:
+    """자막 전체를 담는 압축 표현.
+
+    시작/끝 시간은 float 배열에, 텍스트는 하나의 버퍼와 오프셋 배열에 저장한다.
+    모든 백엔드는 이 객체를 만들고 정리 함수들은 이 객체를 받아 새 객체를 돌려준다.
+    "[t] text" 문자열은 출력 시점에만 `to_text()`로 만든다.
+    """
+
+    __slots__ = ("starts", "ends", "_offsets", "_buffer", "_pending", "_stats",
+                 "language", "kind", "source")
+
+    def __init__(self, language: Optional[str] = None, kind: Optional[str] = None,
+                 source: Optional[str] = None):
+        self.starts = array('d')
+        self.ends = array('d')
+        self._offsets = array('q', [0])
+        self._buffer = ""
+        # append 중에는 조각을 모아 두었다가 읽을 때 한 번에 버퍼로 합침
+        self._pending: List[str] = []
+        self._stats: Optional[TranscriptStats] = None
+        self.language = language
+        self.kind = kind        # "manual" / "auto"
+        self.source = source    # 추출 백엔드 (yta, ytdlp, pytube)
+
+    # ---------------------------------
+    # 생성
+    # ---------------------------------
+    def derive(self) -> "Transcript":
+        """메타데이터만 복사한 빈 Transcript."""
+        return Transcript(language=self.language, kind=self.kind, source=self.source)
+
+    def append(self, start: float, text: str, end: float = math.nan) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self._pending.append(text)
+        self._offsets.append(self._offsets[-1] + len(text))
+        self._stats = None
+
+    @classmethod
+    def from_text(cls, transcript_text: str, **meta) -> "Transcript":
+        """기존 "[t] text" 형식 문자열을 Transcript로 변환."""
+        transcript = cls(**meta)
+        for line in transcript_text.split('\n'):
+            match = LEGACY_LINE_RE.match(line)
+            if match:
+                transcript.append(float(match.group(1)), match.group(2).strip())
+        return transcript
+
+    # ---------------------------------
+    # 조회
+    # ---------------------------------
+    def _flush(self) -> str:
+        if self._pending:
+            self._buffer += "".join(self._pending)
+            self._pending.clear()
+        return self._buffer
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+
+    @property
+    def char_count(self) -> int:
+        return self._offsets[-1]
+
+    def text(self, i: int) -> str:
+        buffer = self._flush()
+        return buffer[self._offsets[i]:self._offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> Segment:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("segment index out of range")
+        return Segment(self.starts[i], self.text(i), self.ends[i])
+
+    def __iter__(self) -> Iterator[Segment]:
+        for start, end, text in self.items():
+            yield Segment(start, text, end)
+
+    def items(self) -> Iterator[Tuple[float, float, str]]:
+        """(start, end, text) 튜플을 순서대로 반환 (Segment 생성 없는 빠른 경로)."""
+        buffer = self._flush()
+        offsets = self._offsets
+        starts = self.starts
+        ends = self.ends
+        for i in range(len(starts)):
+            yield starts[i], ends[i], buffer[offsets[i]:offsets[i + 1]]
+
+    @property
+    def stats(self) -> TranscriptStats:
+        """단어/구간/문자 수와 시간 정보. 처음 접근할 때 한 번 순회해 계산하고 보관한다."""
+        if self._stats is None:
+            words = 0
+            covered = 0.0
+            first_start = math.inf
+            last_time = -math.inf
+            # 겹치는 구간은 한 번만 세도록 현재 덮인 구간 [run_start, run_end]를 이어 붙임
+            run_start = run_end = -math.inf
+            for start, end, text in self.items():
+                words += len(text.split())
+                if start < first_start:
+                    first_start = start
+                if end != end:  # NaN: 끝 시간 모름
+                    last_time = max(last_time, start)
+                    continue
+                last_time = max(last_time, end)
+                if start > run_end:
+                    covered += run_end - run_start if run_end > run_start else 0.0
+                    run_start, run_end = start, end
+                elif end > run_end:
+                    run_end = end
+            if run_end > run_start:
+                covered += run_end - run_start
+            span = last_time - first_start if self.starts else 0.0
+            self._stats = TranscriptStats(len(self), words, self.char_count, max(span, 0.0), covered)
+        return self._stats
+
+    def index_at(self, seconds: float) -> int:
+        """해당 시각에 보이는(그 시각 이전에 시작한 마지막) 구간 번호"""
+        return max(0, bisect_right(self.starts, seconds) - 1)
+
+    def texts(self) -> Iterator[str]:
+        buffer = self._flush()
+        offsets = self._offsets
+        for i in range(len(self.starts)):
+            yield buffer[offsets[i]:offsets[i + 1]]
+
+    # ---------------------------------
+    # 직렬화 (캐시 저장용)
+    # ---------------------------------
+    def to_bytes(self) -> bytes:
+        """배열과 텍스트 버퍼를 그대로 담은 바이너리 표현 (리틀 엔디언)."""
+        meta = json.dumps(
+            {"language": self.language, "kind": self.kind, "source": self.source}
+        ).encode("utf-8")
+        arrays = [self.starts, self.ends, self._offsets]
+        if sys.byteorder == "big":
+            arrays = [array(a.typecode, a) for a in arrays]
+            for a in arrays:
+                a.byteswap()
+        parts = [_BLOB_HEADER.pack(_BLOB_MAGIC, _BLOB_VERSION, len(self), len(meta)), meta]
+        parts.extend(a.tobytes() for a in arrays)
+        parts.append(self._flush().encode("utf-8"))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "Transcript":
+        magic, version, count, meta_len = _BLOB_HEADER.unpack_from(blob)
+        if magic != _BLOB_MAGIC or version != _BLOB_VERSION:
+            raise ValueError("unsupported transcript blob")
+        pos = _BLOB_HEADER.size
+        transcript = cls(**json.loads(blob[pos:pos + meta_len].decode("utf-8")))
+        pos += meta_len
+
+        for name, typecode, length in (("starts", "d", count), ("ends", "d", count),
+                                       ("_offsets", "q", count + 1)):
+            values = array(typecode)
+            size = values.itemsize * length
+            values.frombytes(blob[pos:pos + size])
+            if sys.byteorder == "big":
+                values.byteswap()
+            setattr(transcript, name, values)
+            pos += size
+
+        transcript._buffer = blob[pos:].decode("utf-8")
+        return transcript
+
+    # ---------------------------------
+    # 출력
+    # ---------------------------------
+    def iter_lines(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """[start, stop) 구간의 "[t] text" 줄 (뷰어 페이지처럼 일부만 필요할 때)"""
+        buffer = self._flush()
+        offsets = self._offsets
+        starts = self.starts
+        stop = len(starts) if stop is None else min(stop, len(starts))
+        for i in range(max(0, start), stop):
+            yield f"[{starts[i]:.1f}] {buffer[offsets[i]:offsets[i + 1]]}"
+
+    def to_text(self) -> str:
+        """"[t] text" 줄 형식 문자열로 변환 (출력 시점에만 사용)."""
+        return '\n'.join(self.iter_lines())
+
+    def __repr__(self) -> str:
+        return (f"Transcript(segments={len(self)}, language={self.language!r}, "
+                f"kind={self.kind!r}, source={self.source!r})")
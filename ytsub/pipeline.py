@@ -0,0 +1,420 @@
+"""3단계 폴백 자막 추출 파이프라인 (Streamlit 비의존)."""
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ytsub.backends import run_backend
+from ytsub.breaker import CircuitBreaker, get_circuit_breakers
+from ytsub.budget import RequestBudget
+from ytsub.cache import get_transcript_cache
+from ytsub.deadline import Deadline
+from ytsub.errors import (
+    BudgetExhausted,
+    DeadlineExceeded,
+    ExtractionFailed,
+    NoTranscriptError,
+    TranscriptExtractionError,
+    VideoUnavailableError,
+)
+from ytsub.metrics import BACKEND_ERRORS, BACKEND_SECONDS, CACHE_REQUESTS, FETCH_SECONDS, HEDGED_ATTEMPTS
+from ytsub.model import Transcript
+from ytsub.progress import ProgressCallback, Reporter
+from ytsub.scoring import get_backend_scoreboard
+from ytsub.search import get_search_index
+from ytsub.stealth import new_session_id, smart_delay
+
+# 실패 원인별 최종 메시지
+FAILURE_MESSAGES = {
+    "rate_limited": "YouTube API 요청 제한 - 잠시 후 다시 시도하세요",
+    "blocked": "YouTube에서 접근을 차단했습니다 - VPN 사용을 권장합니다",
+    "timeout": "제한 시간 안에 자막을 가져오지 못했습니다 - 제한 시간을 늘리거나 잠시 후 다시 시도하세요",
+    "transient": "YouTube 서버 또는 네트워크 오류 - 잠시 후 다시 시도하세요",
+    "no_transcript": "이 영상에는 자막이 없거나 자막 기능이 비활성화되어 있습니다",
+    "unavailable": "영상에 접근할 수 없습니다 (비공개, 연령제한, 지역제한 등)",
+    "unknown": "알 수 없는 이유로 자막 추출에 실패했습니다",
+}
+
+
+# 차단기가 열린 원인별 안내 문구
+BREAKER_REASON_TEXT = {
+    "rate_limited": "요청 제한",
+    "blocked": "접근 차단",
+}
+
+# 여러 백엔드가 서로 다른 이유로 실패했을 때 최종 원인으로 고르는 순서.
+# 요청 제한/차단/일시적 오류는 실제로 자막이 있어도 "자막 없음"처럼 보이게 만들 수 있으므로 앞선다.
+FAILURE_PRIORITY = ("rate_limited", "blocked", "timeout", "transient", "no_transcript", "unavailable")
+
+# 헤지 실행: 진행 중인 백엔드가 최근 성공 시간의 이 분위수를 넘기면 다음 백엔드를 함께 시작
+HEDGE_PERCENTILE = 0.9
+# 영상 하나에 동시에 진행할 수 있는 백엔드 시도 수 상한
+DEFAULT_MAX_IN_FLIGHT = 2
+
+
+def classify_failure(reasons: List[str]) -> str:
+    """백엔드별 실패 원인(`TranscriptExtractionError.reason`)들로 최종 원인 결정"""
+    for reason in FAILURE_PRIORITY:
+        if reason in reasons:
+            return reason
+    return "unknown"
+
+
+def backend_order() -> List[str]:
+    """최근 성공률/지연 시간 점수 순서 (프로세스 전체 공유, 시간에 따라 감쇠)"""
+    return get_backend_scoreboard().order()
+
+
+def _record_backend_error(method: str, error: Exception) -> str:
+    """오류 클래스와 원인 분류별 카운터. 분류한 원인을 반환."""
+    reason = error.reason if isinstance(error, TranscriptExtractionError) else "unknown"
+    BACKEND_ERRORS.inc(backend=method, error=type(error).__name__, reason=reason)
+    return reason
+
+
+# 검색 색인 쓰기는 자막을 돌려주는 경로 밖에서 워커 하나가 받은 순서대로 처리
+# (긴 자막은 중복 제거 + 대량 삽입에 수 초가 걸리고, SQLite 쓰기는 어차피 직렬)
+_index_executor: Optional[ThreadPoolExecutor] = None
+_index_executor_lock = threading.Lock()
+
+
+def _get_index_executor() -> ThreadPoolExecutor:
+    global _index_executor
+    with _index_executor_lock:
+        if _index_executor is None:
+            _index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ytsub-index")
+        return _index_executor
+
+
+def _index_now(video_id: str, transcript: Transcript, only_new: bool) -> None:
+    try:
+        index = get_search_index()
+        if only_new and index.contains(video_id):
+            return
+        index.add(video_id, transcript)
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def _set_title_now(video_id: str, title: str) -> None:
+    try:
+        get_search_index().set_title(video_id, title)
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def index_transcript(video_id: str, transcript: Transcript, only_new: bool = False) -> Future:
+    """검색 색인에 추가를 백그라운드 워커에 맡김 (색인 실패는 추출 결과에 영향을 주지 않음)"""
+    return _get_index_executor().submit(_index_now, video_id, transcript, only_new)
+
+
+def set_indexed_title(video_id: str, title: str) -> Future:
+    """색인된 영상의 제목 기록 (먼저 맡긴 `index_transcript` 다음에 처리됨)"""
+    return _get_index_executor().submit(_set_title_now, video_id, title)
+
+
+class Attempt(NamedTuple):
+    """백엔드 한 번 시도의 결과"""
+    method: str
+    transcript: Optional[Transcript]
+    outcome: str            # success / empty / timeout / cancelled / no_transcript / unavailable / error
+    reason: Optional[str]   # 최종 원인 분류에 넣을 실패 원인 (성공, 빈 결과, 취소면 None)
+    message: str            # method_results에 남길 설명
+
+
+def _attempt_backend(method: str, label: str, url: str, video_id: str, langs: List[str],
+                     reporter: Reporter, session_id: str, max_retries: int,
+                     deadline: Deadline, breaker: CircuitBreaker) -> Attempt:
+    """백엔드 하나를 시도하고 지표, 점수판, 차단기에 결과를 기록 (예외는 결과로 바꿔 돌려줌)"""
+    backend_reporter = reporter.for_backend(method)
+    backend_reporter.step(f"🔄 **{label}**: {method.upper()} 시도 중...")
+
+    attempt_started = time.perf_counter()
+    transcript = None
+    outcome = "error"
+    reason = None
+    failure_reason = None
+    retry_after = None
+    try:
+        try:
+            transcript = run_backend(method, url, video_id, langs, backend_reporter, session_id, max_retries,
+                                     deadline)
+        except Exception as e:
+            if deadline.expired and not isinstance(e, DeadlineExceeded):
+                # 취소나 전체 제한 시간 만료로 끊긴 요청은 백엔드의 시간 초과/네트워크 오류처럼 보이므로 바로잡음.
+                # 제한 시간이 남아 있을 때의 시간 초과만 백엔드 탓(오류)으로 남는다.
+                try:
+                    deadline.check()
+                except DeadlineExceeded as expired:
+                    raise expired from e
+            raise
+
+        if transcript:
+            outcome = "success"
+            message = ""
+            backend_reporter.step(f"✅ **{method.upper()} 성공**: {len(transcript)}개 구간, {transcript.char_count} 문자 추출")
+        else:
+            outcome = "empty"
+            message = "빈 결과"
+            backend_reporter.step(f"⚠️ {method.upper()} 빈 결과")
+
+    except DeadlineExceeded as e:
+        if deadline.cancelled:
+            outcome = "cancelled"
+            message = "다른 방법이 먼저 성공해 취소됨"
+            backend_reporter.detail(f"🛑 {method.upper()} {message}")
+        else:
+            outcome = "timeout"
+            reason = _record_backend_error(method, e)
+            message = f"중단: {str(e)}"
+            backend_reporter.step(f"⏱️ {method.upper()} 중단: {str(e)}")
+    except NoTranscriptError as e:
+        outcome = "no_transcript"
+        reason = _record_backend_error(method, e)
+        message = f"자막 없음: {str(e)}"
+        backend_reporter.step(f"❌ {method.upper()} 자막 없음: {str(e)}")
+    except VideoUnavailableError as e:
+        outcome = "unavailable"
+        reason = _record_backend_error(method, e)
+        message = f"영상 접근 불가: {str(e)}"
+        backend_reporter.step(f"❌ {method.upper()} 영상 접근 불가: {str(e)}")
+    except TranscriptExtractionError as e:
+        reason = failure_reason = _record_backend_error(method, e)
+        retry_after = e.retry_after
+        message = f"실패: {str(e)}"
+        backend_reporter.step(f"❌ {method.upper()} 실패: {str(e)}")
+    except Exception as e:
+        reason = failure_reason = _record_backend_error(method, e)
+        message = f"예상치 못한 오류: {str(e)}"
+        backend_reporter.step(f"❌ {method.upper()} 예상치 못한 오류: {str(e)}")
+    finally:
+        elapsed = time.perf_counter() - attempt_started
+        BACKEND_SECONDS.observe(elapsed, backend=method, outcome=outcome)
+        if outcome not in ("timeout", "cancelled"):
+            # 제한 시간 만료/취소로 끊긴 시도는 성공도 실패도 아니고, 걸린 시간도 남은 예산일 뿐
+            # 백엔드 성능과 상관없으므로 점수판에 넣지 않음 (제한 시간 안의 시간 초과는 "error"로 기록됨)
+            get_backend_scoreboard().record(method, outcome, elapsed)
+        if outcome in ("timeout", "cancelled"):
+            # 제한 시간/취소는 이쪽 사정이므로 차단기 판단에 넣지 않음
+            breaker.release()
+        else:
+            breaker.record(failure_reason, retry_after=retry_after)
+
+    return Attempt(method, transcript if outcome == "success" else None, outcome, reason, message)
+
+
+def _skip_open_breaker(method: str, breaker: CircuitBreaker, reporter: Reporter) -> str:
+    """차단기가 열린 백엔드를 건너뛴다고 알리고 method_results에 남길 설명 반환"""
+    reason_text = BREAKER_REASON_TEXT.get(breaker.last_reason, "오류")
+    message = f"최근 {reason_text} 반복으로 건너뜀 ({breaker.remaining():.0f}초 후 다시 시도)"
+    reporter.for_backend(method).step(f"⏭️ {method.upper()} {message}")
+    return message
+
+
+def _budget_exhausted(started: float) -> BudgetExhausted:
+    FETCH_SECONDS.observe(time.perf_counter() - started, outcome="budget_exhausted")
+    return BudgetExhausted("요청 예산을 모두 사용했습니다")
+
+
+def _fetch_sequential(methods: List[str], url: str, video_id: str, langs: List[str], reporter: Reporter,
+                      session_id: str, max_retries: int, budget: Optional[RequestBudget], deadline: Deadline,
+                      started: float, method_results: List[Tuple[str, str]],
+                      reasons: List[str]) -> Tuple[Optional[Transcript], List[str]]:
+    """백엔드를 하나씩 차례로 시도. 가져온 자막(없으면 None)과 시도하지 못한 백엔드를 반환."""
+    breakers = get_circuit_breakers()
+    attempted = 0
+    for i, method in enumerate(methods):
+        if deadline.expired:
+            return None, methods[i:]
+        if budget is not None and not budget.try_acquire():
+            raise _budget_exhausted(started)
+
+        breaker = breakers[method]
+        if not breaker.allow():
+            # 최근 요청 제한/차단이 반복된 백엔드는 재시도/대기 비용을 치르지 않고 건너뜀
+            if budget is not None:
+                budget.release()
+            method_results.append((method.upper(), _skip_open_breaker(method, breaker, reporter)))
+            reasons.append(breaker.last_reason)
+            continue
+
+        if attempted > 0:
+            try:
+                smart_delay(attempted - 1, 3.0, reporter, deadline)  # 방법 간 지연
+            except DeadlineExceeded:
+                # 대기 후 남는 시간이 없음 - 받아 둔 예산과 시험 요청 몫을 돌려주고 중단
+                if budget is not None:
+                    budget.release()
+                breaker.release()
+                reasons.append("timeout")
+                return None, methods[i:]
+        attempted += 1
+
+        attempt = _attempt_backend(method, f"방법 {i+1}/{len(methods)}", url, video_id, langs, reporter,
+                                   session_id, max_retries, deadline, breaker)
+        if attempt.transcript:
+            return attempt.transcript, []
+        method_results.append((method.upper(), attempt.message))
+        if attempt.reason:
+            reasons.append(attempt.reason)
+        if attempt.outcome == "timeout":
+            return None, methods[i + 1:]
+        if attempt.outcome == "unavailable":
+            # 영상 접근 불가면 다른 방법도 실패할 가능성이 높음
+            break
+    return None, []
+
+
+def _fetch_hedged(methods: List[str], url: str, video_id: str, langs: List[str], reporter: Reporter,
+                  session_id: str, max_retries: int, budget: Optional[RequestBudget], deadline: Deadline,
+                  started: float, method_results: List[Tuple[str, str]], reasons: List[str],
+                  max_in_flight: int) -> Tuple[Optional[Transcript], List[str]]:
+    """헤지 실행. 진행 중인 백엔드가 최근 성공 시간의 `HEDGE_PERCENTILE` 분위수 안에 끝나지 않으면
+    다음 백엔드를 함께 시작하고(동시에 최대 `max_in_flight`개), 먼저 자막을 가져온 쪽을 쓰고 나머지는 취소한다.
+    실패하면 방법 간 대기 없이 다음 백엔드를 바로 시작한다.
+    """
+    breakers = get_circuit_breakers()
+    scoreboard = get_backend_scoreboard()
+    pending = deque(enumerate(methods))
+    running: Dict[Future, Tuple[str, Deadline]] = {}
+    hedge_at = 0.0
+    slow_method, slow_delay = "", 0.0
+    budget_exhausted = False
+    executor = ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix="ytsub-hedge")
+    try:
+        while True:
+            while pending and len(running) < max_in_flight and time.monotonic() >= hedge_at and not deadline.expired:
+                i, method = pending.popleft()
+                if budget is not None and not budget.try_acquire():
+                    if not running:
+                        raise _budget_exhausted(started)
+                    # 진행 중인 시도의 결과만 기다림
+                    budget_exhausted = True
+                    pending.clear()
+                    break
+
+                breaker = breakers[method]
+                if not breaker.allow():
+                    if budget is not None:
+                        budget.release()
+                    method_results.append((method.upper(), _skip_open_breaker(method, breaker, reporter)))
+                    reasons.append(breaker.last_reason)
+                    continue
+
+                if running:
+                    HEDGED_ATTEMPTS.inc(backend=method)
+                    reporter.detail(f"⏩ {slow_method.upper()}이(가) {slow_delay:.1f}초 안에 끝나지 않아 "
+                                    f"{method.upper()} 동시 시작")
+                child = deadline.child()
+                future = executor.submit(_attempt_backend, method, f"방법 {i+1}/{len(methods)}", url, video_id,
+                                         langs, reporter, session_id, max_retries, child, breaker)
+                running[future] = (method, child)
+                slow_method, slow_delay = method, scoreboard.latency_percentile(method, HEDGE_PERCENTILE)
+                hedge_at = time.monotonic() + slow_delay
+
+            if not running:
+                break
+
+            timeout = deadline.remaining()
+            if pending and len(running) < max_in_flight:
+                until_hedge = max(0.0, hedge_at - time.monotonic())
+                timeout = until_hedge if timeout is None else min(timeout, until_hedge)
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if deadline.expired:
+                    # 진행 중인 시도는 finally에서 취소하고 결과는 기다리지 않음
+                    for method, _child in running.values():
+                        method_results.append((method.upper(), "제한 시간 초과로 중단"))
+                    reasons.append("timeout")
+                    break
+                continue
+
+            for future in done:
+                method, _child = running.pop(future)
+                attempt = future.result()
+                if attempt.transcript:
+                    return attempt.transcript, []
+                method_results.append((method.upper(), attempt.message))
+                if attempt.reason:
+                    reasons.append(attempt.reason)
+                if attempt.outcome == "unavailable":
+                    # 영상 접근 불가면 다른 방법도 실패할 가능성이 높음
+                    return None, []
+            # 실패로 자리가 났으므로 다음 백엔드를 바로 시작
+            hedge_at = 0.0
+    finally:
+        for _method, child in running.values():
+            child.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if budget_exhausted:
+        raise _budget_exhausted(started)
+    return None, [method for _i, method in pending] if deadline.expired else []
+
+
+def fetch_transcript(url: str, video_id: str, langs: List[str], use_cache: bool = True,
+                     max_retries: int = 3, session_id: Optional[str] = None,
+                     progress: Optional[ProgressCallback] = None,
+                     budget: Optional[RequestBudget] = None,
+                     deadline: Optional[Deadline] = None,
+                     hedge: bool = False, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> Transcript:
+    """향상된 3단계 폴백으로 자막 가져오기.
+
+    진행 상황은 `progress` 콜백으로 보내고, 모두 실패하면 `ExtractionFailed`를 올린다.
+    `budget`을 주면 백엔드를 시도할 때마다 하나씩 쓰고, 다 쓰면 `BudgetExhausted`를 올린다.
+    `deadline`은 모든 백엔드 호출, 대기, HTTP 시간 초과가 나눠 쓰는 전체 제한 시간이다.
+    지나면 진행 중인 백엔드는 중단되고 남은 백엔드는 시도하지 않는다.
+    `hedge`를 켜면 느린 백엔드를 기다리는 동안 다음 백엔드를 함께 시작한다 (`_fetch_hedged`).
+    가져온 자막은 백그라운드 워커가 검색 색인(`ytsub.search`)에도 넣는다 (반환을 기다리게 하지 않음).
+    """
+    reporter = Reporter(progress)
+    session_id = session_id or new_session_id()
+    deadline = deadline or Deadline()
+    started = time.perf_counter()
+
+    cache = get_transcript_cache()
+    if use_cache:
+        cached = cache.get(video_id, langs)
+        CACHE_REQUESTS.inc(result="hit" if cached else "miss")
+        if cached:
+            reporter.success(f"⚡ 캐시에서 불러옴: {cached.language} ({cached.source}, {cached.kind})")
+            # 색인 기능 이전에 캐시된 자막도 검색되도록
+            index_transcript(video_id, cached, only_new=True)
+            FETCH_SECONDS.observe(time.perf_counter() - started, outcome="cache_hit")
+            return cached
+    else:
+        CACHE_REQUESTS.inc(result="bypass")
+
+    reasons = []
+    method_results = []
+
+    reporter.info(f"🎯 자막 추출 시작 (세션: {session_id}, 언어: {', '.join(langs)})")
+
+    methods = backend_order()
+    reporter.detail(f"시도 순서: {' → '.join(m.upper() for m in methods)}"
+                    + (f" (헤지 실행, 동시 최대 {max_in_flight}개)" if hedge else ""))
+    if hedge:
+        result, untried = _fetch_hedged(methods, url, video_id, langs, reporter, session_id, max_retries, budget,
+                                        deadline, started, method_results, reasons, max_in_flight)
+    else:
+        result, untried = _fetch_sequential(methods, url, video_id, langs, reporter, session_id, max_retries,
+                                            budget, deadline, started, method_results, reasons)
+
+    if result:
+        cache.put(video_id, langs, result)
+        index_transcript(video_id, result)
+        FETCH_SECONDS.observe(time.perf_counter() - started, outcome="success")
+        return result
+
+    if untried:
+        reporter.warning(f"⏱️ 제한 시간 초과 - {', '.join(m.upper() for m in untried)}은(는) 시도하지 않음")
+    for method in untried:
+        method_results.append((method.upper(), "제한 시간 초과로 시도하지 않음"))
+    if deadline.expired and "timeout" not in reasons:
+        # 시간 초과로 끊긴 HTTP 요청은 일시적 오류처럼 보이므로 여기서 원인을 바로잡음
+        reasons.append("timeout")
+    reason = classify_failure(reasons)
+    FETCH_SECONDS.observe(time.perf_counter() - started, outcome="failed")
+    raise ExtractionFailed(FAILURE_MESSAGES[reason], reason, method_results)
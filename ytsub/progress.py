@@ -0,0 +1,60 @@
+"""추출 진행 상황 이벤트.
+
+코어는 화면에 직접 출력하지 않고 `ProgressCallback`으로 이벤트를 넘긴다.
+Streamlit UI는 level에 맞는 st.* 요소로, CLI는 stderr 한 줄로 표시한다.
+"""
+import time
+from typing import Callable, NamedTuple, Optional
+
+# 이벤트 수준 (UI 표시 방식과 1:1 대응)
+INFO = "info"          # 단계 시작 등 안내
+STEP = "step"          # 백엔드 시도/결과
+DETAIL = "detail"      # 대기, 포맷 실패 등 부가 정보
+SUCCESS = "success"
+WARNING = "warning"
+
+
+class ProgressEvent(NamedTuple):
+    level: str
+    message: str
+    backend: Optional[str] = None
+    timestamp: float = 0.0
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+def null_progress(event: ProgressEvent) -> None:
+    """아무것도 표시하지 않는 기본 콜백"""
+    pass
+
+
+class Reporter:
+    """콜백에 이벤트를 보내는 얇은 래퍼 (백엔드 이름을 붙여 줌)"""
+
+    __slots__ = ("callback", "backend")
+
+    def __init__(self, callback: Optional[ProgressCallback] = None, backend: Optional[str] = None):
+        self.callback = callback or null_progress
+        self.backend = backend
+
+    def for_backend(self, backend: str) -> "Reporter":
+        return Reporter(self.callback, backend)
+
+    def emit(self, level: str, message: str) -> None:
+        self.callback(ProgressEvent(level, message, self.backend, time.time()))
+
+    def info(self, message: str) -> None:
+        self.emit(INFO, message)
+
+    def step(self, message: str) -> None:
+        self.emit(STEP, message)
+
+    def detail(self, message: str) -> None:
+        self.emit(DETAIL, message)
+
+    def success(self, message: str) -> None:
+        self.emit(SUCCESS, message)
+
+    def warning(self, message: str) -> None:
+        self.emit(WARNING, message)
@@ -0,0 +1,142 @@
+"""관측한 성공률과 지연 시간으로 백엔드 시도 순서 정하기.
+
+백엔드마다 최근 성공/실패 횟수와 시도 시간을 지수적으로 감쇠하며 모아 두고,
+"초당 성공 기대값" = 성공 확률 / 평균 시도 시간이 큰 순서로 시도한다.
+기록은 프로세스 전체(모든 세션)가 공유하고 반감기마다 절반씩 잊으므로, 느려지거나
+막힌 백엔드는 뒤로 밀렸다가 시간이 지나면 사전값 쪽으로 돌아와 다시 앞설 수 있다.
+최근 성공 시간 분위수(`latency_percentile`)는 헤지 실행에서 다음 백엔드를 언제 함께 시작할지 정한다.
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from ytsub.backends import BACKEND_NAMES
+
+# 기록이 이만큼 지나면 가중치가 절반이 됨 (초)
+DEFAULT_HALF_LIFE = 15 * 60
+
+# 사전값: 성공 1회 + 실패 1회(성공률 0.5), 시도 시간 5초 1회를 본 것으로 시작
+PRIOR_SUCCESSES = 1.0
+PRIOR_FAILURES = 1.0
+PRIOR_SECONDS = 5.0
+PRIOR_WEIGHT = 1.0
+
+# 백엔드 잘못이 아닌 결과 (영상 자체의 상태) - 성공률에는 넣지 않고 시간만 기록
+NEUTRAL_OUTCOMES = ("no_transcript", "unavailable")
+
+# 분위수 계산에 쓰는 최근 성공 시간 개수와, 이보다 적으면 사전값을 쓰는 최소 개수
+RECENT_LATENCY_SAMPLES = 50
+MIN_LATENCY_SAMPLES = 5
+
+
+class BackendScore(NamedTuple):
+    backend: str
+    success_rate: float
+    seconds: float
+    samples: float      # 감쇠된 성공 + 실패 횟수
+
+    @property
+    def score(self) -> float:
+        return self.success_rate / self.seconds
+
+
+class _Stats:
+    __slots__ = ("successes", "failures", "seconds", "weight", "updated_at")
+
+    def __init__(self, now: float):
+        self.successes = 0.0
+        self.failures = 0.0
+        self.seconds = 0.0      # 감쇠된 시도 시간 합
+        self.weight = 0.0       # 감쇠된 시도 수 (시간 평균의 분모)
+        self.updated_at = now
+
+    def decay(self, now: float, half_life: float) -> None:
+        factor = 0.5 ** (max(0.0, now - self.updated_at) / half_life)
+        self.successes *= factor
+        self.failures *= factor
+        self.seconds *= factor
+        self.weight *= factor
+        self.updated_at = now
+
+
+class BackendScoreboard:
+    """백엔드별 감쇠 통계와 그에 따른 시도 순서 (스레드 안전)"""
+
+    def __init__(self, backends: Sequence[str], half_life: float = DEFAULT_HALF_LIFE):
+        self.backends = tuple(backends)
+        self.half_life = half_life
+        self._stats: Dict[str, _Stats] = {}
+        self._recent: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, backend: str, outcome: str, seconds: float, now: Optional[float] = None) -> None:
+        """시도 한 번의 결과 기록 (outcome: success / empty / error / no_transcript / unavailable)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            stats = self._stats.get(backend)
+            if stats is None:
+                stats = self._stats[backend] = _Stats(now)
+            stats.decay(now, self.half_life)
+            stats.seconds += seconds
+            stats.weight += 1.0
+            if outcome == "success":
+                stats.successes += 1.0
+                self._recent.setdefault(backend, deque(maxlen=RECENT_LATENCY_SAMPLES)).append(seconds)
+            elif outcome not in NEUTRAL_OUTCOMES:
+                stats.failures += 1.0
+
+    def scores(self, now: Optional[float] = None) -> List[BackendScore]:
+        """기본 순서대로 백엔드별 현재 점수"""
+        now = time.time() if now is None else now
+        result = []
+        with self._lock:
+            for backend in self.backends:
+                stats = self._stats.get(backend)
+                if stats is not None:
+                    stats.decay(now, self.half_life)
+                    successes, failures = stats.successes, stats.failures
+                    seconds, weight = stats.seconds, stats.weight
+                else:
+                    successes = failures = seconds = weight = 0.0
+                success_rate = (successes + PRIOR_SUCCESSES) / (
+                    successes + failures + PRIOR_SUCCESSES + PRIOR_FAILURES)
+                average = (seconds + PRIOR_SECONDS * PRIOR_WEIGHT) / (weight + PRIOR_WEIGHT)
+                result.append(BackendScore(backend, success_rate, max(average, 0.01), successes + failures))
+        return result
+
+    def latency_percentile(self, backend: str, q: float, default: float = PRIOR_SECONDS) -> float:
+        """최근 성공한 시도 시간의 `q` 분위수 (기록이 적으면 `default`)"""
+        with self._lock:
+            samples = sorted(self._recent.get(backend, ()))
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return default
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def order(self, now: Optional[float] = None) -> List[str]:
+        """점수 높은 순서 (같으면 기본 순서 유지)"""
+        ranked = sorted(self.scores(now), key=lambda s: s.score, reverse=True)
+        return [s.backend for s in ranked]
+
+    def reset(self, backends: Optional[Iterable[str]] = None) -> None:
+        with self._lock:
+            if backends is None:
+                self._stats.clear()
+                self._recent.clear()
+            else:
+                for backend in backends:
+                    self._stats.pop(backend, None)
+                    self._recent.pop(backend, None)
+
+
+_default_scoreboard: Optional[BackendScoreboard] = None
+_default_scoreboard_lock = threading.Lock()
+
+
+def get_backend_scoreboard() -> BackendScoreboard:
+    """프로세스 전체에서 공유하는 기본 점수판 (모든 Streamlit 세션이 공유)."""
+    global _default_scoreboard
+    with _default_scoreboard_lock:
+        if _default_scoreboard is None:
+            _default_scoreboard = BackendScoreboard(BACKEND_NAMES)
+        return _default_scoreboard
@@ -0,0 +1,207 @@
+"""추출한 자막 전체에 대한 로컬 전문 검색 색인 (SQLite FTS5, trigram).
+
+파이프라인이 자막을 돌려줄 때마다 구간 단위(시작 시각 포함)로 색인에 넣는다.
+검색은 로컬 DB만 읽으므로 네트워크 요청이 없고, 결과는 바로 `watch?v=...&t=...`
+링크로 이어진다. trigram 토크나이저라 띄어쓰기 없는 한국어 부분 문자열도 찾는다.
+캐시와 달리 TTL/LRU로 지우지 않는다 (다시 추출하지 않고 찾는 것이 목적).
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ytsub.cleaning import clean_duplicate_subtitles
+from ytsub.model import Transcript
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    "YTSUB_INDEX_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "memg_yt", "search.sqlite3"),
+)
+DEFAULT_LIMIT = 50
+
+# trigram 토크나이저는 3글자 미만 검색어를 MATCH로 찾을 수 없다 (LIKE로 대체)
+MIN_MATCH_CHARS = 3
+
+# SQLite에 FTS5/trigram이 없거나 색인 파일을 열 수 없을 때 UI/CLI에 보여주는 문구
+INDEX_UNAVAILABLE_MESSAGE = "지금은 검색 색인을 사용할 수 없습니다. 잠시 후 다시 시도하세요."
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id   TEXT PRIMARY KEY,
+    title      TEXT,
+    language   TEXT,
+    kind       TEXT,
+    source     TEXT,
+    segments   INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id       INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    start    REAL NOT NULL,
+    text     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_segments_video ON segments (video_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+class SearchHit(NamedTuple):
+    video_id: str
+    start: float
+    text: str
+    title: Optional[str]
+
+
+def split_terms(query: str) -> List[str]:
+    """검색어를 공백 기준으로 나눔 ("..."로 묶은 구절은 하나로)"""
+    return [phrase or word for phrase, word in re.findall(r'"([^"]+)"|(\S+)', query)]
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _build_query(terms: List[str], limit: int) -> Tuple[str, list]:
+    """검색어 목록 → (SQL, 파라미터). 긴 검색어는 FTS MATCH, 짧은 검색어는 LIKE 조건.
+
+    관련도(bm25) 정렬은 일치하는 구간을 전부 점수 매겨야 해서 흔한 단어에서 느려진다.
+    rowid 역순(최근 색인 순)으로 읽으면 `limit`개를 찾는 즉시 멈춘다.
+
+    3글자 미만 검색어만 있으면 색인을 쓸 수 없어 저장된 구간을 최근 것부터 LIKE로 훑는다.
+    `limit`개를 찾으면 멈추지만 드문 검색어는 모든 구간을 읽으므로 색인 크기에 비례해 느려진다.
+    """
+    long_terms = [t for t in terms if len(t) >= MIN_MATCH_CHARS]
+    short_terms = [t for t in terms if len(t) < MIN_MATCH_CHARS]
+
+    conditions = []
+    params: list = []
+    if long_terms:
+        # 각 검색어를 구절로 감싸서 FTS 문법 문자를 글자 그대로 취급 (암묵적 AND)
+        conditions.append("segments_fts MATCH ?")
+        params.append(" ".join('"' + t.replace('"', '""') + '"' for t in long_terms))
+    for term in short_terms:
+        conditions.append("s.text LIKE ? ESCAPE '\\'")
+        params.append(_like_pattern(term))
+
+    if long_terms:
+        sql = ("SELECT s.video_id, s.start, s.text, v.title FROM segments_fts "
+               "JOIN segments s ON s.id = segments_fts.rowid "
+               "JOIN videos v ON v.video_id = s.video_id "
+               f"WHERE {' AND '.join(conditions)} ORDER BY segments_fts.rowid DESC LIMIT ?")
+    else:
+        sql = ("SELECT s.video_id, s.start, s.text, v.title FROM segments s "
+               "JOIN videos v ON v.video_id = s.video_id "
+               f"WHERE {' AND '.join(conditions)} ORDER BY s.id DESC LIMIT ?")
+    params.append(limit)
+    return sql, params
+
+
+class SearchIndex:
+    """영상별 자막 구간을 담는 전문 검색 색인.
+
+    같은 영상을 다시 넣으면 이전 구간을 지우고 새로 넣는다. 롤링 자동 자막이
+    같은 문장으로 여러 번 걸리지 않도록 중복 구간을 제거한 뒤 색인한다.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def add(self, video_id: str, transcript: Transcript, title: Optional[str] = None) -> int:
+        """영상 자막을 색인 (기존 항목은 교체). 색인한 구간 수를 반환."""
+        cleaned = clean_duplicate_subtitles(transcript)
+        rows = [(video_id, start, text) for start, _end, text in cleaned.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                old_title = self._conn.execute(
+                    "SELECT title FROM videos WHERE video_id = ?", (video_id,)
+                ).fetchone()
+                self._conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+                self._conn.executemany("INSERT INTO segments (video_id, start, text) VALUES (?, ?, ?)", rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO videos "
+                    "(video_id, title, language, kind, source, segments, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (video_id, title or (old_title[0] if old_title else None), transcript.language,
+                     transcript.kind, transcript.source, len(rows), time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def contains(self, video_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone() is not None
+
+    def set_title(self, video_id: str, title: str) -> None:
+        """이미 색인된 영상의 제목 기록 (검색 결과 표시용)"""
+        with self._lock:
+            self._conn.execute("UPDATE videos SET title = ? WHERE video_id = ?", (title, video_id))
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[SearchHit]:
+        """모든 검색어를 포함하는 구간을 최근 색인한 영상부터 반환 (대소문자 구분 안 함)."""
+        terms = split_terms(query)
+        if not terms:
+            return []
+        sql, params = _build_query(terms, limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def remove(self, video_id: Optional[str] = None) -> int:
+        """색인 비우기 (video_id를 주면 해당 영상만). 지운 영상 수를 반환."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            if video_id is None:
+                cur = self._conn.execute("DELETE FROM videos")
+                self._conn.execute("DELETE FROM segments")
+            else:
+                cur = self._conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+                self._conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+            self._conn.execute("COMMIT")
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            videos, segments = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(segments), 0) FROM videos"
+            ).fetchone()
+        return {"videos": videos, "segments": segments}
+
+
+_default_index: Optional[SearchIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """프로세스 전체에서 공유하는 기본 검색 색인."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = SearchIndex()
+        return _default_index
@@ -0,0 +1,83 @@
+"""봇 차단 우회 설정 (브라우저 헤더, 세션 식별자, 사람과 비슷한 대기)."""
+import hashlib
+import random
+from typing import Optional
+
+from ytsub.deadline import Deadline
+from ytsub.metrics import timed_sleep
+from ytsub.progress import Reporter
+
+# 더 다양하고 현실적인 User-Agent 목록
+USER_AGENTS = [
+    # Chrome Windows
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+    # Chrome Mac
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    # Firefox
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:122.0) Gecko/20100101 Firefox/122.0",
+    # Safari
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2.1 Safari/605.1.15",
+    # Edge
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36 Edg/121.0.0.0",
+]
+
+
+def get_realistic_headers():
+    """실제 브라우저와 유사한 헤더 생성"""
+    ua = random.choice(USER_AGENTS)
+
+    # User-Agent에 따른 브라우저 타입 결정
+    if "Chrome" in ua:
+        browser_hints = {
+            "sec-ch-ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
+            "sec-ch-ua-mobile": "?0",
+            "sec-ch-ua-platform": '"Windows"' if "Windows" in ua else '"macOS"',
+        }
+    else:
+        browser_hints = {}
+
+    base_headers = {
+        "User-Agent": ua,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+        "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
+        "Accept-Encoding": "gzip, deflate, br",
+        "DNT": "1",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+        "Cache-Control": "max-age=0",
+    }
+
+    # 브라우저별 헤더 추가
+    base_headers.update(browser_hints)
+
+    return base_headers
+
+
+def new_session_id() -> str:
+    """세션별 고유 식별자 생성 (IP 변경 시뮬레이션용)"""
+    return hashlib.md5(str(random.random()).encode()).hexdigest()[:8]
+
+
+def smart_delay(attempt: int = 0, base_delay: float = 1.0, reporter: Optional[Reporter] = None,
+                deadline: Optional[Deadline] = None):
+    """지능적 대기 (인간과 유사한 패턴). `deadline` 안에 끝나지 않는 대기는 하지 않고 DeadlineExceeded."""
+    # 기본 대기 + 지수 백오프 + 랜덤 지터
+    delay = base_delay * (1.5 ** attempt) + random.uniform(0.5, 2.0)
+
+    # 너무 길면 최대값으로 제한
+    delay = min(delay, 15.0)
+
+    if reporter is not None:
+        reporter.detail(f"⏳ 자연스러운 간격으로 대기 중... ({delay:.1f}초)")
+    backend = getattr(reporter, "backend", None) or "pipeline"
+    if deadline is not None:
+        deadline.sleep(delay, "smart_delay", backend)
+    else:
+        timed_sleep(delay, "smart_delay", backend)
@@ -0,0 +1,45 @@
+"""YouTube URL 정리 / 비디오ID 추출."""
+import re
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+YOUTUBE_URL_RE = re.compile(
+    r'(?:https?://)?(?:www\.)?(?:youtube\.com/(?:watch\?v=|embed/|live/|shorts/)|youtu\.be/)([\w-]{11})(?:\S+)?'
+)
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    if not url:
+        return None
+
+    # 정규표현식으로 먼저 시도
+    m = YOUTUBE_URL_RE.search(url)
+    if m:
+        return m.group(1)
+
+    # URL 파싱으로 재시도
+    try:
+        parsed = urlparse(url)
+        if parsed.hostname in ['youtube.com', 'www.youtube.com']:
+            vid = parse_qs(parsed.query).get("v", [None])[0]
+            if vid and len(vid) == 11:
+                return vid
+        elif parsed.hostname in ['youtu.be', 'www.youtu.be']:
+            vid = parsed.path.lstrip('/')
+            if len(vid) == 11:
+                return vid
+    except Exception:
+        pass
+
+    return None
+
+
+def to_clean_watch_url(url_or_id: str) -> str:
+    """짧은 주소/파라미터를 표준 watch URL로 정리."""
+    vid = extract_video_id(url_or_id) if "http" in url_or_id else url_or_id
+    return f"https://www.youtube.com/watch?v={vid}" if vid else url_or_id
+
+
+def to_timestamp_url(video_id: str, seconds: float) -> str:
+    """해당 시각부터 재생되는 watch URL."""
+    return f"https://www.youtube.com/watch?v={video_id}&t={int(seconds)}s"